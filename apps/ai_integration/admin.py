@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import AICallRecord
+
+
+@admin.register(AICallRecord)
+class AICallRecordAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'operation', 'model', 'status', 'attempt', 'latency_ms',
+                    'input_tokens', 'output_tokens', 'cost_usd', 'archetype', 'user', 'plan')
+    list_filter = ('operation', 'model', 'status', 'upstream', 'archetype', 'prompt_profile')
+    search_fields = ('user__email',)
+    raw_id_fields = ('user', 'plan')
+    date_hierarchy = 'created_at'
+    
+    def has_add_permission(self, request):
+        return False
@@ -1,22 +1,33 @@
 """AI client interfaces for GPT-5 with Responses API and Structured Outputs support"""
-import json
+import asyncio
 import logging
 import time
-from typing import Dict
+from functools import lru_cache
+from typing import Any, Callable, Dict, NamedTuple, Optional
 
 import random
 import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from openai import OpenAI, APITimeoutError, APIError
+from openai import APIConnectionError, APITimeoutError, APIError
 
+from apps.core.metrics import MetricNames, gauge, incr, timing
+
+from . import json_codec
+from .circuit_breaker import STATE_OPEN, CircuitBreaker
+from .client_pool import get_async_openai_client, get_openai_client
+from .ledger import record_ai_call
+from .rate_limit import LoadShedError, TokenBucket, get_concurrency_limiter
+from .response_cache import AIResponseCache
 from .schemas import (
     ComprehensiveAIReport,
     WorkoutPlan,
     validate_ai_plan_response,
     validate_comprehensive_ai_report,
 )
-from .schemas_simple import SimpleWorkoutPlan, validate_simple_ai_plan
-from .schemas_json_simple import WORKOUT_PLAN_JSON_SCHEMA_SIMPLE
+from .schemas_simple import SimpleWorkoutPlan, validate_simple_ai_plan_data
+from .schemas_json_simple import PLAN_DELTA_JSON_SCHEMA, WORKOUT_PLAN_JSON_SCHEMA_SIMPLE
+from .stream_parser import StreamingJSONArrayExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -33,34 +44,44 @@ class ServiceCallError(AIClientError):
     """Raised when OpenAI service returns an error"""
 
 
+class CircuitOpenError(ServiceCallError):
+    """Raised without calling OpenAI while the shared circuit breaker is open or load is shed"""
+
+
+class StreamedResponse(NamedTuple):
+    """Result of a streamed Responses API call"""
+    text: str
+    usage: Any = None
+
+
+@lru_cache(maxsize=None)
+def _plan_delta_validator():
+    """Compiled validator for PLAN_DELTA_JSON_SCHEMA (built once per process)"""
+    from jsonschema.validators import validator_for
+    return validator_for(PLAN_DELTA_JSON_SCHEMA)(PLAN_DELTA_JSON_SCHEMA)
+
+
 class OpenAIClient:
     """OpenAI API client with GPT-5 and Responses API support"""
     
-    def __init__(self):
-        if not settings.OPENAI_API_KEY:
-            raise AIClientError("OPENAI_API_KEY not configured")
-        
-        # Set comprehensive timeouts (prevent hanging)
+    # Circuit breaker / concurrency limiter name (state is shared by all clients with the same name)
+    upstream_name = 'openai'
+    
+    def __init__(self, base_url: str = None, rate_limiter: Optional[TokenBucket] = None):
+        # Comprehensive timeouts (prevent hanging); applied by the shared pool in client_pool
         self.connect_timeout = getattr(settings, 'OPENAI_CONNECT_TIMEOUT', 15)
         self.read_timeout = getattr(settings, 'OPENAI_READ_TIMEOUT', 600)  # GPT-5 needs more time for large plans
         self.total_timeout = getattr(settings, 'OPENAI_TOTAL_TIMEOUT', 720)  # overall limit
         self.max_retries = getattr(settings, 'OPENAI_MAX_RETRIES', 3)
         
-        # Create httpx client with connection pooling and limits
-        timeout = httpx.Timeout(
-            timeout=self.total_timeout,
-            connect=self.connect_timeout,
-            read=self.read_timeout,
-            write=30,
-            pool=self.total_timeout
-        )
-        limits = httpx.Limits(max_keepalive_connections=20, max_connections=40)
-        self.httpx_client = httpx.Client(timeout=timeout, limits=limits)
+        # Fail fast during brown-outs (shared across workers) and cap in-flight calls per process
+        self.circuit_breaker = CircuitBreaker(self.upstream_name)
+        self.concurrency_limiter = get_concurrency_limiter(self.upstream_name)
+        # Optional request quota (e.g. bulk regeneration): one token per API request, retries included
+        self.rate_limiter = rate_limiter
         
-        self.client = OpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            http_client=self.httpx_client
-        )
+        self.base_url = base_url
+        self.client = self._create_sdk_client(base_url)
         self.default_model = getattr(settings, 'OPENAI_MODEL', 'gpt-5')
         
         # Validate model is supported - prioritize GPT-5 series
@@ -76,32 +97,148 @@ class OpenAIClient:
         
         logger.info(f"Initialized OpenAI client with model: {self.default_model}")
         logger.info(f"Timeouts: connect={self.connect_timeout}s, read={self.read_timeout}s, total={self.total_timeout}s")
-        logger.info(f"Retries: max={self.max_retries}, connection pooling enabled")
+        logger.info(f"Retries: max={self.max_retries}, shared connection pool")
         logger.info(f"GPT-5 features enabled: {self.default_model.startswith('gpt-5')}")
     
-    def _with_retries(self, call_func, operation_name="OpenAI API call"):
-        """Execute function with exponential backoff retries"""
+    def _with_retries(self, call_func, operation_name="OpenAI API call", ledger_operation: Optional[str] = None):
+        """
+        Execute function with exponential backoff retries behind the circuit breaker and concurrency limit.
+        With ledger_operation every attempt is recorded in the AI call ledger.
+        """
+        self._check_circuit(operation_name)
         last_error = None
         
         for attempt in range(self.max_retries):
+            self._acquire_slot(operation_name)
+            started = time.monotonic()
             try:
-                return call_func()
+                result = call_func()
             except (httpx.ConnectError, httpx.ReadTimeout, APIError) as e:
                 last_error = e
+                self._ledger_attempt(ledger_operation, attempt, started, error=e)
+                self._record_attempt(e, time.monotonic() - started, operation_name)
                 if attempt < self.max_retries - 1:
                     backoff = (2 ** attempt) + random.uniform(0, 1)
                     logger.warning(f"{operation_name} attempt {attempt + 1} failed: {str(e)}, retrying in {backoff:.1f}s")
                     time.sleep(backoff)
                 else:
                     logger.error(f"{operation_name} failed after {self.max_retries} attempts: {str(e)}")
+                continue
+            except BaseException as e:
+                self.concurrency_limiter.release(success=True)
+                if isinstance(e, Exception):
+                    self._ledger_attempt(ledger_operation, attempt, started, error=e)
+                raise
+            
+            self._ledger_attempt(ledger_operation, attempt, started, response=result)
+            self._record_attempt(None, time.monotonic() - started, operation_name)
+            return result
+        
+        raise self._retry_error(last_error, operation_name)
+    
+    async def _awith_retries(self, call_func, operation_name="OpenAI API call", ledger_operation: Optional[str] = None):
+        """Async variant of _with_retries: call_func returns an awaitable"""
+        self._check_circuit(operation_name)
+        last_error = None
+        aledger_attempt = sync_to_async(self._ledger_attempt)
+        
+        for attempt in range(self.max_retries):
+            await self._aacquire_slot(operation_name)
+            started = time.monotonic()
+            try:
+                result = await call_func()
+            except (httpx.ConnectError, httpx.ReadTimeout, APIError) as e:
+                last_error = e
+                await aledger_attempt(ledger_operation, attempt, started, error=e)
+                self._record_attempt(e, time.monotonic() - started, operation_name)
+                if attempt < self.max_retries - 1:
+                    backoff = (2 ** attempt) + random.uniform(0, 1)
+                    logger.warning(f"{operation_name} attempt {attempt + 1} failed: {str(e)}, retrying in {backoff:.1f}s")
+                    await asyncio.sleep(backoff)
+                else:
+                    logger.error(f"{operation_name} failed after {self.max_retries} attempts: {str(e)}")
+                continue
+            except BaseException as e:
+                self.concurrency_limiter.release(success=True)
+                if isinstance(e, Exception):
+                    await aledger_attempt(ledger_operation, attempt, started, error=e)
+                raise
+            
+            await aledger_attempt(ledger_operation, attempt, started, response=result)
+            self._record_attempt(None, time.monotonic() - started, operation_name)
+            return result
         
-        # Convert to our specific exceptions
+        raise self._retry_error(last_error, operation_name)
+    
+    def _ledger_attempt(self, ledger_operation: Optional[str], attempt: int, started: float,
+                        response=None, error: Optional[BaseException] = None):
+        if ledger_operation is not None:
+            record_ai_call(ledger_operation, self.default_model, attempt + 1, time.monotonic() - started,
+                           response=response, error=error, upstream=self.upstream_name)
+    
+    def _check_circuit(self, operation_name: str):
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(f"{operation_name} skipped: OpenAI circuit breaker is open")
+    
+    def _acquire_slot(self, operation_name: str):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        try:
+            self.concurrency_limiter.acquire()
+        except LoadShedError as e:
+            incr(MetricNames.AI_LOAD_SHED)
+            raise CircuitOpenError(f"{operation_name} shed: {e}")
+    
+    async def _aacquire_slot(self, operation_name: str):
+        while self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            await asyncio.sleep(0.05)
+        deadline = time.monotonic() + self.concurrency_limiter.queue_timeout
+        while not self.concurrency_limiter.try_acquire():
+            if time.monotonic() >= deadline:
+                incr(MetricNames.AI_LOAD_SHED)
+                raise CircuitOpenError(f"{operation_name} shed: {self.concurrency_limiter.in_flight} calls in flight")
+            await asyncio.sleep(0.05)
+    
+    def _record_attempt(self, error: Optional[BaseException], latency: float, operation_name: str):
+        """Feed attempt outcome to the limiter and breaker; stop retrying once the circuit opens"""
+        service_failure = error is not None and self._is_service_failure(error)
+        self.concurrency_limiter.release(success=not service_failure, latency=latency)
+        gauge(MetricNames.AI_CONCURRENCY_LIMIT, self.concurrency_limiter.limit)
+        
+        if error is None:
+            self.circuit_breaker.record_success()
+        elif service_failure:
+            self.circuit_breaker.record_failure()
+            if self.circuit_breaker.state == STATE_OPEN:
+                raise CircuitOpenError(f"{operation_name} aborted: OpenAI circuit breaker opened ({error})")
+    
+    @staticmethod
+    def _is_service_failure(error: BaseException) -> bool:
+        """Upstream trouble (connection, timeout, 429, 5xx) - not our bad requests"""
+        if isinstance(error, (httpx.ConnectError, httpx.ReadTimeout, APIConnectionError)):
+            return True
+        status_code = getattr(error, 'status_code', None)
+        return status_code is None or status_code == 429 or status_code >= 500
+    
+    def _retry_error(self, last_error, operation_name: str) -> AIClientError:
+        """Convert the last retried error to our specific exceptions"""
         if isinstance(last_error, (httpx.ConnectError, httpx.ReadTimeout)):
-            raise ServiceTimeoutError(f"{operation_name} timeout after {self.max_retries} retries: {str(last_error)}")
+            return ServiceTimeoutError(f"{operation_name} timeout after {self.max_retries} retries: {str(last_error)}")
         elif isinstance(last_error, APIError):
-            raise ServiceCallError(f"{operation_name} error after {self.max_retries} retries: {str(last_error)}")
+            return ServiceCallError(f"{operation_name} error after {self.max_retries} retries: {str(last_error)}")
         else:
-            raise ServiceCallError(f"{operation_name} failed: {str(last_error)}")
+            return ServiceCallError(f"{operation_name} failed: {str(last_error)}")
+    
+    def _create_sdk_client(self, base_url: Optional[str]):
+        """Shared per-process client: one httpx pool and TLS session for all generators"""
+        if not settings.OPENAI_API_KEY:
+            raise AIClientError("OPENAI_API_KEY not configured")
+        return get_openai_client(base_url)
+    
+    @property
+    def async_client(self):
+        """Shared AsyncOpenAI client for the running event loop"""
+        return get_async_openai_client(self.base_url)
     
     def generate_completion(self, prompt: str, max_tokens: int = 8000, temperature: float = 0.7) -> Dict:
         """Generate completion using GPT-5 with Structured Outputs"""
@@ -119,11 +256,8 @@ class OpenAIClient:
             logger.info(f"Generating workout plan with {self.default_model} using {'Responses API' if self.default_model.startswith('gpt-5') else 'Chat Completions API'}")
             response = self._make_structured_api_call(prompt, max_tokens, temperature)
             
-            # Convert dict back to JSON string for validation
-            raw_json = json.dumps(response)
-            
-            # Validate with simple schema
-            validated_plan = validate_simple_ai_plan(raw_json)
+            # Validate the parsed dict with simple schema
+            validated_plan = validate_simple_ai_plan_data(response)
             
             logger.info(f"Successfully validated GPT-5 workout plan: {validated_plan.plan_name}, "
                        f"{validated_plan.duration_weeks} weeks, "
@@ -136,83 +270,83 @@ class OpenAIClient:
             logger.error(f"GPT-5 workout plan generation/validation failed: {str(e)}")
             raise AIClientError(f"Failed to generate valid GPT-5 workout plan: {str(e)}")
     
+    def generate_plan_delta(self, prompt: str, max_tokens: int = 1500, temperature: float = 0.5) -> Dict:
+        """Weekly adaptation: JSON-patch operations over one week (PLAN_DELTA_JSON_SCHEMA)"""
+        from jsonschema import ValidationError
+        
+        logger.info(f"Generating plan delta with {self.default_model}")
+        delta = self._make_structured_api_call(prompt, max_tokens, temperature, schema=PLAN_DELTA_JSON_SCHEMA)
+        try:
+            _plan_delta_validator().validate(delta)
+        except ValidationError as e:
+            logger.error(f"Plan delta does not match schema: {e.message}")
+            raise AIClientError(f"Invalid plan delta: {e.message}")
+        return delta
+    
     def generate_comprehensive_report(
         self, 
         prompt: str, 
         user_id: str = None, 
         archetype: str = None,
         max_tokens: int = 32000,  # Maximum for comprehensive reports 
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        on_plan_chunk: Optional[Callable[[str, Dict[str, Any]], None]] = None
     ) -> ComprehensiveAIReport:
-        """Generate comprehensive report using GPT-5 with higher reasoning"""
+        """
+        Generate comprehensive report using GPT-5 with higher reasoning
+        
+        If on_plan_chunk is given and AI_STREAMING_ENABLED is on, the response is streamed and
+        on_plan_chunk(array_key, element) is called for every week/cycle as soon as it is complete.
+        """
         start_time = time.time()
         try:
             if self.default_model.startswith('gpt-5'):
-                from .builder import build_comprehensive_payload
-                
-                # Build comprehensive report payload
-                api_params = build_comprehensive_payload(
-                    prompt=prompt,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    model=self.default_model
+                api_params, response_cache, cache_key = self._prepare_comprehensive_request(
+                    prompt, max_tokens, temperature
                 )
                 
-                # Log and validate payload sizes for debugging  
-                payload_bytes = len(json.dumps(api_params, ensure_ascii=False).encode('utf-8'))
-                logger.info(f"Payload sizes: prompt={len(prompt)} chars, "
-                           f"system={len(api_params.get('input', [{}])[0].get('content', ''))}, "
-                           f"max_tokens={max_tokens}, total_bytes={payload_bytes}")
+                content = response_cache.get(cache_key)
+                if content:
+                    validated_report = validate_comprehensive_ai_report(content)
+                    if on_plan_chunk is not None:
+                        # Same delivery path as streaming so callers materialize identically
+                        self._emit_plan_chunks(StreamingJSONArrayExtractor(keep_text=False).feed(content), on_plan_chunk)
+                    logger.info(f"Served GPT-5 comprehensive report for archetype {archetype} from cache "
+                               f"in {time.time() - start_time:.2f}s")
+                    return validated_report
                 
-                # Validate payload size to prevent upstream errors
-                if payload_bytes > 900_000:  # ~0.9 MB limit
-                    raise ServiceCallError(f"Payload too large for AI request: {payload_bytes} bytes (max 900KB)")
+                stream = on_plan_chunk is not None and getattr(settings, 'AI_STREAMING_ENABLED', True)
                 
                 # Use GPT-5 with higher reasoning effort and retries
                 try:
-                    logger.info("Starting OpenAI API call for comprehensive report...")
-                    response = self._with_retries(
-                        lambda: self.client.responses.create(**api_params),
-                        operation_name="GPT-5 comprehensive report"
-                    )
+                    logger.info(f"Starting OpenAI API call for comprehensive report (stream={stream})...")
+                    if stream:
+                        content = self._with_retries(
+                            lambda: self._stream_response_content(api_params, on_plan_chunk),
+                            operation_name="GPT-5 comprehensive report (stream)",
+                            ledger_operation='comprehensive_stream'
+                        ).text
+                    else:
+                        response = self._with_retries(
+                            lambda: self.client.responses.create(**api_params),
+                            operation_name="GPT-5 comprehensive report",
+                            ledger_operation='comprehensive'
+                        )
+                        content = self._extract_response_text(response)
                     duration = time.time() - start_time
                     logger.info(f"OpenAI call finished in {duration:.1f}s")
                     
                 except (ServiceTimeoutError, ServiceCallError):
                     # These are already properly formatted by _with_retries
                     raise
+                except AIClientError:
+                    raise
                 except Exception as e:
                     duration = time.time() - start_time
                     logger.error(f"Unexpected error during OpenAI call after {duration:.1f}s: {str(e)}")
                     raise ServiceCallError(f"Unexpected service error: {str(e)}")
                 
-                # Extract content
-                content = None
-                for item in response.output:
-                    # Look for message type (contains actual response)
-                    if item.type == 'message' and hasattr(item, 'content') and item.content:
-                        for content_item in item.content:
-                            if hasattr(content_item, 'text'):
-                                content = content_item.text
-                                break
-                        if content:
-                            break
-                    # Fallback: also check text type
-                    elif item.type == 'text' and hasattr(item, 'content') and item.content:
-                        for content_item in item.content:
-                            if hasattr(content_item, 'text'):
-                                content = content_item.text
-                                break
-                        if content:
-                            break
-                
-                if not content:
-                    raise AIClientError("No content in GPT-5 response")
-                
-                # Parse and validate
-                parsed_json = json.loads(content)
-                raw_json = json.dumps(parsed_json)
-                validated_report = validate_comprehensive_ai_report(raw_json)
+                validated_report = self._finalize_comprehensive_report(content, response_cache, cache_key)
                 
                 total_duration = time.time() - start_time
                 logger.info(f"Successfully generated GPT-5 comprehensive report for archetype: {archetype} in {total_duration:.1f}s")
@@ -232,10 +366,166 @@ class OpenAIClient:
             logger.error(f"GPT-5 comprehensive report generation failed after {duration:.1f}s: {str(e)}")
             raise AIClientError(f"Failed to generate GPT-5 comprehensive report: {str(e)}")
     
-    def _make_structured_api_call(self, prompt: str, max_tokens: int, temperature: float) -> Dict:
-        """Make API call using GPT-5 with Responses API and Structured Outputs"""
+    async def agenerate_comprehensive_report(
+        self,
+        prompt: str,
+        user_id: str = None,
+        archetype: str = None,
+        max_tokens: int = 32000,
+        temperature: float = 0.7
+    ) -> ComprehensiveAIReport:
+        """Async variant of generate_comprehensive_report over the pooled httpx.AsyncClient"""
+        start_time = time.time()
+        if not self.default_model.startswith('gpt-5'):
+            raise AIClientError(f"Async comprehensive reports require GPT-5 models, got: {self.default_model}")
+        
+        try:
+            api_params, response_cache, cache_key = self._prepare_comprehensive_request(
+                prompt, max_tokens, temperature
+            )
+            
+            content = response_cache.get(cache_key)
+            if content:
+                logger.info(f"Served GPT-5 comprehensive report for archetype {archetype} from cache "
+                           f"in {time.time() - start_time:.2f}s")
+                return validate_comprehensive_ai_report(content)
+            
+            logger.info("Starting async OpenAI API call for comprehensive report...")
+            response = await self._awith_retries(
+                lambda: self.async_client.responses.create(**api_params),
+                operation_name="GPT-5 comprehensive report (async)",
+                ledger_operation='comprehensive_async'
+            )
+            content = self._extract_response_text(response)
+            validated_report = self._finalize_comprehensive_report(content, response_cache, cache_key)
+            
+            total_duration = time.time() - start_time
+            logger.info(f"Successfully generated GPT-5 comprehensive report (async) for archetype: {archetype} in {total_duration:.1f}s")
+            return validated_report
+            
+        except AIClientError:
+            raise
+        except Exception as e:
+            duration = time.time() - start_time
+            logger.error(f"Async GPT-5 comprehensive report generation failed after {duration:.1f}s: {str(e)}")
+            raise AIClientError(f"Failed to generate GPT-5 comprehensive report: {str(e)}")
+    
+    def _prepare_comprehensive_request(self, prompt: str, max_tokens: int, temperature: float):
+        """Build comprehensive payload and its response cache key"""
+        from .builder import build_comprehensive_payload
+        
+        # Build comprehensive report payload
+        api_params = build_comprehensive_payload(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            model=self.default_model
+        )
+        
+        # Log and validate payload sizes for debugging  
+        payload_bytes = len(json_codec.dumps_bytes(api_params))
+        logger.info(f"Payload sizes: prompt={len(prompt)} chars, "
+                   f"system={len(api_params.get('input', [{}])[0].get('content', ''))}, "
+                   f"max_tokens={max_tokens}, total_bytes={payload_bytes}")
+        
+        # Validate payload size to prevent upstream errors
+        if payload_bytes > 900_000:  # ~0.9 MB limit
+            raise ServiceCallError(f"Payload too large for AI request: {payload_bytes} bytes (max 900KB)")
+        
+        # Identical requests (same prompt, model, schema, prompt version) reuse cached content
+        response_cache = AIResponseCache(namespace='comprehensive')
+        cache_key = response_cache.make_key(
+            prompt=prompt,
+            model=self.default_model,
+            schema=api_params.get('text', {}).get('format', {}).get('schema'),
+        )
+        return api_params, response_cache, cache_key
+    
+    def _finalize_comprehensive_report(self, content: Optional[str], response_cache: AIResponseCache,
+                                       cache_key: str) -> ComprehensiveAIReport:
+        """Validate response content and cache it"""
+        if not content:
+            raise AIClientError("No content in GPT-5 response")
+        
+        # Parse and validate in one pass
+        validated_report = validate_comprehensive_ai_report(content)
+        
+        # Cache only responses that passed validation
+        response_cache.set(cache_key, content)
+        return validated_report
+    
+    def _extract_response_text(self, response) -> Optional[str]:
+        """Extract output text from a non-streamed Responses API result"""
+        for item in response.output:
+            # Look for message type (contains actual response); fallback: also check text type
+            if item.type in ('message', 'text') and hasattr(item, 'content') and item.content:
+                for content_item in item.content:
+                    if hasattr(content_item, 'text'):
+                        return content_item.text
+        return None
+    
+    def _stream_response_content(
+        self,
+        api_params: Dict,
+        on_plan_chunk: Callable[[str, Dict[str, Any]], None]
+    ) -> StreamedResponse:
+        """
+        Consume a streamed Responses API call, handing each completed week/cycle to on_plan_chunk.
+        Returns the full output text for final validation and the usage from response.completed.
+        """
+        start_time = time.time()
+        extractor = StreamingJSONArrayExtractor()
+        first_chunk_logged = False
+        usage = None
+        
+        stream = self.client.responses.create(**api_params, stream=True)
+        try:
+            for event in stream:
+                event_type = getattr(event, 'type', '')
+                
+                if event_type == 'response.output_text.delta':
+                    chunks = extractor.feed(event.delta)
+                    if chunks and not first_chunk_logged:
+                        first_chunk_logged = True
+                        first_chunk_ms = (time.time() - start_time) * 1000
+                        timing(MetricNames.AI_STREAM_FIRST_CHUNK_TIME, first_chunk_ms)
+                        logger.info(f"⚡ First plan chunk streamed after {first_chunk_ms / 1000:.1f}s")
+                    self._emit_plan_chunks(chunks, on_plan_chunk)
+                
+                elif event_type == 'response.completed':
+                    usage = getattr(event.response, 'usage', None)
+                
+                elif event_type == 'response.refusal.done':
+                    logger.error(f"AI model refused request: {event.refusal}")
+                    raise AIClientError(f"AI model refused the request: {event.refusal}")
+                
+                elif event_type in ('response.failed', 'error'):
+                    error = getattr(getattr(event, 'response', None), 'error', None) or getattr(event, 'message', '')
+                    raise ServiceCallError(f"Streamed response failed: {error}")
+                
+                elif event_type == 'response.incomplete':
+                    details = getattr(event.response, 'incomplete_details', None)
+                    raise ServiceCallError(f"Streamed response incomplete: {details}")
+        finally:
+            stream.close()
+        
+        logger.info(f"📡 Stream finished in {time.time() - start_time:.1f}s, "
+                   f"{extractor.emitted} plan chunks delivered incrementally")
+        return StreamedResponse(text=extractor.text, usage=usage)
+    
+    def _emit_plan_chunks(self, chunks, on_plan_chunk: Callable[[str, Dict[str, Any]], None]):
+        """Deliver streamed chunks; consumer errors must not abort generation"""
+        for array_key, element in chunks:
+            try:
+                on_plan_chunk(array_key, element)
+                incr(MetricNames.AI_STREAM_CHUNKS, array_key=array_key)
+            except Exception as e:
+                logger.warning(f"Plan chunk consumer failed for {array_key} element: {e}", exc_info=True)
+    
+    def _make_structured_api_call(self, prompt: str, max_tokens: int, temperature: float,
+                                  schema: Optional[Dict] = None) -> Dict:
+        """Make API call using GPT-5 with Responses API and Structured Outputs (default: simple plan schema)"""
         try:
-            import time
             start_time = time.time()
             
             from .builder import build_responses_payload
@@ -246,50 +536,23 @@ class OpenAIClient:
                 model=self.default_model,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                schema=WORKOUT_PLAN_JSON_SCHEMA_SIMPLE,
+                schema=schema or WORKOUT_PLAN_JSON_SCHEMA_SIMPLE,
             )
 
-            # Add retry logic
-            import time
-            last_error = None
-            response = None
+            # All models should be GPT-5 series now
+            if not self.default_model.startswith('gpt-5'):
+                raise AIClientError(f"Only GPT-5 models supported, got: {self.default_model}")
             
-            for attempt in range(3):
-                try:
-                    # All models should be GPT-5 series now
-                    if not self.default_model.startswith('gpt-5'):
-                        raise AIClientError(f"Only GPT-5 models supported, got: {self.default_model}")
-                    response = self.client.responses.create(**api_params)
-                    break
-                except Exception as e:
-                    last_error = e
-                    logger.warning(f"OpenAI API attempt {attempt + 1} failed: {str(e)}")
-                    if attempt < 2:
-                        time.sleep(2 ** attempt)
-            
-            if response is None:
-                raise AIClientError(f"OpenAI request failed after 3 retries: {last_error}")
+            # Retries, circuit breaker and concurrency limit are shared with the other calls
+            response = self._with_retries(
+                lambda: self.client.responses.create(**api_params),
+                operation_name="GPT-5 structured call",
+                ledger_operation='structured'
+            )
             
             # Extract content from Responses API (GPT-5 only)
-            content = None
-            for item in response.output:
-                # Look for message type (contains actual response)
-                if item.type == 'message' and hasattr(item, 'content') and item.content:
-                    for content_item in item.content:
-                        if hasattr(content_item, 'text'):
-                            content = content_item.text
-                            break
-                    if content:
-                        break
-                # Fallback: also check text type  
-                elif item.type == 'text' and hasattr(item, 'content') and item.content:
-                    for content_item in item.content:
-                        if hasattr(content_item, 'text'):
-                            content = content_item.text
-                            break
-                    if content:
-                        break
-                        
+            content = self._extract_response_text(response)
+            
             # Check for refusals in Responses API
             for item in response.output:
                 if hasattr(item, 'content') and item.content:
@@ -305,7 +568,7 @@ class OpenAIClient:
             
             # Parse JSON - guaranteed to be valid with Structured Outputs
             try:
-                parsed_json = json.loads(content)
+                parsed_json = json_codec.loads(content)
                 
                 # Calculate and log performance metrics
                 duration = time.time() - start_time
@@ -330,11 +593,14 @@ class OpenAIClient:
                         logger.info(f"💰 Tokens: {prompt_tokens}→{output_tokens} (total: {total_tokens})")
                 
                 return parsed_json
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 logger.error(f"Failed to parse structured JSON: {str(e)}")
                 logger.error(f"Content was: {content[:1000]}")
                 raise AIClientError(f"Structured output parsing failed: {str(e)}")
                 
+        except AIClientError:
+            # CircuitOpenError / ServiceTimeoutError keep their type for callers
+            raise
         except Exception as e:
             logger.error(f"GPT-5 structured API call failed: {str(e)}")
             raise AIClientError(f"Failed to generate GPT-5 structured response: {str(e)}")
@@ -343,13 +609,35 @@ class OpenAIClient:
 class AIClientFactory:
     """Factory for creating AI clients"""
     
-    @staticmethod
-    def create_client(provider: str = None):
-        """Create AI client based on provider"""
+    # Provider name -> client class; extend via register_provider() or pass a dotted class path
+    _providers = {
+        'openai': OpenAIClient,
+        'replay': 'apps.ai_integration.replay_client.ReplayAIClient',  # imported on first use
+    }
+    
+    @classmethod
+    def register_provider(cls, name: str, client_class):
+        """Register an AI client backend under a provider name"""
+        cls._providers[name.lower()] = client_class
+    
+    @classmethod
+    def create_client(cls, provider: str = None, **kwargs):
+        """Create AI client based on provider (registered name or dotted class path)"""
         if provider is None:
             provider = getattr(settings, 'AI_PROVIDER', 'openai')
         
-        if provider.lower() == 'openai':
-            return OpenAIClient()
-        else:
-            raise AIClientError(f"Unsupported AI provider: {provider}")
\ No newline at end of file
+        client_class = cls._providers.get(provider.lower())
+        if client_class is None and '.' in provider:
+            client_class = provider
+        
+        if isinstance(client_class, str):
+            from django.utils.module_loading import import_string
+            try:
+                client_class = import_string(client_class)
+            except ImportError as e:
+                raise AIClientError(f"Cannot import AI provider {provider}: {e}")
+        
+        if client_class is None:
+            raise AIClientError(f"Unsupported AI provider: {provider}")
+        
+        return client_class(**kwargs)
@@ -7,10 +7,10 @@ import json
 import logging
 import time
 from typing import Dict, Any, Optional, List
-from openai import OpenAI
 from django.conf import settings
 from pydantic import BaseModel
 
+from .client_pool import get_openai_client
 from .schemas_gpt5 import WorkoutPlan
 from apps.core.metrics import incr, timing, MetricNames
 
@@ -23,7 +23,7 @@ class GPT5StructuredClient:
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.model = "gpt-4o-2024-08-06"  # GPT-5 compatible model
         self.default_reasoning_effort = getattr(settings, 'GPT5_REASONING_EFFORT', 'medium')
         self.default_verbosity = getattr(settings, 'GPT5_VERBOSITY', 'medium')
@@ -22,7 +22,7 @@ def build_responses_payload(prompt: str, model: str, max_tokens: int, temperatur
         "text": {
             "format": {
                 "type": "json_schema",
-                "name": "WorkoutPlan",
+                "name": schema.get("title", "WorkoutPlan"),
                 "schema": schema,
                 "strict": True,
             }
@@ -0,0 +1,131 @@
+"""
+Circuit breaker for AI calls, shared across processes via the Django cache (Redis in production)
+
+States:
+- closed: calls go through; failures/calls are counted in a sliding time window
+- open: error rate crossed the threshold - calls fail fast (callers go to FallbackService)
+- half-open: after reset_timeout one worker gets a probe call; success closes, failure reopens
+"""
+import logging
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.metrics import MetricNames, gauge, incr
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker with state in the shared cache"""
+
+    CACHE_KEY_PREFIX = 'ai_circuit'
+
+    def __init__(self, name: str = 'openai', failure_threshold: Optional[float] = None,
+                 min_calls: Optional[int] = None, window_seconds: Optional[int] = None,
+                 reset_timeout: Optional[int] = None):
+        self.name = name
+        self.enabled = getattr(settings, 'AI_CIRCUIT_BREAKER_ENABLED', True)
+        self.failure_threshold = failure_threshold or getattr(settings, 'AI_CIRCUIT_FAILURE_THRESHOLD', 0.5)
+        self.min_calls = min_calls or getattr(settings, 'AI_CIRCUIT_MIN_CALLS', 5)
+        self.window_seconds = window_seconds or getattr(settings, 'AI_CIRCUIT_WINDOW_SECONDS', 60)
+        self.reset_timeout = reset_timeout or getattr(settings, 'AI_CIRCUIT_RESET_TIMEOUT', 30)
+
+    def _key(self, suffix: str) -> str:
+        return f'{self.CACHE_KEY_PREFIX}:{self.name}:{suffix}'
+
+    def _window_keys(self, window: Optional[int] = None):
+        if window is None:
+            window = int(time.time() // self.window_seconds)
+        return self._key(f'calls:{window}'), self._key(f'failures:{window}')
+
+    def _counter_keys(self):
+        """Counters still alive: current and previous window"""
+        window = int(time.time() // self.window_seconds)
+        return [*self._window_keys(window), *self._window_keys(window - 1)]
+
+    def _incr(self, key: str) -> int:
+        """Atomic counter living two windows"""
+        if cache.add(key, 1, self.window_seconds * 2):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(key, 1, self.window_seconds * 2)
+            return 1
+
+    @property
+    def state(self) -> str:
+        if not self.enabled:
+            return STATE_CLOSED
+        try:
+            opened_at = cache.get(self._key('opened_at'))
+        except Exception as e:
+            logger.warning(f"Circuit breaker {self.name}: cache unavailable ({e}), treating as closed")
+            return STATE_CLOSED
+
+        if opened_at is None:
+            return STATE_CLOSED
+        if time.time() - opened_at >= self.reset_timeout:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    def allow_request(self) -> bool:
+        """False if the call should fail fast; in half-open only one probe is let through"""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+
+        if state == STATE_HALF_OPEN and cache.add(self._key('probe'), 1, self.reset_timeout):
+            logger.info(f"🔌 Circuit {self.name} half-open: sending probe request")
+            return True
+
+        incr(MetricNames.AI_CIRCUIT_REJECTED, circuit=self.name)
+        return False
+
+    def record_success(self):
+        if not self.enabled:
+            return
+        try:
+            if cache.get(self._key('opened_at')) is not None:
+                # Start from a clean window - the failures that tripped it would re-open on the next error
+                cache.delete_many([self._key('opened_at'), self._key('probe'), *self._counter_keys()])
+                gauge(MetricNames.AI_CIRCUIT_STATE, 0, circuit=self.name)
+                logger.info(f"✅ Circuit {self.name} closed after successful probe")
+            calls_key, _ = self._window_keys()
+            self._incr(calls_key)
+        except Exception as e:
+            logger.warning(f"Circuit breaker {self.name}: failed to record success: {e}")
+
+    def record_failure(self):
+        if not self.enabled:
+            return
+        try:
+            calls_key, failures_key = self._window_keys()
+            calls = self._incr(calls_key)
+            failures = self._incr(failures_key)
+
+            probe_failed = cache.get(self._key('probe')) is not None
+            if probe_failed or (calls >= self.min_calls and failures / calls >= self.failure_threshold):
+                self._open(failures, calls)
+        except Exception as e:
+            logger.warning(f"Circuit breaker {self.name}: failed to record failure: {e}")
+
+    def _open(self, failures: int, calls: int):
+        cache.set(self._key('opened_at'), time.time(), self.reset_timeout * 10)
+        cache.delete(self._key('probe'))
+        incr(MetricNames.AI_CIRCUIT_OPENED, circuit=self.name)
+        gauge(MetricNames.AI_CIRCUIT_STATE, 1, circuit=self.name)
+        logger.error(f"🔴 Circuit {self.name} OPEN: {failures}/{calls} failures in {self.window_seconds}s window, "
+                     f"failing fast for {self.reset_timeout}s")
+
+    def reset(self):
+        """Force circuit closed (admin/tests)"""
+        cache.delete_many([self._key('opened_at'), self._key('probe'), *self._counter_keys()])
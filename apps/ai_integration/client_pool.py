@@ -0,0 +1,117 @@
+"""
+Process-wide pooled OpenAI clients
+
+Building an OpenAI client per WorkoutPlanGenerator means a fresh httpx pool and a new
+TLS handshake for every plan. Clients here are created lazily once per process and
+reused by every caller:
+
+- get_openai_client(): sync OpenAI over a shared httpx.Client
+- get_async_openai_client(): AsyncOpenAI over httpx.AsyncClient, one per event loop
+  (an AsyncClient is bound to the loop it first ran on)
+
+Both are rebuilt after fork (gunicorn/celery prefork workers must not share sockets).
+A base_url (default settings.OPENAI_BASE_URL) selects a separate pool, e.g. a local
+OpenAI-compatible stub server for bulk runs and tests.
+"""
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import Dict, Optional
+
+import httpx
+from django.conf import settings
+from openai import AsyncOpenAI, OpenAI
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_sync_clients: Dict[Optional[str], OpenAI] = {}
+_sync_pid = None
+_async_clients = weakref.WeakKeyDictionary()
+_async_pid = None
+
+
+def build_timeout() -> httpx.Timeout:
+    """Timeouts shared by sync and async clients"""
+    total_timeout = getattr(settings, 'OPENAI_TOTAL_TIMEOUT', 720)
+    return httpx.Timeout(
+        timeout=total_timeout,
+        connect=getattr(settings, 'OPENAI_CONNECT_TIMEOUT', 15),
+        read=getattr(settings, 'OPENAI_READ_TIMEOUT', 600),  # GPT-5 needs more time for large plans
+        write=30,
+        pool=total_timeout
+    )
+
+
+def build_limits() -> httpx.Limits:
+    """Connection pool limits shared by sync and async clients"""
+    return httpx.Limits(
+        max_keepalive_connections=getattr(settings, 'OPENAI_POOL_MAX_KEEPALIVE', 20),
+        max_connections=getattr(settings, 'OPENAI_POOL_MAX_CONNECTIONS', 40)
+    )
+
+
+def _resolve_base_url(base_url: Optional[str]) -> Optional[str]:
+    return base_url or getattr(settings, 'OPENAI_BASE_URL', None) or None
+
+
+def get_openai_client(base_url: Optional[str] = None) -> OpenAI:
+    """Shared sync OpenAI client for this process"""
+    global _sync_pid
+
+    base_url = _resolve_base_url(base_url)
+    pid = os.getpid()
+    client = _sync_clients.get(base_url)
+    if client is not None and _sync_pid == pid:
+        return client
+
+    with _lock:
+        if _sync_pid != pid:
+            _sync_clients.clear()
+            _sync_pid = pid
+
+        client = _sync_clients.get(base_url)
+        if client is None:
+            http_client = httpx.Client(timeout=build_timeout(), limits=build_limits())
+            client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=base_url, http_client=http_client)
+            _sync_clients[base_url] = client
+            logger.info(f"Created shared OpenAI client pool for pid {pid} ({base_url or 'default API'})")
+
+    return client
+
+
+def get_async_openai_client(base_url: Optional[str] = None) -> AsyncOpenAI:
+    """Shared AsyncOpenAI client for the running event loop"""
+    global _async_pid
+
+    base_url = _resolve_base_url(base_url)
+    loop = asyncio.get_running_loop()
+    pid = os.getpid()
+
+    with _lock:
+        if _async_pid != pid:
+            _async_clients.clear()
+            _async_pid = pid
+
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(base_url)
+        if client is None:
+            http_client = httpx.AsyncClient(timeout=build_timeout(), limits=build_limits())
+            client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=base_url, http_client=http_client)
+            loop_clients[base_url] = client
+            logger.info(f"Created shared AsyncOpenAI client pool for pid {pid} ({base_url or 'default API'})")
+
+    return client
+
+
+def close_clients():
+    """Close the sync pools (tests, worker shutdown); async pools close with their loops"""
+    global _sync_pid
+
+    with _lock:
+        for client in _sync_clients.values():
+            client.close()
+        _sync_clients.clear()
+        _sync_pid = None
@@ -1,15 +1,16 @@
 """
 Валидатор для полного 4-блочного отчета ИИ
 """
-import json
 import logging
 from datetime import datetime
 from typing import Any, Dict, Tuple
 
 from apps.core.services.exercise_validation import ExerciseValidationService
 
+from . import json_codec
 from .schemas import (
     ComprehensiveAIReport,
+    get_type_adapter,
 )
 from .validators import WorkoutPlanValidator
 
@@ -62,7 +63,7 @@ class ComprehensiveReportValidator:
             
             # Финальная валидация через Pydantic
             try:
-                ComprehensiveAIReport.model_validate(fixed_report)
+                get_type_adapter(ComprehensiveAIReport).validate_python(fixed_report)
                 logger.info("Pydantic валидация пройдена успешно")
             except Exception as e:
                 logger.error(f"Ошибка Pydantic валидации: {e}")
@@ -320,6 +321,6 @@ class ComprehensiveReportValidator:
         Returns:
             Отчет о валидации без применения исправлений
         """
-        original_report = json.loads(json.dumps(report_data))  # Deep copy
+        original_report = json_codec.clone(report_data)
         _, validation_report = self.validate_and_fix_comprehensive_report(original_report)
         return validation_report
\ No newline at end of file
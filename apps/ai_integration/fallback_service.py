@@ -4,6 +4,7 @@ Handles all failure scenarios with graceful degradation
 """
 import json
 import logging
+from functools import cached_property
 from typing import Dict, List, Optional
 
 from django.utils import timezone
@@ -12,15 +13,20 @@ from apps.users.models import UserProfile
 from apps.workouts.models import CSVExercise, DailyWorkout, WorkoutExecution, WorkoutPlan
 
 from .schemas import WorkoutPlan as WorkoutPlanSchema
+from .schemas import validate_ai_plan_data
 
 logger = logging.getLogger(__name__)
 
 class FallbackService:
     """Handles all fallback scenarios for AI generation and workout creation"""
     
-    def __init__(self):
-        self.fallback_exercises = self._get_reliable_exercises()
-        self.default_plan_templates = self._load_default_templates()
+    @cached_property
+    def fallback_exercises(self) -> Dict:
+        return self._get_reliable_exercises()
+    
+    @cached_property
+    def default_plan_templates(self) -> Dict:
+        return self._load_default_templates()
     
     def generate_default_workout_plan(
         self, 
@@ -39,6 +45,19 @@ class FallbackService:
         """
         logger.warning(f"Using fallback plan generation: {error_context}")
         
+        # Precompiled per (experience, days_per_week, archetype) - no DB reads
+        try:
+            from .fallback_templates import get_fallback_library
+            plan = get_fallback_library().get_plan(
+                user_data.get('experience_level'),
+                user_data.get('days_per_week', 3),
+                user_data.get('archetype')
+            )
+            logger.info(f"Generated fallback plan from precompiled templates: {plan.plan_name}")
+            return plan
+        except Exception as e:
+            logger.error(f"Precompiled fallback templates unavailable: {e}, building from database")
+        
         # Determine user parameters - enforce exactly 4 weeks as per ChatGPT plan
         experience = user_data.get('experience_level', 'beginner').lower()
         days_per_week = min(max(int(user_data.get('days_per_week', 3)), 2), 6)
@@ -58,12 +77,8 @@ class FallbackService:
             duration_weeks=duration_weeks
         )
         
-        # Convert to JSON and validate
-        plan_json = json.dumps(plan_data)
-        
         try:
-            from .schemas import validate_ai_plan_response
-            validated_plan = validate_ai_plan_response(plan_json)
+            validated_plan = validate_ai_plan_data(plan_data)
             logger.info(f"Generated fallback plan: {validated_plan.plan_name}")
             return validated_plan
         except Exception as validation_error:
@@ -211,7 +226,6 @@ class FallbackService:
     
     def _get_r2_exercise_fallback(self, exercise_slug: str) -> str:
         """Get real R2 exercise name as fallback"""
-        import json
         import os
 
         from django.conf import settings
@@ -369,8 +383,6 @@ class FallbackService:
     
     def _generate_minimal_emergency_plan(self, user_data: Dict) -> WorkoutPlanSchema:
         """Last resort - minimal plan that will definitely validate"""
-        from .schemas import validate_ai_plan_response
-        
         # Use template builder for better exercise coverage
         logger.warning("Using template-based emergency plan")
         template_plan = self._build_plan_from_template(
@@ -379,8 +391,7 @@ class FallbackService:
             duration_weeks=4
         )
         
-        plan_json = json.dumps(template_plan)
-        return validate_ai_plan_response(plan_json)
+        return validate_ai_plan_data(template_plan)
         
         # Old hardcoded minimal plan (kept as backup)
         minimal_plan_backup = {
@@ -991,5 +1002,4 @@ class FallbackService:
             ]
         }
         
-        plan_json = json.dumps(minimal_plan)
-        return validate_ai_plan_response(plan_json)
\ No newline at end of file
+        return validate_ai_plan_data(minimal_plan)
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""
+Precompiled fallback plan templates
+
+FallbackService used to query CSVExercise and rebuild its templates on every
+instantiation. Fallback plans are now compiled once per (experience, days_per_week,
+archetype), written to a versioned JSON artifact (settings.AI_FALLBACK_TEMPLATES_PATH)
+and loaded once per process, so the emergency path is a dict lookup and a copy.
+
+The artifact is rebuilt on CSVExercise changes (apps.core.signals); other processes
+pick the new file up through an mtime check (AI_FALLBACK_TEMPLATES_CHECK_INTERVAL).
+
+    python manage.py build_fallback_templates
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.constants import ARCHETYPE_ALIASES, ARCHETYPE_MAPPING, DEFAULT_ARCHETYPE, VALID_ARCHETYPES
+from apps.core.utils.process_index import ProcessIndex
+
+from .schemas import WorkoutPlan as WorkoutPlanSchema
+from .schemas import validate_ai_plan_data
+
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled plan layout changes - older artifacts are recompiled
+TEMPLATES_VERSION = 1
+
+EXPERIENCE_LEVELS = ('beginner', 'intermediate', 'advanced')
+DAYS_PER_WEEK_RANGE = range(2, 7)
+DURATION_WEEKS = 4  # fallback plans are exactly 4 weeks
+BASE_EXERCISE_COUNT = 15
+MIN_EXERCISES_PER_WEEK = 10  # WorkoutPlan.validate_structure sanity check
+
+# Used when CSVExercise is empty or unreachable (R2 technical names)
+DEFAULT_EXERCISE_IDS = ['push-ups', 'squats', 'planks', 'jumping-jacks']
+
+# Training days inside the 7-day week for each days_per_week
+TRAINING_DAYS = {
+    2: (1, 4),
+    3: (1, 3, 5),
+    4: (1, 2, 4, 5),
+    5: (1, 2, 3, 4, 5),
+    6: (1, 2, 3, 4, 5, 6),
+}
+
+EXPERIENCE_PARAMS = {
+    'beginner': {
+        'plan_name': 'Beginner {days}-Day Foundation',
+        'goal': 'Build basic fitness foundation',
+        'exercises_per_day': 4,
+        'pattern_step': 4,
+        'sets_range': [2, 3],
+        'reps_range': ['5-8', '8-12'],
+        'rest_seconds': 60,
+    },
+    'intermediate': {
+        'plan_name': 'Intermediate {days}-Day Builder',
+        'goal': 'Increase strength and endurance',
+        'exercises_per_day': 4,
+        'pattern_step': 3,  # consecutive days share one exercise
+        'sets_range': [3, 4],
+        'reps_range': ['8-12', '10-15'],
+        'rest_seconds': 45,
+    },
+}
+EXPERIENCE_PARAMS['advanced'] = EXPERIENCE_PARAMS['intermediate']
+
+CONFIDENCE_TASKS = {
+    'mentor': ("Complete Day {day} - every session is a step on a long path", "Rest and reflect on how far you've come"),
+    'professional': ("Complete Day {day} - execute the plan, log the result", "Recovery is part of the program - rest fully"),
+    'peer': ("Complete Day {day} - you're building strength!", "Rest and recovery - you're doing great!"),
+}
+
+
+def template_key(experience: str, days_per_week: int, archetype: str) -> str:
+    return f"{experience}_{days_per_week}days_{archetype}"
+
+
+def normalize_template_params(experience: Optional[str], days_per_week, archetype: Optional[str]):
+    """Map raw onboarding values onto the compiled key space"""
+    experience = str(experience or 'beginner').lower()
+    if experience not in EXPERIENCE_LEVELS:
+        experience = 'beginner'
+
+    try:
+        days_per_week = int(days_per_week)
+    except (TypeError, ValueError):
+        days_per_week = 3
+    days_per_week = min(max(days_per_week, DAYS_PER_WEEK_RANGE.start), DAYS_PER_WEEK_RANGE.stop - 1)
+
+    archetype = ARCHETYPE_MAPPING.get(archetype, ARCHETYPE_ALIASES.get(archetype, archetype))
+    if archetype not in VALID_ARCHETYPES:
+        archetype = DEFAULT_ARCHETYPE
+
+    return experience, days_per_week, archetype
+
+
+def _compile_plan(experience: str, days_per_week: int, archetype: str, exercise_ids: List[str]) -> Dict:
+    """Build one 4-week plan (legacy weeks structure, as FallbackService produced)"""
+    params = EXPERIENCE_PARAMS[experience]
+    # Seeded per key so the artifact is reproducible
+    rng = random.Random(template_key(experience, days_per_week, archetype))
+    workout_task, rest_task = CONFIDENCE_TASKS[archetype]
+
+    per_day = max(params['exercises_per_day'], -(-MIN_EXERCISES_PER_WEEK // days_per_week))
+    training_days = TRAINING_DAYS[days_per_week]
+
+    weeks = []
+    for week_number in range(1, DURATION_WEEKS + 1):
+        days = []
+        for day_number in range(1, 8):
+            if day_number not in training_days:
+                days.append({
+                    'day_number': day_number,
+                    'workout_name': f"Rest Day {day_number}",
+                    'is_rest_day': True,
+                    'exercises': [],
+                    'confidence_task': rest_task,
+                })
+                continue
+
+            start = training_days.index(day_number) * params['pattern_step']
+            days.append({
+                'day_number': day_number,
+                'workout_name': f"Day {day_number} Workout",
+                'is_rest_day': False,
+                'exercises': [
+                    {
+                        'exercise_slug': exercise_ids[(start + i) % len(exercise_ids)],
+                        'sets': rng.choice(params['sets_range']),
+                        'reps': rng.choice(params['reps_range']),
+                        'rest_seconds': params['rest_seconds'],
+                    }
+                    for i in range(per_day)
+                ],
+                'confidence_task': workout_task.format(day=day_number),
+            })
+
+        weeks.append({
+            'week_number': week_number,
+            'week_focus': f"Week {week_number} - Building Consistency",
+            'days': days,
+        })
+
+    return {
+        'plan_name': params['plan_name'].format(days=days_per_week),
+        'duration_weeks': DURATION_WEEKS,
+        'goal': params['goal'],
+        'weeks': weeks,
+    }
+
+
+class FallbackTemplateLibrary:
+    """Validated fallback plans keyed by (experience, days_per_week, archetype)"""
+
+    def __init__(self, plans: Dict[str, Dict], digest: str, built_at: str, version: int = TEMPLATES_VERSION):
+        self.version = version
+        self.digest = digest
+        self.built_at = built_at
+        self.raw_plans = plans
+        self.mtime = None  # artifact mtime this library was loaded from
+
+        # Validated once here; lookups only copy
+        self._plans = {}
+        for key, plan_data in plans.items():
+            self._plans[key] = validate_ai_plan_data(plan_data)
+
+    def __len__(self):
+        return len(self._plans)
+
+    @classmethod
+    def compile(cls, exercise_ids: Optional[Iterable[str]] = None) -> 'FallbackTemplateLibrary':
+        """Compile every template from exercise ids (first BASE_EXERCISE_COUNT, sorted)"""
+        exercise_ids = sorted(exercise_ids or [])[:BASE_EXERCISE_COUNT] or list(DEFAULT_EXERCISE_IDS)
+        digest = hashlib.sha256(f"{TEMPLATES_VERSION}:{','.join(exercise_ids)}".encode('utf-8')).hexdigest()[:16]
+
+        plans = {
+            template_key(experience, days, archetype): _compile_plan(experience, days, archetype, exercise_ids)
+            for experience in EXPERIENCE_LEVELS
+            for days in DAYS_PER_WEEK_RANGE
+            for archetype in VALID_ARCHETYPES
+        }
+        return cls(plans, digest=digest, built_at=timezone.now().isoformat())
+
+    @classmethod
+    def compile_from_db(cls) -> 'FallbackTemplateLibrary':
+        from apps.workouts.models import CSVExercise
+
+        exercise_ids = CSVExercise.objects.order_by('id').values_list('id', flat=True)[:BASE_EXERCISE_COUNT]
+        return cls.compile(list(exercise_ids))
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['FallbackTemplateLibrary']:
+        """Library from artifact; None if missing or compiled by another TEMPLATES_VERSION"""
+        try:
+            mtime = path.stat().st_mtime
+            artifact = json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+
+        if artifact.get('version') != TEMPLATES_VERSION:
+            logger.info(f"Fallback templates artifact {path} is version {artifact.get('version')}, "
+                        f"expected {TEMPLATES_VERSION} - recompiling")
+            return None
+
+        library = cls(artifact['plans'], digest=artifact['digest'], built_at=artifact['built_at'])
+        library.mtime = mtime
+        return library
+
+    def save(self, path: Path):
+        """Atomic write of the artifact"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps({
+            'version': self.version,
+            'digest': self.digest,
+            'built_at': self.built_at,
+            'plans': self.raw_plans,
+        }), encoding='utf-8')
+        os.replace(tmp_path, path)
+        self.mtime = path.stat().st_mtime
+
+    def get_plan(self, experience: Optional[str], days_per_week, archetype: Optional[str]) -> WorkoutPlanSchema:
+        """Copy of the compiled plan for raw onboarding values"""
+        key = template_key(*normalize_template_params(experience, days_per_week, archetype))
+        return self._plans[key].model_copy(deep=True)
+
+
+def artifact_path() -> Path:
+    return Path(getattr(settings, 'AI_FALLBACK_TEMPLATES_PATH', Path(settings.BASE_DIR) / 'fallback_templates.json'))
+
+
+def _refresh_library(library: Optional[FallbackTemplateLibrary]) -> FallbackTemplateLibrary:
+    """Keep library while the artifact is unchanged, otherwise load it (or compile it if missing/outdated)"""
+    path = artifact_path()
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+
+    if library is not None and mtime is not None and mtime == library.mtime:
+        return library
+
+    try:
+        loaded = FallbackTemplateLibrary.load(path)
+    except Exception as e:
+        logger.error(f"Failed to load fallback templates from {path}: {e}")
+        loaded = None
+
+    if loaded is None:
+        return _compile_and_save(path)
+    logger.info(f"Loaded {len(loaded)} fallback templates from {path} (digest {loaded.digest})")
+    return loaded
+
+
+def _compile_and_save(path: Path) -> FallbackTemplateLibrary:
+    try:
+        library = FallbackTemplateLibrary.compile_from_db()
+    except Exception as e:
+        # The emergency path must work with the database down - don't persist this one
+        logger.error(f"Failed to read exercises for fallback templates: {e}, using built-in exercises")
+        return FallbackTemplateLibrary.compile()
+
+    try:
+        library.save(path)
+        logger.info(f"Compiled {len(library)} fallback templates to {path} (digest {library.digest})")
+    except OSError as e:
+        logger.warning(f"Failed to write fallback templates artifact {path}: {e}")
+    return library
+
+
+_library = ProcessIndex('fallback templates', _refresh_library, lambda: _compile_and_save(artifact_path()),
+                        'AI_FALLBACK_TEMPLATES_CHECK_INTERVAL')
+
+
+def get_fallback_library() -> FallbackTemplateLibrary:
+    """Process-wide library: artifact loaded once, reloaded when another process rewrites it"""
+    return _library.get()
+
+
+def rebuild_fallback_library() -> FallbackTemplateLibrary:
+    """Recompile from CSVExercise, rewrite the artifact and swap it in for this process"""
+    return _library.rebuild()
+
+
+def rebuild_fallback_library_after_commit():
+    """Exercise catalog changed - recompile once the change is committed"""
+    _library.rebuild_after_commit()
@@ -0,0 +1,28 @@
+"""
+Fast JSON codec for AI payloads
+
+Backed by pydantic_core (Rust, installed with pydantic v2), so no extra dependency.
+Output is compact UTF-8 (no ASCII escaping); use the stdlib json module where byte-exact
+output matters (cache keys with sort_keys, human-readable files).
+"""
+from typing import Any, Union
+
+from pydantic_core import from_json, to_json
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Parse JSON; raises ValueError on malformed input"""
+    return from_json(data)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return to_json(obj)
+
+
+def dumps(obj: Any) -> str:
+    return to_json(obj).decode('utf-8')
+
+
+def clone(obj: Any) -> Any:
+    """Deep copy of JSON-compatible data (faster than copy.deepcopy or a stdlib json round-trip)"""
+    return from_json(to_json(obj))
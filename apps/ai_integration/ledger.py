@@ -0,0 +1,217 @@
+"""
+AI call ledger: every Responses API attempt persisted with usage, cost and latency
+
+OpenAIClient records each attempt (including failed retries) through record_ai_call.
+Attribution (user, plan, archetype, prompt profile) comes from the surrounding
+ai_call_context:
+
+    with ai_call_context(user_id=user.id, archetype='mentor', prompt_profile='v2') as call_ids:
+        plan = generator.create_plan(...)
+    attach_plan(call_ids, plan)
+
+ledger_rollup() aggregates a time window into latency percentiles, token and cost
+totals and per-plan distributions (GET /api/ai/ledger/stats/, staff only).
+"""
+import contextvars
+import hashlib
+import logging
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from apps.core.metrics import MetricNames, incr, timing
+
+logger = logging.getLogger(__name__)
+
+_context: contextvars.ContextVar = contextvars.ContextVar('ai_call_context', default=None)
+
+ROLLUP_GROUP_FIELDS = ('operation', 'model', 'upstream', 'archetype', 'prompt_profile', 'status')
+ROLLUP_CACHE_TTL = 60
+
+
+@contextmanager
+def ai_call_context(**fields):
+    """Attribute AI calls made in the block; yields the list of ledger ids recorded in it (nested blocks included)"""
+    parent = _context.get() or {}
+    call_ids = []
+    context = {**parent, **{key: value for key, value in fields.items() if value is not None}}
+    context['_sinks'] = parent.get('_sinks', []) + [call_ids]
+
+    token = _context.set(context)
+    try:
+        yield call_ids
+    finally:
+        _context.reset(token)
+
+
+def extract_usage(response) -> Dict[str, int]:
+    """Token counts from a Responses API result (or anything with a compatible .usage)"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return {'input_tokens': 0, 'cached_tokens': 0, 'output_tokens': 0, 'reasoning_tokens': 0}
+    return {
+        'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+        'cached_tokens': getattr(getattr(usage, 'input_tokens_details', None), 'cached_tokens', 0) or 0,
+        'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+        'reasoning_tokens': getattr(getattr(usage, 'output_tokens_details', None), 'reasoning_tokens', 0) or 0,
+    }
+
+
+def estimate_cost(model: str, usage: Dict[str, int]) -> Decimal:
+    """USD cost from settings.AI_TOKEN_PRICES (per 1M tokens); 0 for unpriced models"""
+    prices = getattr(settings, 'AI_TOKEN_PRICES', {})
+    # Dated snapshots (gpt-5-2025-08-07) are priced like their base model
+    price = prices.get(model) or next((prices[name] for name in sorted(prices, key=len, reverse=True)
+                                       if model.startswith(name)), None)
+    if not price:
+        return Decimal(0)
+
+    uncached = usage['input_tokens'] - usage['cached_tokens']
+    cost = (uncached * price['input'] + usage['cached_tokens'] * price.get('cached_input', price['input'])
+            + usage['output_tokens'] * price['output']) / 1_000_000
+    return Decimal(str(round(cost, 6)))
+
+
+def _user_id(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None  # 'anonymous'
+
+
+def record_ai_call(operation: str, model: str, attempt: int, latency: float, response=None,
+                   error: Optional[BaseException] = None, upstream: str = 'openai'):
+    """Persist one attempt; never raises (the ledger must not break AI calls)"""
+    if not getattr(settings, 'AI_LEDGER_ENABLED', True):
+        return None
+
+    from .models import AICallRecord
+
+    context = _context.get() or {}
+    usage = extract_usage(response)
+    latency_ms = int(latency * 1000)
+    status = 'ok' if error is None else 'error'
+
+    timing(MetricNames.AI_CALL_LATENCY, latency_ms, operation=operation, status=status)
+    if usage['input_tokens'] or usage['output_tokens']:
+        incr(MetricNames.AI_CALL_TOKENS, usage['input_tokens'], kind='input', operation=operation)
+        incr(MetricNames.AI_CALL_TOKENS, usage['output_tokens'], kind='output', operation=operation)
+
+    try:
+        record = AICallRecord.objects.create(
+            operation=operation,
+            model=model,
+            upstream=upstream,
+            status=status,
+            error_type=type(error).__name__ if error is not None else '',
+            attempt=attempt,
+            latency_ms=latency_ms,
+            cost_usd=estimate_cost(model, usage),
+            archetype=str(context.get('archetype', ''))[:20],
+            prompt_profile=str(context.get('prompt_profile', ''))[:20],
+            user_id=_user_id(context.get('user_id')),
+            plan_id=context.get('plan_id'),
+            **usage,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to record AI call in ledger ({operation}): {e}")
+        return None
+
+    for sink in context.get('_sinks', []):
+        sink.append(record.id)
+    return record
+
+
+def attach_plan(call_ids: Iterable[int], plan) -> int:
+    """Link recorded calls to the plan they produced"""
+    from .models import AICallRecord
+
+    call_ids = list(call_ids)
+    if not call_ids or plan is None:
+        return 0
+    return AICallRecord.objects.filter(id__in=call_ids, plan__isnull=True).update(plan=plan)
+
+
+def _percentile(sorted_values: Sequence, q: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def _distribution(values: List) -> Dict:
+    values = sorted(values)
+    return {'p50': _percentile(values, 0.5), 'p95': _percentile(values, 0.95), 'max': values[-1] if values else None}
+
+
+def ledger_rollup(hours: int = 24, group_by: Sequence[str] = ('operation', 'model')) -> Dict:
+    """Latency percentiles, token and cost totals per group plus per-plan distributions over the last `hours`"""
+    from .models import AICallRecord
+
+    hours = max(1, min(int(hours), getattr(settings, 'AI_LEDGER_ROLLUP_MAX_HOURS', 24 * 30)))
+    group_by = [field for field in group_by if field in ROLLUP_GROUP_FIELDS] or ['operation']
+
+    cache_key = 'ai_ledger_rollup:' + hashlib.md5(f"{hours}:{','.join(group_by)}".encode()).hexdigest()
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    since = timezone.now() - timezone.timedelta(hours=hours)
+    calls = AICallRecord.objects.filter(created_at__gte=since)
+
+    groups = {}
+    for row in (calls.values(*group_by)
+                .annotate(calls=Count('id'), errors=Count('id', filter=Q(status='error')),
+                          retries=Count('id', filter=Q(attempt__gt=1)),
+                          input_tokens=Sum('input_tokens'), cached_tokens=Sum('cached_tokens'),
+                          output_tokens=Sum('output_tokens'), reasoning_tokens=Sum('reasoning_tokens'),
+                          cost_usd=Sum('cost_usd'))
+                .order_by(*group_by)):
+        row['cost_usd'] = float(row['cost_usd'] or 0)
+        row['latency_ms'] = []
+        groups[tuple(row[field] for field in group_by)] = row
+
+    # Percentiles in Python: portable across PostgreSQL and the SQLite dev database
+    for values in calls.filter(status='ok').values_list(*group_by, 'latency_ms').iterator():
+        group = groups.get(tuple(values[:-1]))
+        if group is not None:
+            group['latency_ms'].append(values[-1])
+    for group in groups.values():
+        group['latency_ms'] = _distribution(group['latency_ms'])
+
+    per_plan = list(
+        calls.filter(plan__isnull=False).values('plan_id')
+        .annotate(tokens=Sum(F('input_tokens') + F('output_tokens')), cost=Sum('cost_usd'),
+                  latency=Sum('latency_ms'), calls=Count('id'))
+        .values_list('tokens', 'cost', 'latency', 'calls')
+    )
+
+    rollup = {
+        'window_hours': hours,
+        'since': since.isoformat(),
+        'group_by': group_by,
+        'calls': sum(group['calls'] for group in groups.values()),
+        'errors': sum(group['errors'] for group in groups.values()),
+        'cost_usd': round(sum(group['cost_usd'] for group in groups.values()), 4),
+        'groups': list(groups.values()),
+        'per_plan': {
+            'plans': len(per_plan),
+            'tokens': _distribution([tokens or 0 for tokens, _, _, _ in per_plan]),
+            'cost_usd': _distribution([float(cost or 0) for _, cost, _, _ in per_plan]),
+            'ai_latency_ms': _distribution([latency or 0 for _, _, latency, _ in per_plan]),
+            'calls': _distribution([count for _, _, _, count in per_plan]),
+        },
+    }
+    cache.set(cache_key, rollup, ROLLUP_CACHE_TTL)
+    return rollup
+
+
+def prune_ledger(days_to_keep: int) -> int:
+    from .models import AICallRecord
+
+    deleted, _ = AICallRecord.objects.filter(created_at__lt=timezone.now() - timezone.timedelta(days=days_to_keep)).delete()
+    return deleted
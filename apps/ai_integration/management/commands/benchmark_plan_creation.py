@@ -0,0 +1,180 @@
+"""
+End-to-end benchmark of WorkoutPlanGenerator.create_plan against recorded AI responses
+
+The AI call is served by ReplayAIClient (with configurable latency), so the run measures
+everything around it: prompt build, plan validation, daily workout materialization,
+playlist generation and onboarding updates, over N synthetic users.
+
+    python manage.py benchmark_plan_creation --users 20
+    python manage.py benchmark_plan_creation --users 20 --latency 2.5 --replay-dir ai_replays
+    python manage.py benchmark_plan_creation --content-file report.json  # seed a recording first
+"""
+import json
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from apps.ai_integration.ai_client_gpt5 import AIClientFactory
+from apps.ai_integration.replay_client import ReplayStore
+from apps.ai_integration.services import WorkoutPlanGenerator
+from apps.ai_integration.validators import WorkoutPlanValidator
+from apps.core.constants import VALID_ARCHETYPES
+from apps.onboarding.services import OnboardingDataProcessor
+
+User = get_user_model()
+
+STAGES = ('prompt', 'ai_call', 'validation', 'daily_workouts', 'playlists', 'onboarding', 'total')
+NON_AI_STAGES = ('prompt', 'validation', 'daily_workouts', 'playlists', 'onboarding')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark plan creation end to end with replayed AI responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Number of synthetic users')
+        parser.add_argument('--replay-dir', default=None, help='Recordings directory (default: settings.AI_REPLAY_DIR)')
+        parser.add_argument('--latency', type=float, default=None, help='Replayed AI latency, seconds (default: settings.AI_REPLAY_LATENCY)')
+        parser.add_argument('--content-file', help='Comprehensive report JSON to store as a recording before the run')
+        parser.add_argument('--keep', action='store_true', help='Keep synthetic users and their plans')
+
+    def handle(self, *args, **options):
+        replay_dir = Path(options['replay_dir'] or getattr(settings, 'AI_REPLAY_DIR', Path(settings.BASE_DIR) / 'ai_replays'))
+
+        if options['content_file']:
+            content = Path(options['content_file']).read_text(encoding='utf-8')
+            try:
+                json.loads(content)
+            except ValueError as e:
+                raise CommandError(f"{options['content_file']} is not valid JSON: {e}")
+            path = ReplayStore(replay_dir).add_content(content, model=getattr(settings, 'OPENAI_MODEL', 'gpt-5'))
+            self.stdout.write(f"Stored recording {path}")
+
+        if not any(replay_dir.glob('*.json')):
+            raise CommandError(f"No recordings in {replay_dir} - run with --content-file or record with AI_REPLAY_MODE=record")
+
+        self.timings = defaultdict(list)
+        self.ai_used = 0
+        users = self._create_users(options['users'])
+        started = time.monotonic()
+
+        try:
+            # Every user must hit the replay store, not the response cache;
+            # lazy playlist prefetch runs in Celery, outside the request being measured
+            with override_settings(AI_RESPONSE_CACHE_ENABLED=False, PLAYLIST_PREFETCH_DAYS=0), self._time_validation():
+                for index, user in enumerate(users, 1):
+                    self._run_user(user, index, replay_dir, options['latency'])
+        finally:
+            if not options['keep']:
+                User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self._print_summary(len(users), time.monotonic() - started, options['latency'])
+
+    def _create_users(self, count):
+        run_id = int(time.time())
+        return [
+            User.objects.create_user(
+                username=f'bench_{run_id}_{i}',
+                email=f'bench_{run_id}_{i}@example.com',
+                password=None,
+            )
+            for i in range(count)
+        ]
+
+    def _user_data(self, user, index):
+        user_data = OnboardingDataProcessor._get_fallback_data(user)
+        user_data.update({
+            'user_id': user.id,
+            'archetype': VALID_ARCHETYPES[index % len(VALID_ARCHETYPES)],
+            'age': 20 + index % 40,
+        })
+        return user_data
+
+    def _run_user(self, user, index, replay_dir, latency):
+        ai_client = AIClientFactory.create_client('replay', replay_dir=str(replay_dir), latency=latency)
+        generator = WorkoutPlanGenerator(ai_client=ai_client)
+
+        self._wrap(generator, '_assemble_comprehensive_prompt', 'prompt')
+        self._wrap(ai_client, 'generate_comprehensive_report', 'ai_call')
+        self._wrap(generator, '_create_daily_workouts', 'daily_workouts')
+        self._wrap(generator, '_generate_playlists', 'playlists')
+        self._wrap(generator, '_update_onboarding_session', 'onboarding')
+        self._wrap(generator, '_mark_onboarding_complete', 'onboarding')
+
+        started = time.perf_counter()
+        try:
+            plan = generator.create_plan(user, self._user_data(user, index), use_comprehensive=True)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"[{index}] user {user.id}: failed: {e}"))
+            return
+        self.timings['total'].append(time.perf_counter() - started)
+
+        comprehensive = bool(plan.plan_data.get('comprehensive'))
+        self.ai_used += comprehensive
+        self.stdout.write(
+            f"[{index}] user {user.id}: plan {plan.id}, {plan.daily_workouts.count()} days, "
+            f"{self.timings['total'][-1] * 1000:.0f}ms{'' if comprehensive else ' (fallback plan - replay not used)'}"
+        )
+
+    def _wrap(self, obj, name, stage):
+        """Time an instance method into self.timings[stage]"""
+        method = getattr(obj, name)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._add(stage, time.perf_counter() - started)
+
+        setattr(obj, name, timed)
+
+    def _add(self, stage, elapsed):
+        # Stages called several times per plan (onboarding) are summed per user
+        if stage == 'onboarding' and len(self.timings['onboarding']) > len(self.timings['total']):
+            self.timings['onboarding'][-1] += elapsed
+        else:
+            self.timings[stage].append(elapsed)
+
+    @contextmanager
+    def _time_validation(self):
+        """create_plan builds its own validator, so time it at class level"""
+        original = WorkoutPlanValidator.validate_and_fix_plan
+
+        def timed(validator, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(validator, *args, **kwargs)
+            finally:
+                self._add('validation', time.perf_counter() - started)
+
+        WorkoutPlanValidator.validate_and_fix_plan = timed
+        try:
+            yield
+        finally:
+            WorkoutPlanValidator.validate_and_fix_plan = original
+
+    def _print_summary(self, users, elapsed, latency):
+        latency = getattr(settings, 'AI_REPLAY_LATENCY', 0.0) if latency is None else latency
+        self.stdout.write(f"\n📊 {len(self.timings['total'])}/{users} plans in {elapsed:.1f}s "
+                          f"(replayed AI latency {latency:g}s, {self.ai_used} from replayed reports)")
+        self.stdout.write(f"   {'stage':<16}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for stage in STAGES:
+            self._print_row(stage, self.timings.get(stage))
+
+        per_user = list(zip(*(self.timings[stage] for stage in NON_AI_STAGES)))
+        self._print_row('non-AI total', [sum(values) for values in per_user])
+
+    def _print_row(self, label, values):
+        if not values:
+            self.stdout.write(f"   {label:<16}{'-':>10}{'-':>10}{'-':>10}")
+            return
+        values = sorted(v * 1000 for v in values)
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        self.stdout.write(f"   {label:<16}{statistics.median(values):>10.1f}{p95:>10.1f}{values[-1]:>10.1f}")
@@ -0,0 +1,110 @@
+"""
+Benchmark WorkoutPlanValidator on synthetic 4-week and 90-day plan shapes
+
+    python manage.py benchmark_plan_validator
+    python manage.py benchmark_plan_validator --iterations 50 --exercises-per-day 12
+"""
+import copy
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ai_integration.validators import WorkoutPlanValidator
+
+# Catalog-style ids plus the AI variations the validator has to repair
+ALLOWED_SLUGS = {f'main_{i:03d}' for i in range(1, 151)} | {f'warmup_{i:02d}' for i in range(1, 31)}
+ALIAS_SLUGS = ['pushups', 'Push_Ups', 'air-squats', 'planks', 'lunges']
+UNKNOWN_SLUGS = ['dragon-flag', 'muscle-up', 'pistol-squat']
+
+
+def _exercise(rng):
+    roll = rng.random()
+    if roll < 0.85:
+        slug = rng.choice(sorted(ALLOWED_SLUGS))
+    elif roll < 0.95:
+        slug = rng.choice(ALIAS_SLUGS)
+    else:
+        slug = rng.choice(UNKNOWN_SLUGS)
+    return {
+        'exercise_slug': slug,
+        'sets': rng.choice([3, '4', 2]),
+        'reps': rng.choice(['8-12', 10, '30 seconds']),
+        'rest_seconds': rng.choice([60, '90', 5, 900]),
+    }
+
+
+def build_weeks_plan(weeks: int, exercises_per_day: int, seed: int = 0):
+    rng = random.Random(seed)
+    return {
+        'plan_name': 'Benchmark weeks plan',
+        'duration_weeks': weeks,
+        'goal': 'Benchmark goal text',
+        'weeks': [
+            {
+                'week_number': week,
+                'days': [
+                    {'day_number': day, 'is_rest_day': False,
+                     'exercises': [_exercise(rng) for _ in range(exercises_per_day)]}
+                    for day in range(1, 8)
+                ],
+            }
+            for week in range(1, weeks + 1)
+        ],
+    }
+
+
+def build_cycles_plan(days: int, exercises_per_day: int, seed: int = 0):
+    rng = random.Random(seed)
+    per_block = max(1, exercises_per_day // 3)
+    cycles = []
+    for start in range(1, days + 1, 30):
+        cycles.append({
+            'cycle_name': f'Cycle from day {start}',
+            'daily_workouts': [
+                {'day_number': day, 'workout_name': f'День {day}',
+                 'blocks': [{'type': block, 'exercises': [_exercise(rng) for _ in range(per_block)]}
+                            for block in ('warmup', 'main', 'cooldown')]}
+                for day in range(start, min(start + 30, days + 1))
+            ],
+        })
+    return {'plan_name': 'Benchmark 90-day plan', 'duration_weeks': 12, 'goal': 'Benchmark goal text', 'cycles': cycles}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark plan validation per stage on 4-week and 90-day plan shapes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--exercises-per-day', type=int, default=9)
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        per_day = options['exercises_per_day']
+        shapes = {
+            '4-week': build_weeks_plan(4, per_day),
+            '90-day cycles': build_cycles_plan(90, per_day),
+        }
+
+        validator = WorkoutPlanValidator()
+        for name, plan in shapes.items():
+            totals, stages = [], {}
+            for _ in range(iterations):
+                plan_copy = copy.deepcopy(plan)
+                started = time.perf_counter()
+                _, report = validator.validate_and_fix_plan(plan_copy, allowed_slugs=ALLOWED_SLUGS)
+                totals.append((time.perf_counter() - started) * 1000)
+                for stage, elapsed_ms in report['timings_ms'].items():
+                    stages.setdefault(stage, []).append(elapsed_ms)
+
+            exercises = sum(len(owner[key]) for owner, key, *_ in validator._collect_exercise_lists(copy.deepcopy(plan)))
+            median_ms = statistics.median(totals)
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: {exercises} exercises, median {median_ms:.2f}ms "
+                f"({exercises / median_ms * 1000:,.0f} exercises/s), "
+                f"{report['issues_found']} issues, {report['fixes_applied']} fixes"
+            ))
+            self.stdout.write('   ' + ', '.join(
+                f"{stage}={statistics.median(values):.2f}ms" for stage, values in stages.items()
+            ))
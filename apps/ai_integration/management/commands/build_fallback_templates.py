@@ -0,0 +1,46 @@
+"""
+Compile the fallback plan template artifact from CSVExercise
+
+    python manage.py build_fallback_templates
+    python manage.py build_fallback_templates --check  # only report the current artifact
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ai_integration.fallback_templates import (
+    FallbackTemplateLibrary,
+    artifact_path,
+    rebuild_fallback_library,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compile precompiled fallback workout plans per (experience, days_per_week, archetype)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Show the current artifact without rebuilding')
+
+    def handle(self, *args, **options):
+        path = artifact_path()
+
+        if options['check']:
+            library = FallbackTemplateLibrary.load(path)
+            if library is None:
+                self.stdout.write(self.style.WARNING(f'No compatible artifact at {path}'))
+                return
+            self.stdout.write(f"{path}: {len(library)} templates, digest {library.digest}, built {library.built_at}")
+            return
+
+        started = time.monotonic()
+        library = rebuild_fallback_library()
+        elapsed_ms = (time.monotonic() - started) * 1000
+
+        started = time.perf_counter()
+        library.get_plan('beginner', 3, 'mentor')
+        lookup_us = (time.perf_counter() - started) * 1e6
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compiled {len(library)} fallback templates to {path} in {elapsed_ms:.0f}ms "
+            f"(digest {library.digest}, lookup {lookup_us:.0f}µs)"
+        ))
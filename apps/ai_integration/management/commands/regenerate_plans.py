@@ -0,0 +1,218 @@
+"""
+Bulk regeneration of workout plans (e.g. after a prompt profile bump v2 -> v3)
+
+Fans out WorkoutPlanGenerator.create_plan over a bounded thread pool, keeps the
+whole run inside the API quota with a token bucket shared by all workers' AI clients
+(one token per API request, so reprompts and retries count too) and checkpoints every
+finished user so an interrupted run can be resumed with --resume.
+
+    python manage.py regenerate_plans --profile v3 --workers 8 --rpm 60
+    python manage.py regenerate_plans --profile v3 --resume
+    python manage.py regenerate_plans --backend openai --base-url http://localhost:8080/v1  # stub server
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.ai_integration.ai_client_gpt5 import AIClientFactory
+from apps.ai_integration.prompt_manager_v2 import PromptManagerV2
+from apps.ai_integration.rate_limit import TokenBucket
+from apps.ai_integration.services import WorkoutPlanGenerator
+from apps.core.metrics import MetricNames, incr, timing
+from apps.onboarding.services import OnboardingDataProcessor
+from apps.users.services import invalidate_today_snapshot
+from apps.workouts.models import WorkoutPlan
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Regenerate active workout plans in bulk with rate-limited concurrency and resumable checkpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', default=None, help='Prompt profile to generate with (default: settings.PROMPTS_PROFILE)')
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids', help='Regenerate only these users (repeatable)')
+        parser.add_argument('--limit', type=int, help='Process at most N users')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'AI_BULK_MAX_WORKERS', 4), help='Concurrent generations')
+        parser.add_argument('--rpm', type=float, default=getattr(settings, 'AI_BULK_REQUESTS_PER_MINUTE', 30), help='AI requests per minute across all workers')
+        parser.add_argument('--burst', type=float, default=1, help='Token bucket capacity (requests allowed back-to-back)')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: regenerate_plans_<profile>.checkpoint.json)')
+        parser.add_argument('--resume', action='store_true', help='Skip users already regenerated in the checkpoint')
+        parser.add_argument('--backend', default=None, help='AI provider name or dotted client class path (default: settings.AI_PROVIDER)')
+        parser.add_argument('--base-url', default=None, help='OpenAI-compatible base URL, e.g. a local stub server')
+        parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
+
+    def handle(self, *args, **options):
+        self.profile = options['profile'] or getattr(settings, 'PROMPTS_PROFILE', 'v2')
+        self.backend = options['backend']
+        self.base_url = options['base_url']
+        workers = max(1, options['workers'])
+
+        if not (Path(settings.BASE_DIR) / 'prompts' / self.profile).is_dir():
+            raise CommandError(f"Prompt profile '{self.profile}' not found in prompts/")
+
+        self.checkpoint_path = Path(options['checkpoint'] or f'regenerate_plans_{self.profile}.checkpoint.json')
+        self.checkpoint = self._load_checkpoint() if options['resume'] else self._new_checkpoint()
+        self._checkpoint_lock = threading.Lock()
+
+        user_ids = self._select_user_ids(options['user_ids'])
+        if options['resume']:
+            done = {int(uid) for uid, entry in self.checkpoint['users'].items() if entry['status'] in ('ok', 'skipped')}
+            user_ids = [uid for uid in user_ids if uid not in done]
+        if options['limit']:
+            user_ids = user_ids[:options['limit']]
+
+        estimate_min = len(user_ids) / options['rpm'] if options['rpm'] else 0
+        self.stdout.write(f"Profile {self.profile}: {len(user_ids)} users to regenerate, "
+                          f"{workers} workers, {options['rpm']:.0f} req/min (≥ {estimate_min:.1f} min)")
+
+        if options['dry_run']:
+            self.stdout.write(f"Users: {user_ids[:50]}{' ...' if len(user_ids) > 50 else ''}")
+            self.stdout.write('\n📋 Dry run completed - no changes made')
+            return
+
+        if not user_ids:
+            self.stdout.write(self.style.SUCCESS('Nothing to do'))
+            return
+
+        self.bucket = TokenBucket.per_minute(options['rpm'], burst=options['burst'])
+        started = time.monotonic()
+        processed = 0
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='regen')
+        try:
+            futures = {executor.submit(self._regenerate_user, uid): uid for uid in user_ids}
+            for future in as_completed(futures):
+                result = future.result()
+                processed += 1
+                self._record(result)
+
+                style = self.style.SUCCESS if result['status'] == 'ok' else (
+                    self.style.WARNING if result['status'] == 'skipped' else self.style.ERROR)
+                self.stdout.write(style(
+                    f"[{processed}/{len(user_ids)}] user {result['user_id']}: {result['status']} "
+                    f"{result.get('latency_s', 0):.1f}s {result.get('plan_id') or result.get('error', '')}"
+                ))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nInterrupted - waiting for running generations, rerun with --resume'))
+            executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            executor.shutdown(wait=True)
+            self._save_checkpoint()
+
+        self._print_summary(time.monotonic() - started)
+
+    def _select_user_ids(self, user_ids):
+        """Users owning an active plan (optionally restricted to given ids)"""
+        plans = WorkoutPlan.objects.filter(is_active=True)
+        if user_ids:
+            plans = plans.filter(user_id__in=user_ids)
+        return sorted(set(plans.values_list('user_id', flat=True)))
+
+    def _make_generator(self):
+        # The client takes a token before every API request (create_plan may reprompt or retry)
+        client_kwargs = {'rate_limiter': self.bucket}
+        if self.base_url:
+            client_kwargs['base_url'] = self.base_url
+        ai_client = AIClientFactory.create_client(self.backend, **client_kwargs)
+        return WorkoutPlanGenerator(ai_client=ai_client, prompt_manager=PromptManagerV2(profile=self.profile))
+
+    def _regenerate_user(self, user_id):
+        """Worker: regenerate one user's plan; never raises"""
+        close_old_connections()
+        started = time.monotonic()
+        try:
+            user = User.objects.get(pk=user_id)
+            old_plans = list(WorkoutPlan.objects.filter(user=user, is_active=True).order_by('-created_at'))
+            user_data = OnboardingDataProcessor.collect_user_data(user)
+
+            # Latency includes waiting for quota tokens
+            started = time.monotonic()
+            new_plan = self._make_generator().create_plan(user, user_data, use_comprehensive=True)
+            latency = time.monotonic() - started
+
+            if any(plan.id == new_plan.id for plan in old_plans):
+                # create_plan returned a plan generated minutes ago
+                return {'user_id': user_id, 'status': 'skipped', 'plan_id': new_plan.id, 'latency_s': latency}
+
+            if self._is_fallback_plan(new_plan):
+                # create_plan swallowed an AI failure (outage, open circuit) and saved a template plan -
+                # never swap a real plan for it; the user stays 'failed' and is retried on --resume
+                new_plan.delete()
+                return {'user_id': user_id, 'status': 'failed', 'latency_s': latency,
+                        'error': 'AI generation failed, fallback plan discarded'}
+
+            if old_plans:
+                # Keep the user where they were in the flow (no re-confirmation)
+                new_plan.status = old_plans[0].status
+                new_plan.is_confirmed = old_plans[0].is_confirmed
+                new_plan.save(update_fields=['status', 'is_confirmed'])
+                WorkoutPlan.objects.filter(id__in=[plan.id for plan in old_plans]).update(is_active=False)
+                invalidate_today_snapshot([user_id])  # update() sends no post_save
+
+            return {'user_id': user_id, 'status': 'ok', 'plan_id': new_plan.id, 'latency_s': latency}
+
+        except Exception as e:
+            return {'user_id': user_id, 'status': 'failed', 'error': str(e)[:500],
+                    'latency_s': time.monotonic() - started}
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def _is_fallback_plan(plan):
+        """Plan built by FallbackService instead of a comprehensive AI report"""
+        return plan.generation_source == 'FALLBACK' or not (plan.plan_data or {}).get('comprehensive')
+
+    def _record(self, result):
+        timing(MetricNames.AI_BULK_REGEN_LATENCY, result.get('latency_s', 0) * 1000, profile=self.profile)
+        incr(MetricNames.AI_BULK_REGEN_RESULT, status=result['status'], profile=self.profile)
+
+        with self._checkpoint_lock:
+            self.checkpoint['users'][str(result['user_id'])] = {
+                **{k: v for k, v in result.items() if k != 'user_id'},
+                'finished_at': timezone.now().isoformat(),
+            }
+            self._save_checkpoint()
+
+    def _new_checkpoint(self):
+        return {'profile': self.profile, 'started_at': timezone.now().isoformat(), 'users': {}}
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            self.stdout.write(self.style.WARNING(f'No checkpoint at {self.checkpoint_path}, starting fresh'))
+            return self._new_checkpoint()
+
+        checkpoint = json.loads(self.checkpoint_path.read_text(encoding='utf-8'))
+        if checkpoint.get('profile') != self.profile:
+            raise CommandError(f"Checkpoint is for profile {checkpoint.get('profile')}, not {self.profile}")
+        self.stdout.write(f"Resuming from {self.checkpoint_path}: {len(checkpoint['users'])} users recorded")
+        return checkpoint
+
+    def _save_checkpoint(self):
+        """Atomic write so a crash never leaves a truncated checkpoint"""
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.checkpoint, indent=1), encoding='utf-8')
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _print_summary(self, elapsed):
+        entries = list(self.checkpoint['users'].values())
+        counts = {status: sum(1 for e in entries if e['status'] == status) for status in ('ok', 'skipped', 'failed')}
+        latencies = sorted(e['latency_s'] for e in entries if e['status'] == 'ok')
+
+        self.stdout.write(f"\n📊 Done in {elapsed:.1f}s: {counts['ok']} regenerated, "
+                          f"{counts['skipped']} skipped, {counts['failed']} failed (checkpoint: {self.checkpoint_path})")
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(f"   Latency: p50={statistics.median(latencies):.1f}s p95={p95:.1f}s max={latencies[-1]:.1f}s")
+        if counts['failed']:
+            self.stdout.write(self.style.WARNING('   Rerun with --resume to retry failed users'))
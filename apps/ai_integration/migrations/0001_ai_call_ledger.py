@@ -0,0 +1,91 @@
+# Generated by Django 5.0.8 on 2026-10-17 04:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("workouts", "0005_workoutplanpatch"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AICallRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("operation", models.CharField(max_length=40)),
+                ("model", models.CharField(max_length=50)),
+                ("upstream", models.CharField(default="openai", max_length=20)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("ok", "OK"), ("error", "Error")],
+                        default="ok",
+                        max_length=10,
+                    ),
+                ),
+                ("error_type", models.CharField(blank=True, max_length=100)),
+                ("attempt", models.PositiveSmallIntegerField(default=1)),
+                ("latency_ms", models.PositiveIntegerField(default=0)),
+                ("input_tokens", models.PositiveIntegerField(default=0)),
+                ("cached_tokens", models.PositiveIntegerField(default=0)),
+                ("output_tokens", models.PositiveIntegerField(default=0)),
+                ("reasoning_tokens", models.PositiveIntegerField(default=0)),
+                (
+                    "cost_usd",
+                    models.DecimalField(decimal_places=6, default=0, max_digits=10),
+                ),
+                ("archetype", models.CharField(blank=True, max_length=20)),
+                ("prompt_profile", models.CharField(blank=True, max_length=20)),
+                (
+                    "plan",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ai_calls",
+                        to="workouts.workoutplan",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ai_calls",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "ai_call_ledger",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["created_at"], name="ai_call_led_created_8819d1_idx"
+                    ),
+                    models.Index(
+                        fields=["operation", "created_at"],
+                        name="ai_call_led_operati_14bbfa_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
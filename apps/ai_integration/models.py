@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class AICallRecord(models.Model):
+    """One AI API attempt: usage, cost and latency (see ledger.record_ai_call)"""
+
+    STATUS_CHOICES = [
+        ('ok', 'OK'),
+        ('error', 'Error'),
+    ]
+
+    created_at = models.DateTimeField(default=timezone.now)
+    operation = models.CharField(max_length=40)  # comprehensive, comprehensive_stream, structured, ...
+    model = models.CharField(max_length=50)
+    upstream = models.CharField(max_length=20, default='openai')  # 'replay' for benchmarks
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ok')
+    error_type = models.CharField(max_length=100, blank=True)
+    attempt = models.PositiveSmallIntegerField(default=1)
+    latency_ms = models.PositiveIntegerField(default=0)
+
+    # Responses API usage; cached is part of input, reasoning is part of output
+    input_tokens = models.PositiveIntegerField(default=0)
+    cached_tokens = models.PositiveIntegerField(default=0)
+    output_tokens = models.PositiveIntegerField(default=0)
+    reasoning_tokens = models.PositiveIntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=10, decimal_places=6, default=0)
+
+    # Attribution
+    archetype = models.CharField(max_length=20, blank=True)
+    prompt_profile = models.CharField(max_length=20, blank=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='ai_calls')
+    plan = models.ForeignKey('workouts.WorkoutPlan', on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='ai_calls')
+
+    class Meta:
+        db_table = 'ai_call_ledger'
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['operation', 'created_at']),
+        ]
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.operation} {self.model} #{self.attempt} {self.status} {self.latency_ms}ms"
+
+    @property
+    def total_tokens(self):
+        return self.input_tokens + self.output_tokens
@@ -0,0 +1,179 @@
+"""
+JSON-patch style deltas over one week of DailyWorkouts
+
+Weekly adaptation sends the AI only the upcoming week as a compact document
+
+    {"days": {"8": {"name": ..., "is_rest_day": false, "confidence_task": ...,
+                    "exercises": [{"exercise_slug": ..., "sets": 3, "reps": "8-12", "rest_seconds": 60}]}}}
+
+(keyed by DailyWorkout.day_number) and gets back RFC 6902 operations on it:
+
+    {"op": "replace", "path": "/days/8/exercises/0/sets", "value": 4}
+    {"op": "add", "path": "/days/8/exercises/-", "value": {"exercise_slug": ..., "sets": 3, ...}}
+    {"op": "remove", "path": "/days/10/exercises/2"}
+
+Only days, their workout fields and exercise entries can be touched; anything else
+is rejected per operation, so one bad op never discards the whole adaptation.
+"""
+import copy
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DAY_FIELDS = {'name': str, 'is_rest_day': bool, 'confidence_task': str}
+EXERCISE_FIELDS = {'exercise_slug': str, 'sets': int, 'reps': (str, int), 'rest_seconds': int}
+COMPACT_EXERCISE_FIELDS = tuple(EXERCISE_FIELDS)
+
+MAX_SETS = 10
+MAX_REST_SECONDS = 600
+
+
+class PlanDeltaError(ValueError):
+    """Operation cannot be applied to the week document"""
+
+
+def week_document(daily_workouts: Iterable) -> Dict:
+    """Compact document of the week sent to the AI (exercise fields outside the delta are omitted)"""
+    return {
+        'days': {
+            str(day.day_number): {
+                'name': day.name,
+                'is_rest_day': day.is_rest_day,
+                'confidence_task': day.confidence_task,
+                'exercises': [
+                    {field: exercise[field] for field in COMPACT_EXERCISE_FIELDS if field in exercise}
+                    for exercise in day.exercises or []
+                    if isinstance(exercise, dict)
+                ],
+            }
+            for day in daily_workouts
+        }
+    }
+
+
+def _parse_path(path) -> List[str]:
+    if not isinstance(path, str) or not path.startswith('/days/'):
+        raise PlanDeltaError(f"path must start with /days/: {path!r}")
+    return [part.replace('~1', '/').replace('~0', '~') for part in path[1:].split('/')][1:]
+
+
+def _index(token: str, length: int, allow_end: bool = False) -> int:
+    if allow_end and token == '-':
+        return length
+    if not token.isdigit():
+        raise PlanDeltaError(f"invalid list index {token!r}")
+    index = int(token)
+    if index > length or (index == length and not allow_end):
+        raise PlanDeltaError(f"list index {index} out of range ({length} exercises)")
+    return index
+
+
+def _check_value(field: str, value, allowed_slugs: Optional[Set[str]]):
+    expected = DAY_FIELDS.get(field) or EXERCISE_FIELDS[field]
+    if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+        raise PlanDeltaError(f"{field} has wrong type: {value!r}")
+    if field == 'sets' and not 1 <= value <= MAX_SETS:
+        raise PlanDeltaError(f"sets out of range: {value}")
+    if field == 'rest_seconds' and not 0 <= value <= MAX_REST_SECONDS:
+        raise PlanDeltaError(f"rest_seconds out of range: {value}")
+    if field == 'exercise_slug' and allowed_slugs is not None and value not in allowed_slugs:
+        raise PlanDeltaError(f"exercise {value!r} is not allowed")
+
+
+def _check_exercise(value, allowed_slugs: Optional[Set[str]]):
+    if not isinstance(value, dict) or 'exercise_slug' not in value:
+        raise PlanDeltaError("exercise must be an object with exercise_slug")
+    for field, field_value in value.items():
+        if field in EXERCISE_FIELDS:
+            _check_value(field, field_value, allowed_slugs)
+
+
+def _apply_operation(days: Dict[str, Dict], operation: Dict, allowed_slugs: Optional[Set[str]]) -> str:
+    """Apply one operation in place; returns the touched day key"""
+    if not isinstance(operation, dict):
+        raise PlanDeltaError("operation must be an object")
+    op = operation.get('op')
+    if op not in ('replace', 'add', 'remove'):
+        raise PlanDeltaError(f"unsupported op {op!r}")
+    if op != 'remove' and 'value' not in operation:
+        raise PlanDeltaError(f"{op} requires a value")
+
+    parts = _parse_path(operation.get('path'))
+    value = operation.get('value')
+    if not parts or parts[0] not in days:
+        raise PlanDeltaError(f"unknown day in path {operation.get('path')!r}")
+    day = days[parts[0]]
+
+    # /days/<n>/<field>
+    if len(parts) == 2 and parts[1] in DAY_FIELDS:
+        if op != 'replace':
+            raise PlanDeltaError(f"only replace is supported for {parts[1]}")
+        _check_value(parts[1], value, allowed_slugs)
+        day[parts[1]] = value
+        return parts[0]
+
+    if len(parts) < 3 or parts[1] != 'exercises':
+        raise PlanDeltaError(f"unsupported path {operation.get('path')!r}")
+    exercises = day['exercises']
+
+    # /days/<n>/exercises/<i>
+    if len(parts) == 3:
+        if op == 'add':
+            index = _index(parts[2], len(exercises), allow_end=True)
+            _check_exercise(value, allowed_slugs)
+            exercises.insert(index, dict(value))
+        elif op == 'remove':
+            del exercises[_index(parts[2], len(exercises))]
+        else:
+            index = _index(parts[2], len(exercises))
+            _check_exercise(value, allowed_slugs)
+            exercises[index] = dict(value)
+        return parts[0]
+
+    # /days/<n>/exercises/<i>/<field>
+    if len(parts) == 4 and parts[3] in EXERCISE_FIELDS:
+        if op != 'replace':
+            raise PlanDeltaError(f"only replace is supported for {parts[3]}")
+        index = _index(parts[2], len(exercises))
+        _check_value(parts[3], value, allowed_slugs)
+        exercises[index][parts[3]] = value
+        return parts[0]
+
+    raise PlanDeltaError(f"unsupported path {operation.get('path')!r}")
+
+
+def apply_week_delta(document: Dict, operations: List[Dict],
+                     allowed_slugs: Optional[Set[str]] = None) -> Tuple[Dict, List[Dict], List[Dict], Set[str]]:
+    """
+    Apply operations in order to a copy of the week document.
+
+    Returns (patched document, applied operations, rejected operations with 'error', touched day keys).
+    """
+    patched = copy.deepcopy(document)
+    applied, rejected, touched = [], [], set()
+
+    for operation in operations or []:
+        try:
+            touched.add(_apply_operation(patched['days'], operation, allowed_slugs))
+            applied.append(operation)
+        except PlanDeltaError as e:
+            rejected.append({'operation': operation, 'error': str(e)})
+
+    return patched, applied, rejected, touched
+
+
+def merge_exercises(original: List[Dict], patched: List[Dict]) -> List[Dict]:
+    """
+    Patched compact exercises back onto the stored ones.
+
+    The delta only sees COMPACT_EXERCISE_FIELDS, so each patched entry takes the extra
+    fields (names, notes, block info) of the first unused stored entry with the same slug.
+    """
+    unused = [exercise for exercise in original if isinstance(exercise, dict)]
+    merged = []
+    for exercise in patched:
+        stored = next((item for item in unused if item.get('exercise_slug') == exercise.get('exercise_slug')), None)
+        if stored is not None:
+            unused.remove(stored)
+            merged.append({**stored, **exercise})
+        else:
+            merged.append(dict(exercise))
+    return merged
@@ -0,0 +1,210 @@
+"""
+Prompt token budget and compact exercise whitelist encoding
+
+- encode_whitelist(): collapses numbered exercise ids into ranges
+  (main_001, main_002, ... main_150 -> main_001..main_150)
+- PromptBudget: assembles a prompt from named sections, counts tokens per section,
+  trims trimmable sections to the configured budget and logs bytes/token savings;
+  a strict budget raises PromptBudgetExceeded instead of sending an over-budget prompt
+"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# tiktoken is optional - without it tokens are estimated from text length
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    tiktoken = None
+    HAS_TIKTOKEN = False
+
+_NUMBERED_ID_RE = re.compile(r'^(.*?)(\d+)(\D*)$')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count for text (exact with tiktoken, estimated otherwise)"""
+    global _encoding
+
+    if not text:
+        return 0
+
+    if HAS_TIKTOKEN:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding('o200k_base')
+        return len(_encoding.encode(text))
+
+    # Estimate: ~4 chars/token for ASCII, ~2 chars/token for Cyrillic
+    non_ascii = len(_NON_ASCII_RE.findall(text))
+    return max(1, (len(text) - non_ascii) // 4 + non_ascii // 2)
+
+
+def encode_whitelist(slugs: Iterable[str]) -> str:
+    """Encode exercise ids compactly: consecutive numbered ids become a..b ranges"""
+    groups: Dict[tuple, List[int]] = {}
+    plain = []
+
+    for slug in slugs:
+        slug = str(slug)
+        match = _NUMBERED_ID_RE.match(slug)
+        if not match:
+            plain.append(slug)
+            continue
+        prefix, number, suffix = match.groups()
+        groups.setdefault((prefix, len(number), suffix), []).append(int(number))
+
+    parts = []
+    for (prefix, width, suffix), numbers in sorted(groups.items()):
+        numbers = sorted(set(numbers))
+        run_start = prev = numbers[0]
+
+        for number in numbers[1:] + [None]:
+            if number is not None and number == prev + 1:
+                prev = number
+                continue
+
+            first = f"{prefix}{run_start:0{width}d}{suffix}"
+            last = f"{prefix}{prev:0{width}d}{suffix}"
+            if prev - run_start >= 2:
+                parts.append(f"{first}..{last}")
+            elif prev > run_start:
+                parts.extend([first, last])
+            else:
+                parts.append(first)
+
+            if number is not None:
+                run_start = prev = number
+
+    return ', '.join(parts + sorted(plain))
+
+
+class PromptBudgetExceeded(ValueError):
+    """Prompt is over budget and nothing left to trim"""
+
+
+@dataclass
+class PromptSection:
+    """Named part of a prompt"""
+    name: str
+    text: str
+    trimmable: bool = False
+    priority: int = 0  # lower priority sections are trimmed first
+    original_tokens: int = 0
+    tokens: int = 0
+
+
+class PromptBudget:
+    """Assemble prompt sections within a token budget"""
+
+    # Trimmable sections keep at least this much (e.g. the user's answers are never cut away entirely)
+    MIN_SECTION_TOKENS = 64
+
+    def __init__(self, max_tokens: Optional[int] = None, label: str = 'prompt', strict: bool = False):
+        self.max_tokens = max_tokens or getattr(settings, 'AI_PROMPT_TOKEN_BUDGET', 16000)
+        self.label = label
+        self.strict = strict
+        self.sections: List[PromptSection] = []
+        self.savings: Dict[str, int] = {}
+
+    def add(self, name: str, text: str, trimmable: bool = False, priority: int = 0) -> 'PromptBudget':
+        """Add a section; trimmable sections may be cut to fit the budget"""
+        tokens = count_tokens(text)
+        self.sections.append(PromptSection(name, text or '', trimmable, priority, tokens, tokens))
+        return self
+
+    def add_whitelist(self, name: str, template: str, slugs: Iterable[str]) -> 'PromptBudget':
+        """Add whitelist section; {whitelist} in template is replaced, savings vs. the plain list are recorded"""
+        slugs = sorted(str(slug) for slug in slugs)
+        text = template.replace('{whitelist}', encode_whitelist(slugs))
+        plain_tokens = count_tokens(template.replace('{whitelist}', ', '.join(slugs)))
+
+        self.add(name, text)
+        self.savings[name] = plain_tokens - self.sections[-1].tokens
+        return self
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(section.tokens for section in self.sections)
+
+    def render(self, separator: str = '\n\n') -> str:
+        """Join sections, trimming trimmable ones (lowest priority first) if over budget"""
+        overflow = self.total_tokens - self.max_tokens
+        if overflow > 0:
+            for section in sorted((s for s in self.sections if s.trimmable), key=lambda s: s.priority):
+                if overflow <= 0:
+                    break
+                overflow -= self._trim(section, section.tokens - overflow)
+
+            if overflow > 0:
+                sections = ', '.join(f"{s.name}={s.tokens}" for s in self.sections)
+                message = f"{self.label}: {overflow} tokens over budget {self.max_tokens} after trimming [{sections}]"
+                if self.strict:
+                    logger.error(message)
+                    raise PromptBudgetExceeded(message)
+                logger.warning(message)
+
+        prompt = separator.join(section.text for section in self.sections if section.text)
+        self._log(prompt)
+        return prompt
+
+    def _trim(self, section: PromptSection, target_tokens: int) -> int:
+        """
+        Cut section to target_tokens: whole lines first, then the next line by characters.
+        A section is never cut below MIN_SECTION_TOKENS (any overflow left is logged by render).
+        """
+        before = section.tokens
+        target_tokens = max(target_tokens, min(before, self.MIN_SECTION_TOKENS))
+        lines = section.text.splitlines()
+
+        # Binary search for the longest prefix of lines that fits
+        low, high = 0, len(lines)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count_tokens('\n'.join(lines[:middle])) <= target_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        kept = lines[:low]
+
+        if low < len(lines):
+            # Fill the rest of the budget with the start of the next line (a long single line isn't dropped)
+            line = lines[low]
+            low_chars, high_chars = 0, len(line)
+            while low_chars < high_chars:
+                middle = (low_chars + high_chars + 1) // 2
+                if count_tokens('\n'.join(kept + [line[:middle]])) <= target_tokens:
+                    low_chars = middle
+                else:
+                    high_chars = middle - 1
+            if low_chars:
+                kept.append(line[:low_chars].rstrip())
+
+        section.text = '\n'.join(kept)
+        section.tokens = count_tokens(section.text)
+        self.savings[section.name] = self.savings.get(section.name, 0) + before - section.tokens
+        return before - section.tokens
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """Per-section token accounting"""
+        return {
+            section.name: {
+                'tokens': section.tokens,
+                'original_tokens': section.original_tokens,
+                'saved_tokens': self.savings.get(section.name, 0),
+            }
+            for section in self.sections
+        }
+
+    def _log(self, prompt: str):
+        sections = ', '.join(f"{s.name}={s.tokens}" for s in self.sections)
+        saved = sum(self.savings.values())
+        logger.info(f"📏 {self.label}: {self.total_tokens}/{self.max_tokens} tokens "
+                    f"({len(prompt.encode('utf-8'))} bytes) [{sections}], saved {saved} tokens"
+                    f"{'' if HAS_TIKTOKEN else ' (estimated)'}")
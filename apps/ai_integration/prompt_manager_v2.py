@@ -5,8 +5,11 @@ import json
 import logging
 import os
 import re
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
 
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,45 @@ PROMPTS_DIR = BASE_DIR / 'prompts' / PROMPTS_PROFILE
 INTRO_PATH = PROMPTS_DIR / '_intro.txt'
 SCHEMAS_DIR = PROMPTS_DIR / 'schemas'
 
+# How often cached files are re-stat'ed for changes (seconds); 0 = on every access
+def get_prompts_cache_check_interval():
+    try:
+        from django.conf import settings
+        return getattr(settings, 'PROMPTS_CACHE_CHECK_INTERVAL', 2.0)
+    except ImportError:
+        return float(os.getenv('PROMPTS_CACHE_CHECK_INTERVAL', '2.0'))
+
+PLACEHOLDER_RE = re.compile(r'\{\{(\w+)\}\}')
+
+# In-process caches shared by all PromptManagerV2 instances, invalidated by file mtime
+_cache_lock = threading.Lock()
+_file_cache: Dict[Path, Tuple[Optional[int], float, str]] = {}  # path -> (mtime_ns, checked_at, text)
+_pair_cache: Dict[tuple, Tuple[tuple, Tuple[str, str]]] = {}  # key -> (file versions, (system, user))
+_schema_cache: Dict[Path, Tuple[Optional[int], Dict[str, Any], Any]] = {}  # path -> (mtime_ns, schema, validator)
+
+
+@lru_cache(maxsize=256)
+def _compile_placeholders(text: str) -> FrozenSet[str]:
+    """Placeholders of a template, parsed once per distinct text"""
+    return frozenset(PLACEHOLDER_RE.findall(text))
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def clear_prompt_cache():
+    """Drop all cached prompts, pairs and schema validators"""
+    with _cache_lock:
+        _file_cache.clear()
+        _pair_cache.clear()
+        _schema_cache.clear()
+    _compile_placeholders.cache_clear()
+
+
 # Default archetype mapping
 DEFAULT_ARCHETYPE_ALIASES = {
     'bro': 'peer',
@@ -47,6 +89,7 @@ class PromptManagerV2:
         self.prompts_dir = BASE_DIR / 'prompts' / self.profile
         self.intro_path = self.prompts_dir / '_intro.txt'
         self.schemas_dir = self.prompts_dir / 'schemas'
+        self.cache_check_interval = get_prompts_cache_check_interval()
         
     @staticmethod
     def normalize_archetype(slug: Optional[str]) -> Optional[str]:
@@ -72,12 +115,37 @@ class PromptManagerV2:
         return aliases.get(slug, slug)
     
     def _read_file(self, path: Path) -> str:
-        """Safely read text file with UTF-8 encoding"""
+        """Safely read text file with UTF-8 encoding (cached, invalidated by mtime)"""
+        return self._read_file_versioned(path)[1]
+    
+    def _read_file_versioned(self, path: Path) -> Tuple[Optional[int], str]:
+        """Return (mtime_ns, text); disk is touched only when the check interval has passed"""
+        now = time.monotonic()
+        cached = _file_cache.get(path)
+        if cached is not None and now - cached[1] < self.cache_check_interval:
+            return cached[0], cached[2]
+        
+        mtime = _mtime_ns(path)
+        if cached is not None and cached[0] == mtime:
+            _file_cache[path] = (mtime, now, cached[2])
+            return mtime, cached[2]
+        
         try:
-            return path.read_text(encoding='utf-8') if path.exists() else ''
+            text = path.read_text(encoding='utf-8') if mtime is not None else ''
         except Exception as e:
             logger.error(f"Error reading file {path}: {e}")
-            return ''
+            return mtime, ''
+        
+        with _cache_lock:
+            _file_cache[path] = (mtime, now, text)
+        if cached is not None:
+            logger.info(f"Prompt file changed, reloaded: {path}")
+        return mtime, text
+    
+    def _prompt_path(self, role: str, kind: str, archetype: Optional[str]) -> Path:
+        if archetype:
+            return self.prompts_dir / role / f"{kind}_{archetype}.{role}.md"
+        return self.prompts_dir / role / f"{kind}.{role}.md"
     
     def get_system_prompt(self, kind: str, archetype: Optional[str] = None) -> str:
         """
@@ -90,12 +158,7 @@ class PromptManagerV2:
         Returns:
             System prompt text
         """
-        if archetype:
-            path = self.prompts_dir / 'system' / f"{kind}_{archetype}.system.md"
-        else:
-            path = self.prompts_dir / 'system' / f"{kind}.system.md"
-            
-        return self._read_file(path)
+        return self._read_file(self._prompt_path('system', kind, archetype))
     
     def get_user_prompt(self, kind: str, archetype: Optional[str] = None) -> str:
         """
@@ -108,12 +171,7 @@ class PromptManagerV2:
         Returns:
             User prompt text
         """
-        if archetype:
-            path = self.prompts_dir / 'user' / f"{kind}_{archetype}.user.md"
-        else:
-            path = self.prompts_dir / 'user' / f"{kind}.user.md"
-            
-        return self._read_file(path)
+        return self._read_file(self._prompt_path('user', kind, archetype))
     
     def render_with_intro(self, system_text: str, user_text: str) -> Tuple[str, str]:
         """
@@ -151,16 +209,34 @@ class PromptManagerV2:
             FileNotFoundError: If schema file doesn't exist
             json.JSONDecodeError: If schema is invalid JSON
         """
+        return self._get_compiled_schema(name)[0]
+    
+    def _get_compiled_schema(self, name: str) -> Tuple[Dict[str, Any], Any]:
+        """Parsed schema and its compiled jsonschema validator, rebuilt only when the file changes"""
         schema_path = self.schemas_dir / f"{name}.json"
+        mtime = _mtime_ns(schema_path)
         
-        if not schema_path.exists():
+        if mtime is None:
             raise FileNotFoundError(f"Schema not found: {schema_path}")
+        
+        cached = _schema_cache.get(schema_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
             
         try:
-            return json.loads(schema_path.read_text(encoding='utf-8'))
+            schema = json.loads(schema_path.read_text(encoding='utf-8'))
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON schema {schema_path}: {e}")
             raise
+        
+        from jsonschema.validators import validator_for
+        validator_cls = validator_for(schema)
+        validator_cls.check_schema(schema)
+        validator = validator_cls(schema)
+        
+        with _cache_lock:
+            _schema_cache[schema_path] = (mtime, schema, validator)
+        return schema, validator
     
     def validate_response(self, data: Dict[str, Any], schema_name: str) -> bool:
         """
@@ -177,9 +253,8 @@ class PromptManagerV2:
             FileNotFoundError: If schema file not found
         """
         try:
-            from jsonschema import validate
-            schema = self.load_schema(schema_name)
-            validate(instance=data, schema=schema)
+            _, validator = self._get_compiled_schema(schema_name)
+            validator.validate(data)
             return True
         except FileNotFoundError:
             raise
@@ -197,7 +272,7 @@ class PromptManagerV2:
         Returns:
             Set of placeholder names
         """
-        return set(re.findall(r'\{\{(\w+)\}\}', text))
+        return set(_compile_placeholders(text))
     
     def assert_placeholders_filled(self, text: str, provided_vars: Dict[str, Any]) -> List[str]:
         """
@@ -303,13 +378,29 @@ class PromptManagerV2:
         # Normalize archetype
         norm_archetype = self.normalize_archetype(archetype)
         
+        system_path = self._prompt_path('system', kind, norm_archetype)
+        user_path = self._prompt_path('user', kind, norm_archetype)
+        paths = (system_path, user_path, self.intro_path) if with_intro else (system_path, user_path)
+        
+        # Cached pair is reused while none of its files changed
+        versioned = [self._read_file_versioned(path) for path in paths]
+        versions = tuple(version for version, _ in versioned)
+        cache_key = (self.profile, kind, norm_archetype, with_intro)
+        
+        cached = _pair_cache.get(cache_key)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        
         # Get prompts
-        system = self.get_system_prompt(kind, norm_archetype)
-        user = self.get_user_prompt(kind, norm_archetype)
+        system = versioned[0][1]
+        user = versioned[1][1]
         
         # Add intro if requested
         if with_intro:
             system, user = self.render_with_intro(system, user)
+        
+        with _cache_lock:
+            _pair_cache[cache_key] = (versions, (system, user))
             
         return system, user
 
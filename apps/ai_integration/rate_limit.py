@@ -0,0 +1,158 @@
+"""
+Rate limiting primitives for AI API calls
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at `rate` tokens/second up to `capacity`.
+    Used to keep bulk AI workloads within the API quota regardless of worker count.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: Optional[float] = None) -> 'TokenBucket':
+        """Bucket for a requests-per-minute quota"""
+        return cls(rate=requests_per_minute / 60.0, capacity=burst if burst is not None else 1)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available; False if timeout expires first"""
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from bucket of capacity {self.capacity}")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class LoadShedError(Exception):
+    """Raised when no in-flight slot frees up within the queue timeout"""
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight AI calls per process.
+
+    Each success (within the latency target) grows the limit by 1/limit; each service
+    failure, timeout or slow call shrinks it multiplicatively. Callers that cannot get
+    a slot within queue_timeout are shed instead of queueing into certain timeouts.
+    """
+
+    def __init__(self, name: str = 'openai', initial: int = 8, min_limit: int = 1, max_limit: int = 32,
+                 queue_timeout: float = 5.0, latency_target: Optional[float] = None, backoff_ratio: float = 0.7):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        """Take a slot without waiting"""
+        with self._condition:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Wait for a slot; raises LoadShedError after timeout (default queue_timeout)"""
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout=timeout):
+                raise LoadShedError(f"{self.name}: {self._in_flight} calls in flight (limit {self.limit}), load shed")
+            self._in_flight += 1
+
+    def release(self, success: bool, latency: Optional[float] = None):
+        """Return slot and adapt the limit"""
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+
+            overloaded = not success or (
+                self.latency_target is not None and latency is not None and latency > self.latency_target
+            )
+            if overloaded:
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+            else:
+                self._limit = min(self.max_limit, self._limit + 1.0 / max(self._limit, 1.0))
+
+            self._condition.notify_all()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(name: str = 'openai') -> AdaptiveConcurrencyLimiter:
+    """Process-wide limiter per upstream, configured from settings"""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                limiter = AdaptiveConcurrencyLimiter(
+                    name=name,
+                    initial=getattr(settings, 'AI_CONCURRENCY_INITIAL', 8),
+                    min_limit=getattr(settings, 'AI_CONCURRENCY_MIN', 1),
+                    max_limit=getattr(settings, 'AI_CONCURRENCY_MAX', 32),
+                    queue_timeout=getattr(settings, 'AI_CONCURRENCY_QUEUE_TIMEOUT', 5.0),
+                    latency_target=getattr(settings, 'AI_CONCURRENCY_LATENCY_TARGET', None),
+                )
+                _limiters[name] = limiter
+    return limiter
@@ -0,0 +1,226 @@
+"""
+Record/replay AI client for benchmarks and offline runs
+
+ReplayAIClient is the regular OpenAIClient (payload building, retries, streaming,
+validation, response cache) with the OpenAI SDK swapped for a local store of
+Responses API payloads:
+
+- replay (default): responses.create() returns a stored payload after the configured
+  latency; stream=True yields output_text deltas spread over that latency
+- record: calls go to the real API and every response is saved to the store
+
+    AI_PROVIDER=replay AI_REPLAY_DIR=ai_replays python manage.py benchmark_plan_creation
+    AIClientFactory.create_client('replay', mode='record')
+
+Recordings are keyed by a hash of the request; without an exact match (and with
+AI_REPLAY_STRICT off) recordings are replayed round-robin, so synthetic users with
+different prompts still get a valid report.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+from openai.types.responses import Response
+
+from .ai_client_gpt5 import AIClientError, OpenAIClient
+
+logger = logging.getLogger(__name__)
+
+STREAM_DELTA_CHARS = 512
+
+
+class ReplayStore:
+    """Directory of recorded Responses API payloads, one JSON file per request"""
+
+    def __init__(self, directory, strict: bool = False):
+        self.directory = Path(directory)
+        self.strict = strict
+        self._round_robin = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def request_key(api_params: Dict) -> str:
+        request = {k: v for k, v in api_params.items() if k != 'stream'}
+        return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:24]
+
+    def _recordings(self) -> List[Path]:
+        return sorted(self.directory.glob('*.json'))
+
+    def load(self, api_params: Dict) -> Dict:
+        """Stored response payload for the request"""
+        path = self.directory / f"{self.request_key(api_params)}.json"
+        if not path.exists():
+            if self.strict:
+                raise AIClientError(f"No recording for request {path.stem} in {self.directory}")
+            with self._lock:
+                if self._round_robin is None:
+                    recordings = self._recordings()
+                    if not recordings:
+                        raise AIClientError(f"No recordings in {self.directory} - record some or add one with --content-file")
+                    self._round_robin = itertools.cycle(recordings)
+                path = next(self._round_robin)
+
+        return json.loads(path.read_text(encoding='utf-8'))['response']
+
+    def save(self, api_params: Dict, payload: Dict) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.request_key(api_params)}.json"
+        path.write_text(json.dumps({
+            'recorded_at': timezone.now().isoformat(),
+            'model': api_params.get('model'),
+            'response': payload,
+        }, ensure_ascii=False), encoding='utf-8')
+        self._round_robin = None
+        logger.info(f"📼 Recorded AI response to {path}")
+        return path
+
+    def add_content(self, content: str, model: str = 'gpt-5', name: str = 'manual') -> Path:
+        """Store output text (e.g. a saved comprehensive report) as a replayable response"""
+        return self.save({'model': model, 'name': name}, build_response_payload(content, model))
+
+
+def build_response_payload(content: str, model: str = 'gpt-5') -> Dict:
+    """Minimal completed Responses API payload with one output_text message"""
+    return {
+        'id': f"resp_replay_{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}",
+        'object': 'response',
+        'created_at': int(time.time()),
+        'model': model,
+        'status': 'completed',
+        'parallel_tool_calls': False,
+        'tool_choice': 'auto',
+        'tools': [],
+        'output': [{
+            'id': 'msg_replay',
+            'type': 'message',
+            'role': 'assistant',
+            'status': 'completed',
+            'content': [{'type': 'output_text', 'text': content, 'annotations': []}],
+        }],
+    }
+
+
+def _output_text(response: Response) -> str:
+    for item in response.output:
+        for content_item in getattr(item, 'content', None) or []:
+            if getattr(content_item, 'text', None):
+                return content_item.text
+    return ''
+
+
+class _ReplayStream:
+    """Iterable of streamed events rebuilt from a stored response"""
+
+    def __init__(self, response: Response, latency: float):
+        self.response = response
+        self.latency = latency
+
+    def __iter__(self):
+        text = _output_text(self.response)
+        chunks = [text[i:i + STREAM_DELTA_CHARS] for i in range(0, len(text), STREAM_DELTA_CHARS)] or ['']
+        pause = self.latency / len(chunks)
+        for chunk in chunks:
+            if pause:
+                time.sleep(pause)
+            yield SimpleNamespace(type='response.output_text.delta', delta=chunk)
+        yield SimpleNamespace(type='response.completed', response=self.response)
+
+    def close(self):
+        pass
+
+
+class _RecordingStream:
+    """Pass-through stream that saves the final response once completed"""
+
+    def __init__(self, stream, store: ReplayStore, api_params: Dict):
+        self.stream = stream
+        self.store = store
+        self.api_params = api_params
+
+    def __iter__(self):
+        for event in self.stream:
+            if getattr(event, 'type', '') == 'response.completed':
+                self.store.save(self.api_params, event.response.model_dump(mode='json'))
+            yield event
+
+    def close(self):
+        self.stream.close()
+
+
+class _ReplayResponses:
+    """Stand-in for client.responses"""
+
+    def __init__(self, store: ReplayStore, latency: float, jitter: float, upstream=None):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.upstream = upstream  # real responses resource in record mode
+
+    def _latency(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def create(self, stream: bool = False, **api_params):
+        if self.upstream is not None:
+            if stream:
+                return _RecordingStream(self.upstream.create(stream=True, **api_params), self.store, api_params)
+            response = self.upstream.create(**api_params)
+            self.store.save(api_params, response.model_dump(mode='json'))
+            return response
+
+        response = Response.model_validate(self.store.load(api_params))
+        if stream:
+            return _ReplayStream(response, self._latency())
+        time.sleep(self._latency())
+        return response
+
+
+class _AsyncReplayResponses(_ReplayResponses):
+
+    async def create(self, stream: bool = False, **api_params):
+        if stream or self.upstream is not None:
+            raise AIClientError("Async replay supports non-streamed replay only")
+        response = Response.model_validate(self.store.load(api_params))
+        await asyncio.sleep(self._latency())
+        return response
+
+
+class ReplayAIClient(OpenAIClient):
+    """OpenAIClient backed by recorded Responses API payloads"""
+
+    upstream_name = 'replay'  # keep replay failures out of the production circuit
+
+    def __init__(self, base_url: str = None, replay_dir: Optional[str] = None, mode: Optional[str] = None,
+                 latency: Optional[float] = None, jitter: Optional[float] = None, strict: Optional[bool] = None,
+                 rate_limiter=None):
+        self.mode = mode or getattr(settings, 'AI_REPLAY_MODE', 'replay')
+        if self.mode not in ('replay', 'record'):
+            raise AIClientError(f"Unknown replay mode: {self.mode}")
+
+        self.store = ReplayStore(
+            replay_dir or getattr(settings, 'AI_REPLAY_DIR', Path(settings.BASE_DIR) / 'ai_replays'),
+            strict=getattr(settings, 'AI_REPLAY_STRICT', False) if strict is None else strict,
+        )
+        self.latency = getattr(settings, 'AI_REPLAY_LATENCY', 0.0) if latency is None else latency
+        self.jitter = getattr(settings, 'AI_REPLAY_LATENCY_JITTER', 0.0) if jitter is None else jitter
+        super().__init__(base_url=base_url, rate_limiter=rate_limiter)
+        logger.info(f"AI {self.mode} client over {self.store.directory} (latency {self.latency}s ±{self.jitter}s)")
+
+    def _create_sdk_client(self, base_url: Optional[str]):
+        upstream = None
+        if self.mode == 'record':
+            upstream = super()._create_sdk_client(base_url).responses
+        return SimpleNamespace(responses=_ReplayResponses(self.store, self.latency, self.jitter, upstream))
+
+    @property
+    def async_client(self):
+        return SimpleNamespace(responses=_AsyncReplayResponses(self.store, self.latency, self.jitter))
@@ -0,0 +1,192 @@
+"""
+Content-addressed cache for AI responses (comprehensive reports)
+
+Key = sha256(normalized prompt + model + schema + prompt version), so identical
+requests (same archetype, same onboarding answers, same prompt profile) reuse the
+earlier GPT-5 response instead of paying a full round trip.
+
+Backed by the Django cache (Redis in production) so all workers share it.
+Entries expire by TTL; a small index keeps total entries/bytes bounded and
+evicts the oldest entries first. Index updates are serialized across workers with
+a cache.add lock; a write that cannot get the lock is simply not cached.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.metrics import MetricNames, gauge, incr
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class AIResponseCache:
+    """Shared, size-bounded cache of raw AI response content"""
+
+    CACHE_KEY_PREFIX = 'ai_response_cache'
+    INDEX_KEY = f'{CACHE_KEY_PREFIX}:index'
+    INDEX_LOCK_KEY = f'{CACHE_KEY_PREFIX}:index:lock'
+    INDEX_LOCK_TIMEOUT = 10  # seconds; lock of a crashed writer expires
+    INDEX_LOCK_WAIT = 2.0
+    STATS_HITS_KEY = f'{CACHE_KEY_PREFIX}:stats:hits'
+    STATS_MISSES_KEY = f'{CACHE_KEY_PREFIX}:stats:misses'
+
+    def __init__(self, namespace: str = 'comprehensive'):
+        self.namespace = namespace
+        self.enabled = getattr(settings, 'AI_RESPONSE_CACHE_ENABLED', True)
+        self.ttl = getattr(settings, 'AI_RESPONSE_CACHE_TTL', 86400)
+        self.max_entries = getattr(settings, 'AI_RESPONSE_CACHE_MAX_ENTRIES', 500)
+        self.max_bytes = getattr(settings, 'AI_RESPONSE_CACHE_MAX_BYTES', 50 * 1024 * 1024)
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Collapse whitespace so formatting-only differences hit the same entry"""
+        return _WHITESPACE_RE.sub(' ', prompt or '').strip()
+
+    def make_key(self, prompt: str, model: str, schema: Optional[Dict[str, Any]] = None,
+                 prompt_version: Optional[str] = None) -> str:
+        """Build content-addressed key for a request"""
+        if prompt_version is None:
+            prompt_version = getattr(settings, 'PROMPTS_PROFILE', 'v2')
+
+        hasher = hashlib.sha256()
+        for part in (
+            self.normalize_prompt(prompt),
+            model or '',
+            json.dumps(schema or {}, sort_keys=True, separators=(',', ':')),
+            prompt_version,
+        ):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\x00')
+
+        return f'{self.CACHE_KEY_PREFIX}:{self.namespace}:{hasher.hexdigest()}'
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached response content or None"""
+        if not self.enabled:
+            return None
+
+        try:
+            content = cache.get(key)
+        except Exception as e:
+            logger.warning(f"AI response cache read failed: {e}")
+            return None
+
+        if content is None:
+            incr(MetricNames.AI_RESPONSE_CACHE_MISS, namespace=self.namespace)
+            self._record_lookup(hit=False)
+            return None
+
+        size = len(content.encode('utf-8'))
+        incr(MetricNames.AI_RESPONSE_CACHE_HIT, namespace=self.namespace)
+        incr(MetricNames.AI_RESPONSE_CACHE_BYTES_SAVED, size, namespace=self.namespace)
+        self._record_lookup(hit=True)
+        logger.info(f"AI response cache hit ({self.namespace}): {size} bytes reused")
+        return content
+
+    def set(self, key: str, content: str) -> bool:
+        """Store response content, evicting oldest entries to stay within bounds"""
+        if not self.enabled or not content:
+            return False
+
+        size = len(content.encode('utf-8'))
+        if size > self.max_bytes:
+            logger.info(f"AI response too large to cache: {size} bytes")
+            return False
+
+        try:
+            with self._index_lock():
+                total_bytes = self._store(key, content, size)
+            gauge(MetricNames.AI_RESPONSE_CACHE_BYTES, total_bytes, namespace=self.namespace)
+            return True
+
+        except TimeoutError:
+            logger.info("AI response cache index is busy, response not cached")
+            return False
+        except Exception as e:
+            logger.warning(f"AI response cache write failed: {e}")
+            return False
+
+    @contextmanager
+    def _index_lock(self):
+        """Cross-worker lock around the index read-modify-write (TimeoutError if busy)"""
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.INDEX_LOCK_WAIT
+        while not cache.add(self.INDEX_LOCK_KEY, token, self.INDEX_LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{self.INDEX_LOCK_KEY} held by another worker")
+            time.sleep(0.02)
+        try:
+            yield
+        finally:
+            # Don't release a lock that expired and was taken over meanwhile
+            if cache.get(self.INDEX_LOCK_KEY) == token:
+                cache.delete(self.INDEX_LOCK_KEY)
+
+    def _store(self, key: str, content: str, size: int) -> int:
+        """Write entry and updated index (caller holds the index lock); returns total bytes"""
+        index = cache.get(self.INDEX_KEY) or []
+        now = time.time()
+
+        # Drop expired and duplicate entries, then evict oldest over the limits
+        index = [entry for entry in index if entry[0] != key and now - entry[2] < self.ttl]
+        index.append((key, size, now))
+
+        evicted = []
+        total_bytes = sum(entry[1] for entry in index)
+        while index and (len(index) > self.max_entries or total_bytes > self.max_bytes):
+            old_key, old_size, _ = index.pop(0)
+            total_bytes -= old_size
+            evicted.append(old_key)
+
+        if evicted:
+            cache.delete_many(evicted)
+            incr(MetricNames.AI_RESPONSE_CACHE_EVICTED, len(evicted), namespace=self.namespace)
+
+        cache.set(key, content, self.ttl)
+        cache.set(self.INDEX_KEY, index, self.ttl)
+        return total_bytes
+
+    def _record_lookup(self, hit: bool):
+        """Update shared hit/miss counters and report hit rate"""
+        try:
+            counter_key = self.STATS_HITS_KEY if hit else self.STATS_MISSES_KEY
+            if not cache.add(counter_key, 1, None):
+                cache.incr(counter_key)
+
+            hits = cache.get(self.STATS_HITS_KEY) or 0
+            misses = cache.get(self.STATS_MISSES_KEY) or 0
+            if hits + misses:
+                gauge(MetricNames.AI_RESPONSE_CACHE_HIT_RATE, hits / (hits + misses), namespace=self.namespace)
+        except Exception as e:
+            logger.debug(f"AI response cache stats update failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics for diagnostics"""
+        index = cache.get(self.INDEX_KEY) or []
+        hits = cache.get(self.STATS_HITS_KEY) or 0
+        misses = cache.get(self.STATS_MISSES_KEY) or 0
+        return {
+            'enabled': self.enabled,
+            'entries': len(index),
+            'bytes': sum(entry[1] for entry in index),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._index_lock():
+            index = cache.get(self.INDEX_KEY) or []
+            cache.delete_many([entry[0] for entry in index] + [self.INDEX_KEY])
+        logger.info("AI response cache cleared")
@@ -1,8 +1,9 @@
 """Pydantic schemas for strict AI response validation"""
 
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
 
 
 class ExerciseItem(BaseModel):
@@ -121,10 +122,37 @@ class WorkoutPlan(BaseModel):
             raise ValueError("Plan should include rest days")
 
 
-def validate_ai_plan_response(raw_response: str) -> WorkoutPlan:
+@lru_cache(maxsize=None)
+def get_type_adapter(schema) -> TypeAdapter:
+    """Validator for a schema, built once per process"""
+    return TypeAdapter(schema)
+
+
+def format_validation_errors(error: ValidationError) -> str:
+    return '; '.join(
+        f"{' -> '.join(str(x) for x in e['loc'])}: {e['msg']}" if e['loc'] else e['msg']
+        for e in error.errors()
+    )
+
+
+def is_invalid_json(error: ValidationError) -> bool:
+    return any(e['type'] == 'json_invalid' for e in error.errors())
+
+
+def _check_plan_structure(plan: WorkoutPlan) -> WorkoutPlan:
+    try:
+        plan.validate_structure()
+    except ValueError as e:
+        raise ValueError(f"Plan structure validation failed: {str(e)}")
+    return plan
+
+
+def validate_ai_plan_response(raw_response: Union[str, bytes]) -> WorkoutPlan:
     """
     Validate and parse AI plan response with strict error handling
     
+    JSON is parsed and validated in one pass (no intermediate dict).
+    
     Args:
         raw_response: Raw JSON string from AI
         
@@ -132,35 +160,26 @@ def validate_ai_plan_response(raw_response: str) -> WorkoutPlan:
         Validated WorkoutPlan object
         
     Raises:
-        ValidationError: If response doesn't match schema
-        ValueError: If structure validation fails
-        JSONDecodeError: If JSON is malformed
+        ValueError: If JSON is malformed, doesn't match schema or structure validation fails
     """
-    import json
-
-    # Parse JSON
     try:
-        data = json.loads(raw_response)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON from AI: {str(e)}")
-    
-    # Validate with Pydantic
-    try:
-        plan = WorkoutPlan.model_validate(data)
+        plan = get_type_adapter(WorkoutPlan).validate_json(raw_response)
     except ValidationError as e:
-        error_details = []
-        for error in e.errors():
-            loc = " -> ".join(str(x) for x in error['loc'])
-            error_details.append(f"{loc}: {error['msg']}")
-        raise ValueError(f"AI response validation failed: {'; '.join(error_details)}")
+        if is_invalid_json(e):
+            raise ValueError(f"Invalid JSON from AI: {format_validation_errors(e)}")
+        raise ValueError(f"AI response validation failed: {format_validation_errors(e)}")
     
-    # Additional structure validation
+    return _check_plan_structure(plan)
+
+
+def validate_ai_plan_data(data: Dict[str, Any]) -> WorkoutPlan:
+    """validate_ai_plan_response for an already parsed plan (e.g. built by FallbackService)"""
     try:
-        plan.validate_structure()
-    except ValueError as e:
-        raise ValueError(f"Plan structure validation failed: {str(e)}")
+        plan = get_type_adapter(WorkoutPlan).validate_python(data)
+    except ValidationError as e:
+        raise ValueError(f"AI response validation failed: {format_validation_errors(e)}")
     
-    return plan
+    return _check_plan_structure(plan)
 
 
 # НОВЫЕ СХЕМЫ ДЛЯ 4-БЛОЧНОЙ СТРУКТУРЫ ОТЧЕТА ИИ
@@ -204,10 +223,12 @@ class ComprehensiveAIReport(BaseModel):
     long_term_strategy: LongTermStrategy = Field(..., description="Блок 4: Долгосрочная стратегия")
 
 
-def validate_comprehensive_ai_report(raw_response: str) -> ComprehensiveAIReport:
+def validate_comprehensive_ai_report(raw_response: Union[str, bytes]) -> ComprehensiveAIReport:
     """
     Валидация полного 4-блочного отчета ИИ
     
+    JSON разбирается и валидируется за один проход (без промежуточного dict).
+    
     Args:
         raw_response: Raw JSON string from AI
         
@@ -215,27 +236,22 @@ def validate_comprehensive_ai_report(raw_response: str) -> ComprehensiveAIReport
         Validated ComprehensiveAIReport object
         
     Raises:
-        ValidationError: If response doesn't match schema
+        ValueError: If JSON is malformed or doesn't match schema
     """
-    import json
-
-    # Parse JSON
     try:
-        data = json.loads(raw_response)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON from AI: {str(e)}")
-    
-    # Validate with Pydantic
+        return get_type_adapter(ComprehensiveAIReport).validate_json(raw_response)
+    except ValidationError as e:
+        if is_invalid_json(e):
+            raise ValueError(f"Invalid JSON from AI: {format_validation_errors(e)}")
+        raise ValueError(f"AI comprehensive report validation failed: {format_validation_errors(e)}")
+
+
+def validate_comprehensive_ai_report_data(data: Dict[str, Any]) -> ComprehensiveAIReport:
+    """validate_comprehensive_ai_report for an already parsed report"""
     try:
-        report = ComprehensiveAIReport.model_validate(data)
+        return get_type_adapter(ComprehensiveAIReport).validate_python(data)
     except ValidationError as e:
-        error_details = []
-        for error in e.errors():
-            loc = " -> ".join(str(x) for x in error['loc'])
-            error_details.append(f"{loc}: {error['msg']}")
-        raise ValueError(f"AI comprehensive report validation failed: {'; '.join(error_details)}")
-    
-    return report
+        raise ValueError(f"AI comprehensive report validation failed: {format_validation_errors(e)}")
 
 
 # Additional schemas for other AI responses
@@ -183,4 +183,61 @@ WORKOUT_PLAN_JSON_SCHEMA_SIMPLE = {
             ]
         }
     ]
-}
\ No newline at end of file
+}
+
+# JSON-patch дельта недели для адаптации плана (см. plan_delta)
+# Strict mode требует все поля: у remove value = null
+PLAN_DELTA_JSON_SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "title": "WorkoutPlanDelta",
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["operations", "notes"],
+    "properties": {
+        "operations": {
+            "type": "array",
+            "maxItems": 50,
+            "items": {"$ref": "#/$defs/Operation"}
+        },
+        "notes": {
+            "type": "string",
+            "maxLength": 2000,
+            "description": "Короткое объяснение изменений в стиле тренера"
+        }
+    },
+    "$defs": {
+        "Operation": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["op", "path", "value"],
+            "properties": {
+                "op": {"type": "string", "enum": ["replace", "add", "remove"]},
+                "path": {
+                    "type": "string",
+                    "pattern": "^/days/",
+                    "description": "JSON pointer в документ недели: /days/<день>/exercises/<индекс>/<поле>"
+                },
+                "value": {
+                    "anyOf": [
+                        {"type": "string"},
+                        {"type": "integer"},
+                        {"type": "boolean"},
+                        {"$ref": "#/$defs/Exercise"},
+                        {"type": "null"}
+                    ]
+                }
+            }
+        },
+        "Exercise": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["exercise_slug", "sets", "reps", "rest_seconds"],
+            "properties": {
+                "exercise_slug": {"type": "string"},
+                "sets": {"type": "integer", "minimum": 1, "maximum": 10},
+                "reps": {"type": "string"},
+                "rest_seconds": {"type": "integer", "minimum": 0, "maximum": 600}
+            }
+        }
+    }
+}
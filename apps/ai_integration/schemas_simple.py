@@ -1,9 +1,11 @@
 """Упрощенные Pydantic схемы для валидации GPT-5 ответов"""
 
-from typing import List
-from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Union
+from pydantic import BaseModel, Field, ValidationError, field_validator
 import re
 
+from .schemas import get_type_adapter, is_invalid_json
+
 
 class WorkoutDay(BaseModel):
     """Один день тренировок - только коды упражнений"""
@@ -99,7 +101,7 @@ class SimpleWorkoutPlan(BaseModel):
         return v
 
 
-def validate_simple_ai_plan(raw_response: str) -> SimpleWorkoutPlan:
+def validate_simple_ai_plan(raw_response: Union[str, bytes]) -> SimpleWorkoutPlan:
     """
     Валидация упрощенного ответа GPT-5
     
@@ -112,18 +114,18 @@ def validate_simple_ai_plan(raw_response: str) -> SimpleWorkoutPlan:
     Raises:
         ValueError: При ошибках валидации
     """
-    import json
-    
-    # Парсим JSON
+    # Парсинг и валидация за один проход
     try:
-        data = json.loads(raw_response)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Неверный JSON от AI: {str(e)}")
-    
-    # Валидируем Pydantic схемой
+        return get_type_adapter(SimpleWorkoutPlan).validate_json(raw_response)
+    except ValidationError as e:
+        if is_invalid_json(e):
+            raise ValueError(f"Неверный JSON от AI: {str(e)}")
+        raise ValueError(f"Ошибка валидации плана: {str(e)}")
+
+
+def validate_simple_ai_plan_data(data: Dict[str, Any]) -> SimpleWorkoutPlan:
+    """validate_simple_ai_plan для уже разобранного ответа (без json.dumps)"""
     try:
-        plan = SimpleWorkoutPlan.model_validate(data)
-    except Exception as e:
+        return get_type_adapter(SimpleWorkoutPlan).validate_python(data)
+    except ValidationError as e:
         raise ValueError(f"Ошибка валидации плана: {str(e)}")
-    
-    return plan
\ No newline at end of file
@@ -1,12 +1,17 @@
+import json
 import logging
-import os
-from typing import Dict, List, Set, Tuple
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
 
 from django.conf import settings
+from django.db import connection, transaction
 from django.utils import timezone
-from openai import OpenAI
 
-from apps.core.metrics import MetricNames, incr
+from apps.core.metrics import MetricNames, incr, timing
 from apps.core.services.exercise_validation import ExerciseValidationService
 from apps.onboarding.services import OnboardingDataProcessor
 from apps.workouts.catalog import get_catalog
@@ -14,20 +19,74 @@ from apps.workouts.constants import EXERCISE_FALLBACK_PRIORITY
 
 from .ai_client_gpt5 import AIClientError, AIClientFactory
 from .fallback_service import FallbackService
+from .ledger import ai_call_context, attach_plan
+from .prompt_budget import PromptBudget
 from .prompt_manager_v2 import PromptManagerV2
 from .validators import WorkoutPlanValidator
 
+if TYPE_CHECKING:
+    from apps.workouts.models import WorkoutPlan, WorkoutPlanPatch
+
 logger = logging.getLogger(__name__)
 
-# Real OpenAI client
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# {whitelist} is filled by PromptBudget.add_whitelist with compact id ranges (main_001..main_150)
+COMPREHENSIVE_WHITELIST_TEMPLATE = """
+КРИТИЧЕСКИ ВАЖНО - УПРАЖНЕНИЯ:
+Используйте ТОЛЬКО упражнения из этого списка в тренировочных планах:
+{whitelist}
+Запись a..b означает все id от a до b включительно (main_001..main_003 = main_001, main_002, main_003).
 
+ОБЯЗАТЕЛЬНЫЕ ТРЕБОВАНИЯ:
+1. Каждое упражнение ДОЛЖНО быть из списка выше
+2. Используйте точное название (exercise_slug)
+3. НЕ изобретайте новые упражнения
+4. Если нужно упражнение не из списка - выберите похожее из списка
 
+ПАРАМЕТРЫ rest_seconds (СТРОГО):
+- Силовые упражнения: 60-90 секунд
+- Кардио упражнения: 30-60 секунд  
+- Упражнения на гибкость: 15-30 секунд
+- Все значения должны быть от 10 до 600 секунд
+
+ВИДЕО-СИСТЕМА:
+- Каждое упражнение имеет предзаписанные видео
+- Включает: технику, типичные ошибки, инструкции по архетипам
+- Система автоматически генерирует плейлисты с мотивационными вставками
+- Используются только упражнения с полным видео-покрытием
+
+СТРУКТУРА ПЛЕЙЛИСТА (автоматически создается):
+- Вводное мотивационное видео
+- Инструкции по технике для каждого упражнения  
+- Видео разборов типичных ошибок
+- Промежуточная мотивация между упражнениями
+- Заключительное мотивационное видео
+
+ЗАДАЧА: Создать план используя ТОЛЬКО упражнения из whitelist выше!
+"""
 
-def create_workout_plan_from_onboarding(user):
+WHITELIST_TEMPLATE = """
+IMPORTANT: You MUST use ONLY exercises from this allowed list:
+{whitelist}
+A range a..b means every id from a to b inclusive (main_001..main_003 = main_001, main_002, main_003).
+
+If you cannot find a suitable exercise from the list, choose the closest alternative based on:
+1. Same muscle group
+2. Similar equipment requirements  
+3. Similar difficulty level
+
+DO NOT use any exercises not in this list.
+"""
+
+REPROMPT_MARKER = 'CORRECTION NEEDED:'
+
+
+def create_workout_plan_from_onboarding(user, on_fallback_plan: Optional[Callable] = None):
     """
     Main function to create workout plan from onboarding data
     Called from onboarding views
+
+    With AI_HEDGE_ENABLED a fallback plan is passed to on_fallback_plan if the AI
+    exceeds AI_HEDGE_LATENCY_BUDGET; the returned plan is the one that stays active.
     """
     
     logger.info("🔍 PLAN GENERATION: Starting for user %s", user.id)
@@ -44,7 +103,11 @@ def create_workout_plan_from_onboarding(user):
         # Create workout plan using dedicated service
         logger.info("🔍 PLAN GENERATION: Creating plan with WorkoutPlanGenerator...")
         plan_generator = WorkoutPlanGenerator()
-        result = plan_generator.create_plan(user, user_data, use_comprehensive)
+        if getattr(settings, 'AI_HEDGE_ENABLED', False) and not settings.FALLBACK_TO_LEGACY_FLOW:
+            result = plan_generator.create_plan_hedged(user, user_data, use_comprehensive,
+                                                       on_fallback_plan=on_fallback_plan)
+        else:
+            result = plan_generator.create_plan(user, user_data, use_comprehensive)
         logger.info("🔍 PLAN GENERATION: Plan created successfully, plan ID: %s", result.id)
         return result
         
@@ -57,14 +120,33 @@ def create_workout_plan_from_onboarding(user):
 class WorkoutPlanGenerator:
     """Service for generating workout plans using AI"""
     
-    def __init__(self, user=None):
-        self.ai_client = AIClientFactory.create_client()
-        self.prompt_manager = PromptManagerV2()
+    def __init__(self, user=None, ai_client=None, prompt_manager=None):
+        self.ai_client = ai_client or AIClientFactory.create_client()
+        self.prompt_manager = prompt_manager or PromptManagerV2()
         self.user = user
+        
+        # Provisional plan that streamed weeks are written into (see _start_streaming_plan)
+        self._streaming_plan = None
+        self._streamed_weeks = 0
     
-    def create_plan(self, user, user_data: Dict, use_comprehensive: bool = True) -> 'WorkoutPlan':
-        """Create a complete workout plan for user"""
-
+    def create_plan(self, user, user_data: Dict, use_comprehensive: bool = True,
+                    stream: bool = True, activate: bool = True) -> 'WorkoutPlan':
+        """
+        Create a complete workout plan for user; its AI calls are linked to the plan in the ledger.
+        stream=False skips the provisional streamed plan, activate=False saves the plan inactive
+        (both used by create_plan_hedged, which decides later which plan the user gets).
+        """
+        with ai_call_context(
+            user_id=user.id,
+            archetype=self.prompt_manager.normalize_archetype(user_data.get('archetype', 'peer')),
+            prompt_profile=self.prompt_manager.profile,
+        ) as ai_call_ids:
+            workout_plan = self._create_plan(user, user_data, use_comprehensive, stream, activate)
+        attach_plan(ai_call_ids, workout_plan)
+        return workout_plan
+    
+    def _create_plan(self, user, user_data: Dict, use_comprehensive: bool = True,
+                     stream: bool = True, activate: bool = True) -> 'WorkoutPlan':
         from apps.workouts.models import WorkoutPlan
 
         # Prevent race condition - check if plan generation is already in progress
@@ -80,6 +162,11 @@ class WorkoutPlanGenerator:
 
 
         
+        # Comprehensive reports are streamed: weeks land in a provisional plan while the AI is still writing
+        if (stream and use_comprehensive and getattr(settings, 'AI_STREAMING_ENABLED', True)
+                and not settings.FALLBACK_TO_LEGACY_FLOW):
+            self._start_streaming_plan(user)
+        
         try:
             logger.info(f"Starting plan generation for user {user.id}")
             logger.info(f"User data type: {type(user_data)}, keys: {list(user_data.keys()) if isinstance(user_data, dict) else 'not dict'}")
@@ -104,26 +191,46 @@ class WorkoutPlanGenerator:
             analysis_data = plan_data.get('analysis', {})
             plan_details = plan_data.get('plan', plan_data)  # Fallback for old structure
             
-            # Create workout plan
-            workout_plan = WorkoutPlan.objects.create(
-                user=user,
-                name=plan_details.get('plan_name', plan_details.get('operation_name', plan_details.get('study_name', 'Персональный план'))),
-                duration_weeks=12,  # 90 days ≈ 12 weeks  
-                # goal field removed - data stored in plan_data JSON
-                plan_data=plan_data,  # Store full AI response including analysis
-                ai_analysis=analysis_data,  # Store analysis separately for easier access
-                started_at=timezone.now()
-            )
-            logger.info(f"WorkoutPlan created successfully with id: {workout_plan.id}")
+            plan_name = plan_details.get('plan_name', plan_details.get('operation_name', plan_details.get('study_name', 'Персональный план')))
+            
+            if self._streaming_plan is not None:
+                # Finalize the provisional plan that already holds the streamed weeks
+                workout_plan = self._streaming_plan
+                workout_plan.name = plan_name
+                workout_plan.plan_data = plan_data
+                workout_plan.ai_analysis = analysis_data
+                workout_plan.save(update_fields=['name', 'plan_data', 'ai_analysis'])
+                logger.info(f"Streamed WorkoutPlan {workout_plan.id} finalized ({self._streamed_weeks} weeks streamed)")
+            else:
+                # Create workout plan
+                workout_plan = WorkoutPlan.objects.create(
+                    user=user,
+                    name=plan_name,
+                    duration_weeks=12,  # 90 days ≈ 12 weeks  
+                    # goal field removed - data stored in plan_data JSON
+                    plan_data=plan_data,  # Store full AI response including analysis
+                    ai_analysis=analysis_data,  # Store analysis separately for easier access
+                    is_active=activate,
+                    started_at=timezone.now()
+                )
+                logger.info(f"WorkoutPlan created successfully with id: {workout_plan.id}")
             
             logger.info("Creating daily workouts...")
-            # Create daily workouts
-            self._create_daily_workouts(workout_plan, plan_data)
+            # Create daily workouts (streamed days are overwritten with the validated version)
+            daily_workouts = self._create_daily_workouts(workout_plan, plan_data)
+            if self._streaming_plan is not None:
+                stale, _ = workout_plan.daily_workouts.exclude(id__in=[day.pk for day in daily_workouts]).delete()
+                if stale:
+                    logger.info(f"Removed {stale} streamed days not present in the final plan")
+                # Validated and fully written - only now visible to the dashboard and the recent-plan guard
+                workout_plan.is_active = True
+                workout_plan.save(update_fields=['is_active'])
+                self._streaming_plan = None  # no longer provisional
             logger.info("Daily workouts created successfully")
 
             logger.info("Generating video playlists...")
             # Generate video playlists for all workouts
-            self._generate_playlists(workout_plan, user_data)
+            self._generate_playlists(workout_plan, user_data, daily_workouts)
             logger.info("Video playlists generated successfully")
 
             logger.info("Updating user completion status...")
@@ -144,13 +251,178 @@ class WorkoutPlanGenerator:
             
         except AIClientError as e:
             logger.error(f"AI client error creating plan for user {user.id}: {str(e)}")
+            self._discard_streaming_plan()
             raise
         except Exception as e:
             logger.error(f"Unexpected error creating plan for user {user.id}: {str(e)}")
+            self._discard_streaming_plan()
             raise
     
-    def _create_daily_workouts(self, workout_plan, plan_data: Dict):
-        """Create daily workout records from plan data (supports both old weeks and new cycles/phases)"""
+    def create_plan_hedged(self, user, user_data: Dict, use_comprehensive: bool = True,
+                           latency_budget: Optional[float] = None,
+                           on_fallback_plan: Optional[Callable] = None) -> 'WorkoutPlan':
+        """
+        create_plan raced against a fallback template plan.
+
+        If the AI plan is not ready within latency_budget seconds, the fallback plan is saved
+        and handed to on_fallback_plan right away. AI generation keeps running and supersedes
+        the fallback when it arrives (recorded in WorkoutPlan.superseded_by/superseded_at).
+        """
+        if latency_budget is None:
+            latency_budget = getattr(settings, 'AI_HEDGE_LATENCY_BUDGET', 25)
+        started = time.monotonic()
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-hedge')
+        ai_future = executor.submit(self._create_plan_in_thread, user, user_data, use_comprehensive)
+        try:
+            # Build the fallback while the AI is working; it is only saved if the budget runs out
+            fallback_data = FallbackService().generate_default_workout_plan(
+                user_data, 'HEDGE_LATENCY_BUDGET'
+            ).dict()
+            
+            try:
+                ai_plan = ai_future.result(timeout=max(0.0, latency_budget - (time.monotonic() - started)))
+                if not ai_plan.is_active:
+                    ai_plan.is_active = True
+                    ai_plan.save(update_fields=['is_active'])
+                incr(MetricNames.AI_HEDGE_RESULT, result='ai_in_budget')
+                return ai_plan
+            except FutureTimeoutError:
+                pass
+            
+            incr(MetricNames.AI_HEDGE_TRIGGERED)
+            fallback_plan = self._save_fallback_plan(user, user_data, fallback_data)
+            logger.warning(f"⏱️ AI plan for user {user.id} not ready after {latency_budget:g}s, "
+                           f"serving fallback plan {fallback_plan.id}")
+            if on_fallback_plan:
+                on_fallback_plan(fallback_plan)
+            
+            try:
+                ai_plan = ai_future.result()
+            except Exception as e:
+                logger.error(f"AI generation failed after fallback plan {fallback_plan.id} was served: {e}")
+                incr(MetricNames.AI_HEDGE_RESULT, result='ai_failed')
+                self._mark_onboarding_complete(user)
+                return fallback_plan
+            
+            logger.info(f"AI plan {ai_plan.id} ready after {time.monotonic() - started:.1f}s")
+            return self._supersede_fallback_plan(fallback_plan, ai_plan)
+        finally:
+            executor.shutdown(wait=False)
+    
+    def _create_plan_in_thread(self, user, user_data: Dict, use_comprehensive: bool):
+        """create_plan on a worker thread (own DB connection, closed when done)"""
+        try:
+            # Not streamed and saved inactive: the served fallback stays the only active plan
+            # until _supersede_fallback_plan swaps them
+            return self.create_plan(user, user_data, use_comprehensive, stream=False, activate=False)
+        finally:
+            connection.close()
+    
+    def _save_fallback_plan(self, user, user_data: Dict, plan_data: Dict):
+        """Persist fallback plan with its days; playlists are generated on demand"""
+        from apps.workouts.models import WorkoutPlan
+        
+        # Separate generator: this one's streaming state belongs to the AI thread
+        materializer = WorkoutPlanGenerator(user=user, ai_client=self.ai_client, prompt_manager=self.prompt_manager)
+        
+        with transaction.atomic():
+            workout_plan = WorkoutPlan.objects.create(
+                user=user,
+                name=plan_data.get('plan_name') or 'Персональный план',
+                duration_weeks=plan_data.get('duration_weeks') or 4,
+                plan_data=plan_data,
+                generation_source='FALLBACK',
+                started_at=timezone.now()
+            )
+            materializer._create_daily_workouts(workout_plan, plan_data)
+        return workout_plan
+    
+    def _supersede_fallback_plan(self, fallback_plan, ai_plan):
+        """Swap the AI plan in for the served fallback plan; returns the plan that stays active"""
+        fallback_plan.refresh_from_db()
+        
+        if fallback_plan.daily_workouts.filter(completed_at__isnull=False).exists():
+            # User already trains on the fallback - don't pull it from under them
+            incr(MetricNames.AI_HEDGE_RESULT, result='kept_fallback')
+            logger.info(f"Fallback plan {fallback_plan.id} already in use, AI plan {ai_plan.id} kept inactive")
+            return fallback_plan
+        
+        with transaction.atomic():
+            # Keep the user where they were in the flow (e.g. fallback already confirmed)
+            ai_plan.status = fallback_plan.status
+            ai_plan.is_confirmed = fallback_plan.is_confirmed
+            ai_plan.is_active = True
+            ai_plan.save(update_fields=['status', 'is_confirmed', 'is_active'])
+            
+            fallback_plan.is_active = False
+            fallback_plan.superseded_by = ai_plan
+            fallback_plan.superseded_at = timezone.now()
+            fallback_plan.save(update_fields=['is_active', 'superseded_by', 'superseded_at'])
+        
+        incr(MetricNames.AI_HEDGE_RESULT, result='swapped')
+        logger.info(f"🔁 Fallback plan {fallback_plan.id} superseded by AI plan {ai_plan.id}")
+        return ai_plan
+    
+    def _start_streaming_plan(self, user):
+        """Create provisional DRAFT plan that receives weeks as they stream in (inactive until finalized)"""
+        from apps.workouts.models import WorkoutPlan
+        
+        self._streaming_plan = WorkoutPlan.objects.create(
+            user=user,
+            name='Персональный план',
+            duration_weeks=12,
+            plan_data={'streaming': True},
+            is_active=False,
+            started_at=timezone.now()
+        )
+        self._streamed_weeks = 0
+        logger.info(f"Provisional WorkoutPlan {self._streaming_plan.id} created for streamed generation")
+        return self._streaming_plan
+    
+    def _discard_streaming_plan(self):
+        """Remove provisional plan (and its streamed days) after a failed generation"""
+        if self._streaming_plan is not None and self._streaming_plan.pk:
+            logger.info(f"Discarding provisional WorkoutPlan {self._streaming_plan.pk}")
+            self._streaming_plan.delete()
+        self._streaming_plan = None
+    
+    def _materialize_streamed_chunk(self, array_key: str, element: Dict, user_data: Dict, allowed_slugs: Set[str]):
+        """Persist a streamed week right away; the final pass in create_plan overwrites it with the validated version"""
+        if self._streaming_plan is None:
+            return
+        if array_key != 'weeks':
+            # Comprehensive schema is weeks-based; cycles/phases are only materialized by the final pass
+            logger.debug(f"Ignoring streamed {array_key} element")
+            return
+        
+        week_plan, _, _ = self._enforce_allowed_exercises({'weeks': [element]}, allowed_slugs)
+        cleaned_weeks = self._validate_and_enhance_plan(week_plan, user_data)['weeks']
+        if not cleaned_weeks:
+            return
+        
+        # Prefer the week's own number: a retried stream restarts from week 1
+        self._streamed_weeks += 1
+        week_number = cleaned_weeks[0].get('week_number') or self._streamed_weeks
+        self._save_daily_workouts(self._streaming_plan,
+                                  self._build_week_days(week_number, cleaned_weeks[0].get('days', [])))
+        logger.info(f"📡 Week {week_number} materialized from stream for plan {self._streaming_plan.id}")
+    
+    def _save_daily_workouts(self, workout_plan, workouts: List) -> List:
+        """Write built days in one batch; streamed plans may already have some of them, so upsert there"""
+        from apps.workouts.services.plan_materializer import bulk_save_daily_workouts
+        
+        upsert = self._streaming_plan is not None and workout_plan.pk == self._streaming_plan.pk
+        bulk_save_daily_workouts(workout_plan, workouts, upsert=upsert)
+        return [workout for workout in workouts if workout.pk is not None]  # repeated days are dropped
+    
+    def _create_daily_workouts(self, workout_plan, plan_data: Dict) -> List:
+        """
+        Create daily workout records from plan data (supports both old weeks and new cycles/phases)
+        
+        All days are built in memory and written with one bulk INSERT; returns the saved
+        DailyWorkouts (with PKs) so playlist generation can use them without re-querying.
+        """
         
         logger.info(f"_create_daily_workouts called with plan_data type: {type(plan_data)}")
         
@@ -162,17 +434,20 @@ class WorkoutPlanGenerator:
         
         if cycles_data:
             logger.info(f"Found {len(cycles_data)} cycles/phases in new format")
-            self._process_cycles_structure(workout_plan, cycles_data)
+            workouts = self._process_cycles_structure(cycles_data)
         else:
             # Fallback to old weeks structure
             weeks_data = plan_details.get('weeks', [])
             logger.info(f"Found {len(weeks_data)} weeks in old format")
-            self._process_weeks_structure(workout_plan, weeks_data)
+            workouts = self._process_weeks_structure(weeks_data)
+        
+        return self._save_daily_workouts(workout_plan, workouts)
     
-    def _process_cycles_structure(self, workout_plan, cycles_data):
-        """Process new cycles/phases structure for 90-day plans"""
+    def _process_cycles_structure(self, cycles_data) -> List:
+        """Build (unsaved) DailyWorkouts from new cycles/phases structure for 90-day plans"""
         from apps.workouts.models import DailyWorkout
         
+        workouts = []
         for cycle in cycles_data:
             if not isinstance(cycle, dict):
                 logger.error(f"Cycle is not dict: {type(cycle)} = {cycle}")
@@ -212,16 +487,16 @@ class WorkoutPlanGenerator:
                 # Extract exercises from workout data - support both old and new formats
                 exercises = self._extract_exercises_from_day(workout)
                 
-                logger.info(f"Creating DailyWorkout for day {day_number} (week {week_number}) with {len(exercises)} exercises")
-                DailyWorkout.objects.create(
-                    plan=workout_plan,
-                    day_number=day_number,
+                logger.debug(f"Building DailyWorkout for day {day_number} (week {week_number}) with {len(exercises)} exercises")
+                workouts.append(DailyWorkout(
                     week_number=week_number,
+                    day_number=day_number,
                     name=workout_name,
                     exercises=exercises,
                     is_rest_day=workout.get('is_rest_day', False),
                     confidence_task=confidence_task_str
-                )
+                ))
+        return workouts
     
     def _extract_exercises_from_day(self, day_data: Dict) -> List[Dict]:
         """
@@ -257,44 +532,48 @@ class WorkoutPlanGenerator:
         logger.debug(f"Total extracted exercises: {len(exercises)}")
         return exercises
 
-    def _process_weeks_structure(self, workout_plan, weeks_data):
-        """Process old weeks structure (fallback)"""
-        from apps.workouts.models import DailyWorkout
-        
+    def _process_weeks_structure(self, weeks_data) -> List:
+        """Build (unsaved) DailyWorkouts from old weeks structure (fallback)"""
+        workouts = []
         for week_index, week in enumerate(weeks_data):
             if not isinstance(week, dict):
                 logger.error(f"Week {week_index} is not dict: {type(week)} = {week}")
                 continue
-                
-            days_data = week.get('days', [])
             
-            for day_index, day in enumerate(days_data):
-                if not isinstance(day, dict):
-                    logger.error(f"Day {day_index} is not dict: {type(day)} = {day}")
-                    continue
-                
-                confidence_task = day.get('confidence_task', '')
-                if isinstance(confidence_task, dict):
-                    confidence_task_str = confidence_task.get('description', '')
-                else:
-                    confidence_task_str = str(confidence_task)
-                
-                actual_week_number = week_index + 1  
-                actual_day_number = day_index + 1
-                
-                # Extract exercises from day data - support both old and new formats
-                exercises = self._extract_exercises_from_day(day)
-                
-                logger.info(f"Creating DailyWorkout for week {actual_week_number} day {actual_day_number} with {len(exercises)} exercises")
-                DailyWorkout.objects.create(
-                    plan=workout_plan,
-                    day_number=actual_day_number,
-                    week_number=actual_week_number,
-                    name=day.get('workout_name', f'День {actual_day_number}'),
-                    exercises=exercises,
-                    is_rest_day=day.get('is_rest_day', False),
-                    confidence_task=confidence_task_str
-                )
+            workouts.extend(self._build_week_days(week_index + 1, week.get('days', [])))
+        return workouts
+    
+    def _build_week_days(self, week_number: int, days_data: List[Dict]) -> List:
+        """Build (unsaved) DailyWorkouts for one week of the weeks structure"""
+        from apps.workouts.models import DailyWorkout
+        
+        workouts = []
+        for day_index, day in enumerate(days_data):
+            if not isinstance(day, dict):
+                logger.error(f"Day {day_index} is not dict: {type(day)} = {day}")
+                continue
+            
+            confidence_task = day.get('confidence_task', '')
+            if isinstance(confidence_task, dict):
+                confidence_task_str = confidence_task.get('description', '')
+            else:
+                confidence_task_str = str(confidence_task)
+            
+            actual_day_number = day_index + 1
+            
+            # Extract exercises from day data - support both old and new formats
+            exercises = self._extract_exercises_from_day(day)
+            
+            logger.debug(f"Building DailyWorkout for week {week_number} day {actual_day_number} with {len(exercises)} exercises")
+            workouts.append(DailyWorkout(
+                week_number=week_number,
+                day_number=actual_day_number,
+                name=day.get('workout_name', f'День {actual_day_number}'),
+                exercises=exercises,
+                is_rest_day=day.get('is_rest_day', False),
+                confidence_task=confidence_task_str
+            ))
+        return workouts
     
     def _update_onboarding_session(self, user, user_data: Dict, plan_data: Dict):
         """Update onboarding session with AI data"""
@@ -312,8 +591,8 @@ class WorkoutPlanGenerator:
             session.ai_response_data = plan_data
             session.save()
 
-    def _generate_playlists(self, workout_plan, user_data: Dict):
-        """Generate video playlists for all daily workouts in the plan"""
+    def _generate_playlists(self, workout_plan, user_data: Dict, daily_workouts: Optional[List] = None):
+        """Generate video playlists for all daily workouts in the plan (daily_workouts: days just saved)"""
         try:
             from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
 
@@ -321,9 +600,22 @@ class WorkoutPlanGenerator:
             archetype = user_data.get('archetype', 'mentor')
             archetype = self.prompt_manager.normalize_archetype(archetype)
 
+            if getattr(settings, 'PLAYLIST_SHARED_TEMPLATES', False):
+                # Plan reads a shared canonical program - no per-user playlist rows
+                from apps.workouts.services.playlist_templates import assign_playlist_template
+                if assign_playlist_template(workout_plan, archetype):
+                    return
+
+            if getattr(settings, 'PLAYLIST_LAZY_GENERATION', True):
+                # Days get playlists on first open; the first ones are prefetched in the background
+                from apps.workouts.services.day_playlists import schedule_playlist_prefetch
+                schedule_playlist_prefetch(workout_plan, archetype=archetype)
+                logger.info(f"Playlists for plan {workout_plan.id} will be generated on demand")
+                return
+
             # Generate playlists for entire plan
             generator = PlaylistGeneratorV2(workout_plan.user, archetype)
-            stats = generator.generate_full_program(workout_plan)
+            stats = generator.generate_full_program(workout_plan, workouts=daily_workouts)
 
             logger.info(f"Generated playlists for plan {workout_plan.id}: {stats}")
 
@@ -402,7 +694,7 @@ class WorkoutPlanGenerator:
                 if attempt < max_attempts:
                     incr(MetricNames.AI_REPROMPTED)
                     logger.warning(f"Reprompting due to {len(unresolved)} unresolved exercises")
-                    prompt = self._build_reprompt(prompt, unresolved, allowed_slugs)
+                    prompt = self._build_reprompt(prompt, unresolved)
                     continue
                 else:
                     # Final attempt failed
@@ -449,29 +741,25 @@ class WorkoutPlanGenerator:
             normalized_archetype = self.prompt_manager.normalize_archetype(archetype)
             logger.info(f"Generating comprehensive report for archetype: {normalized_archetype}")
             
-            # Build comprehensive prompt
-            prompt = self._build_comprehensive_prompt(user_data, allowed_slugs)
-            
-            # Get comprehensive system and user prompts
-            system_prompt, user_prompt = self.prompt_manager.get_prompt_pair(
-                'comprehensive', 
-                normalized_archetype, 
-                with_intro=True
-            )
-            
-            # Render user prompt with data
-            rendered_user_prompt = user_prompt.format(**user_data)
-            full_prompt = f"{system_prompt}\n\n{rendered_user_prompt}\n\n{prompt}"
+            full_prompt = self._assemble_comprehensive_prompt(user_data, normalized_archetype, allowed_slugs)
             
             # Generate comprehensive report
             if hasattr(self.ai_client, 'generate_comprehensive_report'):
                 logger.info("Using comprehensive report generation")
+                
+                # Streamed weeks go straight into the provisional plan
+                on_plan_chunk = None
+                if self._streaming_plan is not None:
+                    on_plan_chunk = partial(self._materialize_streamed_chunk,
+                                            user_data=user_data, allowed_slugs=allowed_slugs)
+                
                 validated_report = self.ai_client.generate_comprehensive_report(
                     full_prompt,
                     user_id=str(user_data.get('user_id', 'anonymous')),
                     archetype=normalized_archetype,
                     max_tokens=12288,
-                    temperature=0.7
+                    temperature=0.7,
+                    on_plan_chunk=on_plan_chunk
                 )
                 
                 # Convert ComprehensiveAIReport to dict format expected by downstream code
@@ -534,8 +822,28 @@ class WorkoutPlanGenerator:
                 )
                 return fallback_plan.dict()
     
-    def _build_comprehensive_prompt(self, user_data: Dict, allowed_slugs: Set[str]) -> str:
-        """Build comprehensive prompt with exercise whitelist"""
+    def _assemble_comprehensive_prompt(self, user_data: Dict, archetype: str, allowed_slugs: Set[str]) -> str:
+        """Full comprehensive prompt: system + rendered user data + compact whitelist, within the token budget"""
+        # Get comprehensive system and user prompts
+        system_prompt, user_prompt = self.prompt_manager.get_prompt_pair(
+            'comprehensive', 
+            archetype, 
+            with_intro=True
+        )
+        
+        # Render user prompt with data
+        rendered_user_prompt = user_prompt.format(**user_data)
+        
+        # Nothing here is safe to cut, so an over-budget prompt fails instead of losing the user's answers
+        budget = PromptBudget(label=f"comprehensive prompt ({archetype})", strict=True)
+        budget.add('system', system_prompt)
+        budget.add('user', rendered_user_prompt)
+        self._build_comprehensive_prompt(user_data, allowed_slugs, budget)
+        return budget.render()
+    
+    def _build_comprehensive_prompt(self, user_data: Dict, allowed_slugs: Set[str],
+                                    budget: PromptBudget = None) -> str:
+        """Build comprehensive prompt with exercise whitelist (added to budget as 'whitelist' section)"""
         
         # Fallback to real exercises from CSV/Cloudflare if allowed_slugs is empty
         if not allowed_slugs:
@@ -603,39 +911,10 @@ class WorkoutPlanGenerator:
                         'push-ups', 'squats', 'planks', 'burpees', 'lunges', 'crunches'
                     }
         
-        # Build comprehensive whitelist instruction  
-        whitelist_instruction = """
-КРИТИЧЕСКИ ВАЖНО - УПРАЖНЕНИЯ:
-Используйте ТОЛЬКО упражнения из этого списка в тренировочных планах:
-{', '.join(sorted(allowed_slugs))}
-
-ОБЯЗАТЕЛЬНЫЕ ТРЕБОВАНИЯ:
-1. Каждое упражнение ДОЛЖНО быть из списка выше
-2. Используйте точное название (exercise_slug)
-3. НЕ изобретайте новые упражнения
-4. Если нужно упражнение не из списка - выберите похожее из списка
-
-ПАРАМЕТРЫ rest_seconds (СТРОГО):
-- Силовые упражнения: 60-90 секунд
-- Кардио упражнения: 30-60 секунд  
-- Упражнения на гибкость: 15-30 секунд
-- Все значения должны быть от 10 до 600 секунд
-
-ВИДЕО-СИСТЕМА:
-- Каждое упражнение имеет предзаписанные видео
-- Включает: технику, типичные ошибки, инструкции по архетипам
-- Система автоматически генерирует плейлисты с мотивационными вставками
-- Используются только упражнения с полным видео-покрытием
-
-СТРУКТУРА ПЛЕЙЛИСТА (автоматически создается):
-- Вводное мотивационное видео
-- Инструкции по технике для каждого упражнения  
-- Видео разборов типичных ошибок
-- Промежуточная мотивация между упражнениями
-- Заключительное мотивационное видео
-
-ЗАДАЧА: Создать план используя ТОЛЬКО упражнения из whitelist выше!
-"""
+        # Build comprehensive whitelist instruction (compact id ranges)
+        budget = budget or PromptBudget(label='comprehensive whitelist')
+        budget.add_whitelist('whitelist', COMPREHENSIVE_WHITELIST_TEMPLATE, allowed_slugs)
+        whitelist_instruction = budget.sections[-1].text
 
         return whitelist_instruction
     
@@ -660,20 +939,10 @@ class WorkoutPlanGenerator:
         """Build prompt with exercise whitelist"""
         base_prompt = self._build_prompt(user_data)
         
-        # Add whitelist instruction
-        whitelist_instruction = """
-IMPORTANT: You MUST use ONLY exercises from this allowed list:
-{', '.join(sorted(allowed_slugs))}
-
-If you cannot find a suitable exercise from the list, choose the closest alternative based on:
-1. Same muscle group
-2. Similar equipment requirements  
-3. Similar difficulty level
-
-DO NOT use any exercises not in this list.
-"""
-        
-        return f"{base_prompt}\n\n{whitelist_instruction}"
+        budget = PromptBudget(label='plan prompt', strict=True)
+        budget.add('base', base_prompt)
+        budget.add_whitelist('whitelist', WHITELIST_TEMPLATE, allowed_slugs)
+        return budget.render()
     
     def _enforce_allowed_exercises(
         self, 
@@ -730,43 +999,70 @@ DO NOT use any exercises not in this list.
         
         return plan_data, substitutions, unresolved
     
-    def _build_reprompt(
-        self, 
-        original_prompt: str, 
-        unresolved: List[str], 
-        allowed_slugs: Set[str]
-    ) -> str:
+    def _build_reprompt(self, original_prompt: str, unresolved: List[str]) -> str:
         """Build reprompt for unresolved exercises"""
-        reprompt = """
-{original_prompt}
+        # Original prompt already carries the whitelist; drop earlier corrections instead of stacking them
+        base_prompt = original_prompt.split(REPROMPT_MARKER)[0].rstrip()
+        correction = f"""{REPROMPT_MARKER} The following exercises are not available and need replacement:
+{', '.join(sorted(set(unresolved)))}
 
-CORRECTION NEEDED: The following exercises are not available and need replacement:
-{', '.join(unresolved)}
-
-Please regenerate the plan using ONLY exercises from the allowed list.
+Please regenerate the plan using ONLY exercises from the allowed list above.
 Focus especially on finding good substitutes for the exercises listed above.
 Consider exercise difficulty and type when selecting alternatives.
-
-Allowed exercises: {', '.join(sorted(allowed_slugs))}
 """
-        return reprompt
+        budget = PromptBudget(label='reprompt')
+        budget.add('original', base_prompt)
+        budget.add('correction', correction)
+        return budget.render()
+
+    def adapt_weekly_plan(self, workout_plan, week_number: Optional[int] = None,
+                          user_feedback: Optional[List[Dict]] = None,
+                          user_archetype: Optional[str] = None) -> 'WorkoutPlanPatch':
+        """
+        Adapt the upcoming week based on user feedback.
+
+        Only that week's DailyWorkouts and a feedback digest go to the AI; it answers with
+        JSON-patch operations (see plan_delta) that are applied to the affected days and
+        stored as a WorkoutPlanPatch. plan_data is not rewritten.
+        """
+        from apps.workouts.models import DailyWorkout, WorkoutPlanPatch
+
+        from .plan_delta import apply_week_delta, merge_exercises, week_document
+
+        if week_number is None:
+            week_number = workout_plan.get_current_week() + 1
+        archetype = self.prompt_manager.normalize_archetype(
+            user_archetype or (workout_plan.plan_data or {}).get('user_archetype', 'mentor')
+        )
+
+        # Completed days are history - only the rest of the week can change
+        days = list(workout_plan.daily_workouts.filter(week_number=week_number, completed_at__isnull=True))
+        if not days:
+            raise ValueError(f"No upcoming days in week {week_number} of plan {workout_plan.id}")
 
-    def adapt_weekly_plan(self, current_plan: Dict, user_feedback: List[Dict], week_number: int, user_archetype: str = 'mentor') -> Dict:
-        """Adapt the plan for the upcoming week based on user feedback"""
-        adaptation_prompt = self._build_adaptation_prompt(current_plan, user_feedback, week_number, user_archetype)
+        if user_feedback is None:
+            user_feedback = self._collect_week_feedback(workout_plan, week_number - 1)
+        feedback_summary = self._summarize_feedback(user_feedback)
+
+        document = week_document(days)
+        adaptation_prompt = self._build_adaptation_prompt(document, feedback_summary, week_number, archetype)
         
         try:
             # Get system prompt for adaptation
-            system_prompt = self._get_adaptation_system_prompt(user_archetype)
-            
-            # Use AI client to generate response (returns Dict directly)
-            adaptation = self.ai_client.generate_completion(
-                f"{system_prompt}\n\n{adaptation_prompt}",
-                max_tokens=1000,
-                temperature=0.5
-            )
+            system_prompt = self._get_adaptation_system_prompt(archetype)
+            prompt = f"{system_prompt}\n\n{adaptation_prompt}"
             
-            return self._apply_adaptation(current_plan, adaptation, week_number)
+            started = time.monotonic()
+            with ai_call_context(user_id=workout_plan.user_id, plan_id=workout_plan.id, archetype=archetype,
+                                 prompt_profile=self.prompt_manager.profile):
+                # Delta schema, not the full plan schema (validated by the client)
+                adaptation = self.ai_client.generate_plan_delta(
+                    prompt,
+                    max_tokens=1500,
+                    temperature=0.5
+                )
+            response_ms = int((time.monotonic() - started) * 1000)
+            timing(MetricNames.AI_ADAPTATION_TIME, response_ms, archetype=archetype)
             
         except AIClientError as e:
             logger.error(f"AI client error adapting workout plan: {str(e)}")
@@ -774,6 +1070,66 @@ Allowed exercises: {', '.join(sorted(allowed_slugs))}
         except Exception as e:
             logger.error(f"Error adapting workout plan: {str(e)}")
             raise ValueError(f"Failed to adapt workout plan: {str(e)}")
+        
+        operations = adaptation['operations']
+        allowed_slugs = ExerciseValidationService.get_allowed_exercise_slugs(archetype=archetype)
+        patched, applied, rejected, touched = apply_week_delta(document, operations, allowed_slugs)
+        if rejected:
+            logger.warning(f"Week {week_number} adaptation: {len(rejected)} operations rejected: {rejected[:3]}")
+        incr(MetricNames.AI_ADAPTATION_OPERATIONS, len(applied), result='applied')
+        incr(MetricNames.AI_ADAPTATION_OPERATIONS, len(rejected), result='rejected')
+        
+        changed_days = []
+        for day in days:
+            key = str(day.day_number)
+            if key not in touched:
+                continue
+            patched_day = patched['days'][key]
+            day.name = patched_day['name']
+            day.is_rest_day = patched_day['is_rest_day']
+            day.confidence_task = patched_day['confidence_task']
+            day.exercises = [] if day.is_rest_day else merge_exercises(day.exercises or [], patched_day['exercises'])
+            changed_days.append(day)
+        
+        with transaction.atomic():
+            if changed_days:
+                DailyWorkout.objects.bulk_update(changed_days, ['name', 'is_rest_day', 'confidence_task', 'exercises'])
+            
+            patch = WorkoutPlanPatch.objects.create(
+                plan=workout_plan,
+                week_number=week_number,
+                operations=applied,
+                rejected_operations=rejected,
+                feedback_summary=feedback_summary,
+                notes=adaptation['notes'][:2000],
+                affected_days=len(changed_days),
+                prompt_chars=len(prompt),
+                response_ms=response_ms,
+            )
+            
+            # The patch row records every run (including "nothing to change"); the count only real changes
+            workout_plan.last_adaptation_date = timezone.now()
+            update_fields = ['last_adaptation_date']
+            if changed_days:
+                workout_plan.adaptation_count += 1
+                update_fields.append('adaptation_count')
+            workout_plan.save(update_fields=update_fields)
+        
+        logger.info(f"Adapted week {week_number} of plan {workout_plan.id}: {len(applied)} operations on "
+                    f"{len(changed_days)} days (prompt {len(prompt)} chars, {response_ms}ms)")
+        return patch
+    
+    def _collect_week_feedback(self, workout_plan, week_number: int) -> List[Dict]:
+        """Feedback dicts for _summarize_feedback from a finished week"""
+        return [
+            {
+                'completed': day['completed_at'] is not None,
+                'feedback_rating': day['feedback_rating'] or 'neutral',
+                'substitutions': day['substitutions'] or {},
+            }
+            for day in workout_plan.daily_workouts.filter(week_number=week_number, is_rest_day=False)
+            .values('completed_at', 'feedback_rating', 'substitutions')
+        ]
     
     def _build_prompt(self, user_data: Dict) -> str:
         """Build the prompt for plan generation using archetype-specific template"""
@@ -1012,76 +1368,42 @@ Allowed exercises: {', '.join(sorted(allowed_slugs))}
         return cleaned_plan
     
     
-    def _build_adaptation_prompt(self, current_plan: Dict, user_feedback: List[Dict], week_number: int, user_archetype: str = 'mentor') -> str:
-        """Build prompt for weekly adaptation based on archetype"""
-        self._summarize_feedback(user_feedback)
-        
-        # Archetype-specific prompt introductions
+    def _build_adaptation_prompt(self, week: Dict, feedback_summary: Dict, week_number: int, user_archetype: str = 'mentor') -> str:
+        """Build adaptation prompt: upcoming week document + feedback digest, delta-only response"""
         archetype_intros = {
-            'bro': f"Эй, братан! Давай посмотрим как прошла неделя {week_number - 1} и адаптируем план для недели {week_number}.",
-            'sergeant': f"Рапорт по неделе {week_number - 1} получен. Анализируем результаты и корректируем план для недели {week_number}.",
-            'intellectual': f"Анализируем данные по неделе {week_number - 1} для оптимизации протокола недели {week_number}."
-        }
-        
-        # Archetype-specific response formats
-        archetype_responses = {
-            'bro': """
-            Верни JSON с адаптациями в дружелюбном стиле:
-            {{
-                "intensity_adjustment": "increase|maintain|decrease",
-                "exercise_swaps": [
-                    {{"from": "exercise_slug", "to": "exercise_slug", "reason": "Понятное объяснение почему меняем"}}
-                ],
-                "volume_changes": {{"exercise_slug": {{"sets": number, "reps": "string"}}}},
-                "bro_motivation": "Мотивирующее сообщение от бро-тренера",
-                "additional_notes": "Дружеские советы и объяснения"
-            }}
-            """,
-            
-            'sergeant': """
-            Верни JSON с тактическими корректировками:
-            {{
-                "intensity_adjustment": "increase|maintain|decrease",
-                "exercise_swaps": [
-                    {{"from": "exercise_slug", "to": "exercise_slug", "reason": "Тактическое обоснование замены"}}
-                ],
-                "volume_changes": {{"exercise_slug": {{"sets": number, "reps": "string"}}}},
-                "sergeant_orders": "Приказы и указания на неделю",
-                "additional_notes": "Стратегические рекомендации"
-            }}
-            """,
-            
-            'intellectual': """
-            Верни JSON с научно обоснованными корректировками:
-            {{
-                "intensity_adjustment": "increase|maintain|decrease",
-                "exercise_swaps": [
-                    {{"from": "exercise_slug", "to": "exercise_slug", "reason": "Научное обоснование замены"}}
-                ],
-                "volume_changes": {{"exercise_slug": {{"sets": number, "reps": "string"}}}},
-                "research_insights": "Научные инсайты и данные",
-                "additional_notes": "Методологические рекомендации"
-            }}
-            """
+            'peer': f"Эй! Давай посмотрим как прошла неделя {week_number - 1} и подправим план на неделю {week_number}.",
+            'professional': f"Рапорт по неделе {week_number - 1} получен. Корректируем план на неделю {week_number}.",
+            'mentor': f"Анализируем данные по неделе {week_number - 1} для оптимизации протокола недели {week_number}.",
         }
+        intro = archetype_intros.get(user_archetype, archetype_intros['mentor'])
+        challenging = ', '.join(feedback_summary['challenging_exercises']) or 'нет'
         
-        archetype_intros.get(user_archetype, archetype_intros['bro'])
-        archetype_responses.get(user_archetype, archetype_responses['bro'])
-        
-        return """
-        {intro}
-        
-        Анализ обратной связи:
-        - Процент завершения: {feedback_summary['completion_rate']}%
-        - Средняя сложность: {feedback_summary['avg_difficulty']}
-        - Самые сложные упражнения: {', '.join(feedback_summary['challenging_exercises'])}
-        - Количество замен: {feedback_summary['substitution_count']}
-        
-        Текущий план для недели {week_number}:
-        {json.dumps(current_plan['weeks'][week_number - 1], indent=2)}
-        
-        {response_format}
-        """
+        return f"""
+{intro}
+
+Обратная связь за прошлую неделю:
+- Процент завершения: {feedback_summary['completion_rate']}%
+- Средняя сложность (1 - легко, 4 - тяжело): {feedback_summary['avg_difficulty']}
+- Чаще всего заменяли: {challenging}
+- Количество замен: {feedback_summary['substitution_count']}
+
+Оставшиеся дни недели {week_number} (ключ - номер дня):
+{json.dumps(week, ensure_ascii=False, separators=(',', ':'))}
+
+Верни ТОЛЬКО изменения в виде JSON-patch операций над этим документом (не весь план):
+{{
+    "operations": [
+        {{"op": "replace", "path": "/days/<день>/exercises/<индекс>/sets", "value": 4}},
+        {{"op": "replace", "path": "/days/<день>/exercises/<индекс>/exercise_slug", "value": "<slug из текущего плана или whitelist>"}},
+        {{"op": "add", "path": "/days/<день>/exercises/-", "value": {{"exercise_slug": "...", "sets": 3, "reps": "8-12", "rest_seconds": 60}}}},
+        {{"op": "remove", "path": "/days/<день>/exercises/<индекс>", "value": null}},
+        {{"op": "replace", "path": "/days/<день>/is_rest_day", "value": true}}
+    ],
+    "notes": "Короткое объяснение изменений в стиле тренера"
+}}
+Изменяемые поля: name, is_rest_day, confidence_task, exercises и поля упражнений
+exercise_slug, sets, reps, rest_seconds. Если менять нечего - верни пустой список operations.
+"""
     
     def _summarize_feedback(self, user_feedback: List[Dict]) -> Dict:
         """Summarize user feedback for the adaptation prompt"""
@@ -1091,113 +1413,16 @@ Allowed exercises: {', '.join(sorted(allowed_slugs))}
         difficulty_map = {'fire': 1, 'smile': 2, 'neutral': 3, 'tired': 4}
         difficulties = [difficulty_map.get(f.get('feedback_rating', 'neutral'), 3) for f in user_feedback]
         
+        # Exercises the user swapped out most often
+        swapped = Counter(slug for f in user_feedback for slug in (f.get('substitutions') or {}))
+        
         return {
             'completion_rate': int((completed_workouts / total_workouts * 100) if total_workouts > 0 else 0),
-            'avg_difficulty': sum(difficulties) / len(difficulties) if difficulties else 3,
-            'challenging_exercises': [],  # Would need to analyze exercise-level feedback
-            'substitution_count': sum(len(f.get('substitutions', {})) for f in user_feedback)
+            'avg_difficulty': round(sum(difficulties) / len(difficulties), 1) if difficulties else 3,
+            'challenging_exercises': [slug for slug, _ in swapped.most_common(5)],
+            'substitution_count': sum(swapped.values())
         }
     
-    
-    def _apply_adaptation(self, current_plan: Dict, adaptation: Dict, week_number: int) -> Dict:
-        """Apply the suggested adaptations to the plan"""
-        logger.info(f"Applying adaptations for week {week_number}: {adaptation}")
-        
-        # Create a deep copy to avoid modifying the original
-        import copy
-        adapted_plan = copy.deepcopy(current_plan)
-        
-        adaptations = adaptation.get('adaptations', {})
-        
-        # Apply intensity adjustments
-        intensity_adj = adaptations.get('intensity_adjustment', 0)
-        if intensity_adj != 0:
-            self._adjust_plan_intensity(adapted_plan, intensity_adj, week_number)
-        
-        # Apply volume adjustments  
-        volume_adj = adaptations.get('volume_adjustment', 0)
-        if volume_adj != 0:
-            self._adjust_plan_volume(adapted_plan, volume_adj, week_number)
-        
-        # Apply exercise substitutions
-        substitutions = adaptations.get('exercise_substitutions', {})
-        if substitutions:
-            self._apply_exercise_substitutions(adapted_plan, substitutions, week_number)
-        
-        # Apply rest day adjustments
-        if adaptations.get('rest_day_adjustment', False):
-            self._adjust_rest_days(adapted_plan, week_number)
-        
-        return adapted_plan
-    
-    def _adjust_plan_intensity(self, plan: Dict, intensity_change: int, week_number: int):
-        """Adjust workout intensity for specific week"""
-        weeks = plan.get('weeks', [])
-        for week in weeks:
-            if week.get('week_number') == week_number:
-                for day in week.get('days', []):
-                    if not day.get('is_rest_day', False):
-                        for exercise in day.get('exercises', []):
-                            # Increase/decrease rest time inversely to intensity
-                            current_rest = exercise.get('rest_seconds', 60)
-                            if intensity_change > 0:
-                                # Higher intensity = less rest
-                                new_rest = max(30, current_rest - (intensity_change * 2))
-                            else:
-                                # Lower intensity = more rest
-                                new_rest = min(120, current_rest + (abs(intensity_change) * 2))
-                            exercise['rest_seconds'] = new_rest
-    
-    def _adjust_plan_volume(self, plan: Dict, volume_change: int, week_number: int):
-        """Adjust workout volume (sets/reps) for specific week"""
-        weeks = plan.get('weeks', [])
-        for week in weeks:
-            if week.get('week_number') == week_number:
-                for day in week.get('days', []):
-                    if not day.get('is_rest_day', False):
-                        for exercise in day.get('exercises', []):
-                            # Adjust sets
-                            current_sets = exercise.get('sets', 3)
-                            if volume_change > 0:
-                                new_sets = min(5, current_sets + 1)
-                            else:
-                                new_sets = max(2, current_sets - 1)
-                            exercise['sets'] = new_sets
-    
-    def _apply_exercise_substitutions(self, plan: Dict, substitutions: Dict, week_number: int):
-        """Apply exercise substitutions for specific week"""
-        weeks = plan.get('weeks', [])
-        for week in weeks:
-            if week.get('week_number') == week_number:
-                for day in week.get('days', []):
-                    if not day.get('is_rest_day', False):
-                        exercises = day.get('exercises', [])
-                        for i, exercise in enumerate(exercises):
-                            old_slug = exercise.get('exercise_slug')
-                            if old_slug in substitutions:
-                                new_slug = substitutions[old_slug]
-                                exercise['exercise_slug'] = new_slug
-                                logger.info(f"Substituted {old_slug} with {new_slug} in week {week_number}")
-    
-    def _adjust_rest_days(self, plan: Dict, week_number: int):
-        """Adjust rest day placement for specific week"""
-        weeks = plan.get('weeks', [])
-        for week in weeks:
-            if week.get('week_number') == week_number:
-                days = week.get('days', [])
-                # Find current rest days
-                rest_days = [i for i, day in enumerate(days) if day.get('is_rest_day', False)]
-                workout_days = [i for i, day in enumerate(days) if not day.get('is_rest_day', False)]
-                
-                # If user needs more recovery, add a rest day
-                if len(rest_days) < 2 and len(workout_days) > 3:
-                    # Convert the last workout day to rest day
-                    if workout_days:
-                        last_workout_idx = workout_days[-1]
-                        days[last_workout_idx]['is_rest_day'] = True
-                        days[last_workout_idx]['exercises'] = []
-                        days[last_workout_idx]['workout_name'] = 'День отдыха'
-    
     def generate_evolved_plan(self, user, evolution_context: Dict, archetype: str = 'mentor') -> Dict:
         """Generate an evolved workout plan for a new 6-week cycle"""
         evolution_prompt = self._build_evolution_prompt(user, evolution_context, archetype)
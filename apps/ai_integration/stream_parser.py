@@ -0,0 +1,130 @@
+"""
+Incremental parser for streamed structured-output JSON
+
+GPT-5 Responses API streams the report as text deltas. Instead of waiting for the
+whole document, StreamingJSONArrayExtractor scans deltas as they arrive and emits
+each element of the watched arrays (weeks / cycles / phases) the moment its
+closing brace is received, so persistence can start on week 1 while the model is
+still writing week 12.
+"""
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARRAY_KEYS = ('weeks', 'cycles', 'phases')
+
+
+class StreamingJSONArrayExtractor:
+    """Emit completed objects from watched JSON arrays while text is still streaming"""
+
+    def __init__(self, array_keys: Iterable[str] = DEFAULT_ARRAY_KEYS, keep_text: bool = True):
+        self.array_keys = frozenset(array_keys)
+        self.keep_text = keep_text
+
+        self._chunks: List[str] = []
+        # Stack of open containers: [type ('{' or '['), key in parent, is_watched_array]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._escape = False
+        self._string_is_key = False
+        self._key_chars: List[str] = []
+        self._last_key: Optional[str] = None
+        self._pending_key: Optional[str] = None
+        self._expect_key = False
+
+        # Capture of the watched element currently being streamed
+        self._capture: Optional[List[str]] = None
+        self._capture_depth = 0
+        self._capture_key: Optional[str] = None
+
+        self.emitted = 0
+
+    @property
+    def text(self) -> str:
+        """Full text received so far (empty if keep_text=False)"""
+        return ''.join(self._chunks)
+
+    def feed(self, delta: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consume a text delta; return (array_key, element) for every element completed by it"""
+        if not delta:
+            return []
+
+        if self.keep_text:
+            self._chunks.append(delta)
+
+        completed = []
+        capture_start = 0 if self._capture is not None else None
+
+        for i, ch in enumerate(delta):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._last_key = ''.join(self._key_chars)
+                        continue
+                if self._string_is_key and self._in_string:
+                    self._key_chars.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_is_key = self._expect_key
+                self._key_chars = []
+            elif ch == ':':
+                self._pending_key = self._last_key
+                self._expect_key = False
+            elif ch == ',':
+                self._expect_key = bool(self._stack) and self._stack[-1][0] == '{'
+            elif ch in '{[':
+                parent = self._stack[-1] if self._stack else None
+                key = self._pending_key if parent is not None and parent[0] == '{' else None
+                self._pending_key = None
+
+                if ch == '{' and self._capture is None and parent is not None and parent[2]:
+                    self._capture = []
+                    self._capture_depth = len(self._stack) + 1
+                    self._capture_key = parent[1]
+                    capture_start = i
+
+                self._stack.append([ch, key, ch == '[' and key in self.array_keys])
+                self._expect_key = ch == '{'
+            elif ch in '}]':
+                if not self._stack:
+                    continue
+                depth = len(self._stack)
+                self._stack.pop()
+                self._expect_key = False
+
+                if self._capture is not None and depth == self._capture_depth:
+                    self._capture.append(delta[capture_start:i + 1])
+                    element = self._finish_capture()
+                    if element is not None:
+                        completed.append((self._capture_key, element))
+                    self._capture = None
+                    capture_start = None
+
+        if self._capture is not None and capture_start is not None:
+            self._capture.append(delta[capture_start:])
+
+        return completed
+
+    def _finish_capture(self) -> Optional[Dict[str, Any]]:
+        """Decode the captured element; malformed fragments are skipped and left to final validation"""
+        raw = ''.join(self._capture)
+        try:
+            element = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Streamed {self._capture_key} element is not valid JSON, skipping: {e}")
+            return None
+
+        if not isinstance(element, dict):
+            return None
+
+        self.emitted += 1
+        return element
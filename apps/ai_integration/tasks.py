@@ -0,0 +1,17 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from .ledger import prune_ledger
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def cleanup_ai_call_ledger_task(days_to_keep: int = None):
+    """Drop AI call ledger rows older than AI_LEDGER_RETENTION_DAYS"""
+    days_to_keep = days_to_keep or getattr(settings, 'AI_LEDGER_RETENTION_DAYS', 90)
+    deleted_count = prune_ledger(days_to_keep)
+    logger.info(f"Cleaned up {deleted_count} AI call ledger records (older than {days_to_keep} days)")
+    return {"deleted_count": deleted_count}
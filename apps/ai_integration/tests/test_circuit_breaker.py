@@ -0,0 +1,181 @@
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from django.core.cache import cache
+
+from apps.ai_integration import circuit_breaker as circuit_module
+from apps.ai_integration.ai_client_gpt5 import CircuitOpenError, OpenAIClient
+from apps.ai_integration.circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+from apps.ai_integration.rate_limit import AdaptiveConcurrencyLimiter, LoadShedError
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(settings, monkeypatch):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                   'LOCATION': 'circuit-breaker-tests'}}
+    settings.AI_CIRCUIT_BREAKER_ENABLED = True
+    cache.clear()
+    clock = Clock()
+    monkeypatch.setattr(circuit_module, 'time', clock)
+    yield clock
+    cache.clear()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('test', failure_threshold=0.5, min_calls=4, window_seconds=60, reset_timeout=30)
+
+
+def test_opens_on_error_rate(breaker):
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED  # below min_calls
+
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow_request()
+
+
+def test_low_error_rate_stays_closed(breaker):
+    for _ in range(3):
+        breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+
+
+def test_half_open_lets_one_probe_through(breaker, clock):
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now += 30
+
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_probe_success_closes(breaker, clock):
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+
+
+def test_failure_after_probe_success_does_not_reopen(breaker, clock):
+    clock.now -= clock.now % 60  # start of a window
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now += 30  # probe lands in the window that tripped the circuit
+    breaker.allow_request()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == STATE_CLOSED
+
+
+def test_probe_failure_reopens(breaker, clock):
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.allow_request()
+    clock.now += 61  # fresh window: a single failure would not reach min_calls
+    breaker.record_failure()
+
+    assert breaker.state == STATE_OPEN
+
+
+def test_disabled_breaker_is_always_closed(clock, settings):
+    settings.AI_CIRCUIT_BREAKER_ENABLED = False
+    breaker = CircuitBreaker('test', min_calls=1)
+    breaker.record_failure()
+
+    assert breaker.state == STATE_CLOSED and breaker.allow_request()
+
+
+def test_aimd_limit_grows_additively_and_shrinks_multiplicatively():
+    limiter = AdaptiveConcurrencyLimiter('test', initial=4, min_limit=1, max_limit=6, backoff_ratio=0.5)
+
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(success=True)
+    assert limiter.limit == 5  # +1/limit per success: ~1 per limit successes
+
+    limiter.acquire()
+    limiter.release(success=False)
+    assert limiter.limit == 2
+
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(success=False)
+    assert limiter.limit == 1  # never below min_limit
+    assert limiter.in_flight == 0
+
+
+def test_aimd_slow_calls_count_as_overload():
+    limiter = AdaptiveConcurrencyLimiter('test', initial=8, latency_target=1.0, backoff_ratio=0.5)
+    limiter.acquire()
+    limiter.release(success=True, latency=5.0)
+
+    assert limiter.limit == 4
+
+
+def test_aimd_sheds_load_when_full():
+    limiter = AdaptiveConcurrencyLimiter('test', initial=1, max_limit=1, queue_timeout=0.05)
+    limiter.acquire()
+
+    assert not limiter.try_acquire()
+    with pytest.raises(LoadShedError):
+        limiter.acquire()
+
+    released = threading.Timer(0.05, limiter.release, kwargs={'success': True})
+    released.start()
+    limiter.acquire(timeout=1)
+    assert limiter.in_flight == 1
+
+
+@pytest.fixture
+def client(clock, settings):
+    settings.OPENAI_API_KEY = 'sk-test'
+    settings.OPENAI_MODEL = 'gpt-5'
+    settings.OPENAI_MAX_RETRIES = 3
+    client = OpenAIClient()
+    client.upstream_name = 'structured-test'
+    client.circuit_breaker = CircuitBreaker('structured-test', min_calls=2, failure_threshold=0.5)
+    client.concurrency_limiter = AdaptiveConcurrencyLimiter('structured-test')
+    client.calls = 0
+
+    def create(**api_params):
+        client.calls += 1
+        raise httpx.ConnectError('connection refused')
+
+    client.client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    return client
+
+
+def test_structured_call_is_behind_the_breaker(client, monkeypatch):
+    monkeypatch.setattr('apps.ai_integration.ai_client_gpt5.time.sleep', lambda seconds: None)
+
+    with pytest.raises(CircuitOpenError):
+        client._make_structured_api_call('prompt', 100, 0.5)
+    assert client.calls == 2  # retries stop once the circuit opens
+
+    with pytest.raises(CircuitOpenError):
+        client._make_structured_api_call('prompt', 100, 0.5)
+    assert client.calls == 2  # fails fast without calling OpenAI
+    assert client.concurrency_limiter.in_flight == 0
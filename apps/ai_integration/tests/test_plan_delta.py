@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+
+from apps.ai_integration.plan_delta import apply_week_delta, merge_exercises, week_document
+
+ALLOWED = {'main_001', 'main_002', 'main_003'}
+
+
+def make_day(day_number, exercises, name='День', is_rest_day=False):
+    return SimpleNamespace(day_number=day_number, name=name, is_rest_day=is_rest_day,
+                           confidence_task='', exercises=exercises)
+
+
+@pytest.fixture
+def document():
+    return week_document([
+        make_day(8, [
+            {'exercise_slug': 'main_001', 'sets': 3, 'reps': '8-12', 'rest_seconds': 60, 'name': 'Отжимания'},
+            {'exercise_slug': 'main_002', 'sets': 3, 'reps': '10', 'rest_seconds': 90},
+        ]),
+        make_day(9, [], name='Отдых', is_rest_day=True),
+    ])
+
+
+def test_week_document_is_compact(document):
+    assert set(document['days']) == {'8', '9'}
+    assert document['days']['8']['exercises'][0] == {
+        'exercise_slug': 'main_001', 'sets': 3, 'reps': '8-12', 'rest_seconds': 60,
+    }
+
+
+def test_apply_operations(document):
+    operations = [
+        {'op': 'replace', 'path': '/days/8/exercises/0/sets', 'value': 4},
+        {'op': 'add', 'path': '/days/8/exercises/-',
+         'value': {'exercise_slug': 'main_003', 'sets': 2, 'reps': '15', 'rest_seconds': 45}},
+        {'op': 'remove', 'path': '/days/8/exercises/1', 'value': None},
+    ]
+    patched, applied, rejected, touched = apply_week_delta(document, operations, ALLOWED)
+
+    assert applied == operations
+    assert rejected == []
+    assert touched == {'8'}
+    assert [e['exercise_slug'] for e in patched['days']['8']['exercises']] == ['main_001', 'main_003']
+    assert patched['days']['8']['exercises'][0]['sets'] == 4
+    # Input document is not modified
+    assert document['days']['8']['exercises'][0]['sets'] == 3
+
+
+@pytest.mark.parametrize('operation', [
+    {'op': 'move', 'path': '/days/8/exercises/0', 'from': '/days/8/exercises/1'},
+    {'op': 'replace', 'path': '/plan_name', 'value': 'x'},
+    {'op': 'replace', 'path': '/days/99/name', 'value': 'x'},
+    {'op': 'replace', 'path': '/days/8/exercises/5/sets', 'value': 4},
+    {'op': 'replace', 'path': '/days/8/exercises/0/sets', 'value': 50},
+    {'op': 'replace', 'path': '/days/8/exercises/0/sets', 'value': True},
+    {'op': 'replace', 'path': '/days/8/exercises/0/exercise_slug', 'value': 'made_up_exercise'},
+    {'op': 'add', 'path': '/days/8/exercises/-', 'value': {'sets': 3}},
+    {'op': 'remove', 'path': '/days/8/name', 'value': None},
+    {'op': 'replace', 'path': '/days/8/exercises/0/video_url', 'value': 'http://evil'},
+    {'op': 'replace', 'path': '/days/8/is_rest_day'},
+])
+def test_unsafe_operations_are_rejected(document, operation):
+    patched, applied, rejected, touched = apply_week_delta(document, [operation], ALLOWED)
+
+    assert applied == []
+    assert len(rejected) == 1 and rejected[0]['operation'] == operation
+    assert touched == set()
+    assert patched == document
+
+
+def test_bad_operation_does_not_discard_the_rest(document):
+    operations = [
+        {'op': 'replace', 'path': '/days/8/exercises/0/exercise_slug', 'value': 'made_up_exercise'},
+        {'op': 'replace', 'path': '/days/9/is_rest_day', 'value': False},
+    ]
+    patched, applied, rejected, touched = apply_week_delta(document, operations, ALLOWED)
+
+    assert applied == operations[1:]
+    assert len(rejected) == 1
+    assert touched == {'9'}
+    assert patched['days']['9']['is_rest_day'] is False
+
+
+def test_merge_exercises_keeps_stored_fields():
+    original = [
+        {'exercise_slug': 'main_001', 'sets': 3, 'name': 'Отжимания', 'notes': 'медленно'},
+        {'exercise_slug': 'main_002', 'sets': 3, 'name': 'Приседания'},
+    ]
+    patched = [
+        {'exercise_slug': 'main_002', 'sets': 4},
+        {'exercise_slug': 'main_003', 'sets': 2},
+    ]
+    merged = merge_exercises(original, patched)
+
+    assert merged == [
+        {'exercise_slug': 'main_002', 'sets': 4, 'name': 'Приседания'},
+        {'exercise_slug': 'main_003', 'sets': 2},
+    ]
+
+
+def test_round_trip_without_operations():
+    days = [make_day(8, [{'exercise_slug': 'main_001', 'sets': 3, 'reps': '8', 'rest_seconds': 60, 'name': 'X'}])]
+    document = week_document(days)
+    patched, applied, rejected, touched = apply_week_delta(document, [], ALLOWED)
+
+    assert patched == document and touched == set()
+    assert merge_exercises(days[0].exercises, patched['days']['8']['exercises']) == days[0].exercises
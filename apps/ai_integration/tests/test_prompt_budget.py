@@ -0,0 +1,75 @@
+import pytest
+
+from apps.ai_integration.prompt_budget import PromptBudget, PromptBudgetExceeded, count_tokens, encode_whitelist
+
+WORDS = ' '.join(f'word{i}' for i in range(2000))
+
+
+def test_encode_whitelist_collapses_ranges():
+    slugs = ['main_003', 'main_001', 'main_002', 'main_005', 'main_006', 'push-ups', 'warmup_10']
+
+    assert encode_whitelist(slugs) == 'main_001..main_003, main_005, main_006, warmup_10, push-ups'
+
+
+def test_within_budget_is_unchanged():
+    budget = PromptBudget(max_tokens=10_000).add('system', 'system text').add('user', WORDS[:200], trimmable=True)
+
+    assert budget.render() == f'system text\n\n{WORDS[:200]}'
+
+
+def test_single_line_section_is_truncated_not_dropped():
+    budget = PromptBudget(max_tokens=500).add('system', 'system text').add('user', WORDS, trimmable=True)
+    prompt = budget.render()
+
+    user_text = budget.sections[1].text
+    assert user_text and WORDS.startswith(user_text)
+    assert budget.total_tokens <= 500
+    assert prompt.endswith(user_text)
+
+
+def test_lines_are_kept_whole_before_cutting_the_next_one():
+    lines = [f'line {i}: ' + ' '.join(f'w{j}' for j in range(40)) for i in range(50)]
+    budget = PromptBudget(max_tokens=600).add('user', '\n'.join(lines), trimmable=True)
+    budget.render()
+
+    kept = budget.sections[0].text.splitlines()
+    assert kept[:-1] == lines[:len(kept) - 1]
+    assert lines[len(kept) - 1].startswith(kept[-1])
+    assert budget.total_tokens <= 600
+
+
+def test_required_sections_are_never_removed():
+    required = 'required ' * 400
+    budget = PromptBudget(max_tokens=100).add('system', required).add('user', WORDS, trimmable=True)
+    prompt = budget.render()
+
+    assert budget.sections[0].text == required
+    assert count_tokens(budget.sections[1].text) >= PromptBudget.MIN_SECTION_TOKENS - 1
+    assert prompt.startswith(required)
+
+
+def test_lower_priority_sections_are_trimmed_first():
+    budget = PromptBudget(max_tokens=1200)
+    budget.add('examples', WORDS, trimmable=True, priority=0)
+    budget.add('user', WORDS[:2000], trimmable=True, priority=1)
+    budget.render()
+
+    assert budget.sections[1].text == WORDS[:2000]
+    assert budget.report()['examples']['saved_tokens'] > 0
+
+
+def test_strict_budget_fails_instead_of_cutting_required_sections():
+    budget = PromptBudget(max_tokens=100, strict=True).add('system', 'system text').add('user', WORDS)
+
+    with pytest.raises(PromptBudgetExceeded):
+        budget.render()
+    assert budget.sections[1].text == WORDS
+
+
+def test_strict_budget_trims_optional_context_first():
+    budget = PromptBudget(max_tokens=500, strict=True)
+    budget.add('user', WORDS[:500]).add('examples', WORDS, trimmable=True)
+    budget.render()
+
+    assert budget.sections[0].text == WORDS[:500]
+    assert budget.total_tokens <= 500
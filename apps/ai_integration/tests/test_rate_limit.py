@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from apps.ai_integration import rate_limit
+from apps.ai_integration.ai_client_gpt5 import OpenAIClient
+from apps.ai_integration.rate_limit import TokenBucket
+
+
+class Clock:
+    """Fake monotonic clock; sleeping advances it"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    return clock
+
+
+def test_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_per_minute_bucket():
+    bucket = TokenBucket.per_minute(120, burst=3)
+
+    assert bucket.rate == 2.0
+    assert bucket.capacity == 3
+
+
+def test_burst_then_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=2)
+    clock.now += 60
+
+    assert bucket.try_acquire(2)
+    assert not bucket.try_acquire()
+
+
+def test_acquire_waits_for_tokens(clock):
+    bucket = TokenBucket(rate=4, capacity=1)
+    bucket.acquire()
+
+    assert bucket.acquire()
+    assert clock.slept == [0.25]
+
+
+def test_acquire_timeout(clock):
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.acquire()
+
+    assert bucket.acquire(timeout=0.5) is False
+    assert bucket.acquire(timeout=0.5) is True
+
+
+def test_acquire_more_than_capacity_fails():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, capacity=2).acquire(3)
+
+
+def test_shared_bucket_limits_threads():
+    bucket = TokenBucket(rate=50, capacity=1)
+    bucket.acquire()
+    started = time.monotonic()
+
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - started >= 10 / 50 * 0.9
+
+
+def test_client_takes_a_token_per_request(settings):
+    settings.OPENAI_API_KEY = 'sk-test'
+    settings.OPENAI_MODEL = 'gpt-5'
+    taken = []
+    bucket = SimpleNamespace(acquire=lambda: taken.append(1))
+    client = OpenAIClient(rate_limiter=bucket)
+
+    item = SimpleNamespace(type='message', content=[SimpleNamespace(type='output_text', text=json.dumps({'a': 1}))])
+    client.client = SimpleNamespace(responses=SimpleNamespace(create=lambda **params: SimpleNamespace(output=[item])))
+
+    for _ in range(3):
+        client._make_structured_api_call('prompt', 100, 0.5)
+    assert len(taken) == 3
+
+
+def test_client_retries_take_tokens_too(settings, monkeypatch):
+    settings.OPENAI_API_KEY = 'sk-test'
+    settings.OPENAI_MODEL = 'gpt-5'
+    settings.OPENAI_MAX_RETRIES = 3
+    settings.AI_CIRCUIT_BREAKER_ENABLED = False
+    monkeypatch.setattr('apps.ai_integration.ai_client_gpt5.time.sleep', lambda seconds: None)
+    taken = []
+    client = OpenAIClient(rate_limiter=SimpleNamespace(acquire=lambda: taken.append(1)))
+    item = SimpleNamespace(type='message', content=[SimpleNamespace(type='output_text', text='{"a": 1}')])
+    responses = [httpx.ConnectError('connection refused'), SimpleNamespace(output=[item])]
+
+    def create(**api_params):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client.client = SimpleNamespace(responses=SimpleNamespace(create=create))
+
+    assert client._make_structured_api_call('prompt', 100, 0.5) == {'a': 1}
+    assert len(taken) == 2  # the retry is a new request against the quota
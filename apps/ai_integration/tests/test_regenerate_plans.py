@@ -0,0 +1,72 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.ai_integration.replay_client import ReplayStore
+from apps.ai_integration.tests.test_streaming_plan import make_report
+from apps.workouts.models import CSVExercise, WorkoutPlan
+
+
+@pytest.fixture
+def replay_dir(settings, tmp_path):
+    settings.OPENAI_API_KEY = 'sk-test'
+    settings.OPENAI_MAX_RETRIES = 1
+    settings.AI_REPLAY_DIR = str(tmp_path / 'replays')
+    settings.AI_REPLAY_LATENCY = 0.0
+    settings.FALLBACK_TO_LEGACY_FLOW = False
+    settings.PLAYLIST_PREFETCH_DAYS = 0  # no Celery broker here
+    CSVExercise.objects.create(id='push-ups', name_ru='Отжимания')
+    return tmp_path / 'replays'
+
+
+def make_user(name, plan_age):
+    user = get_user_model().objects.create_user(username=name, email=f'{name}@example.com', password='x')
+    plan = WorkoutPlan.objects.create(user=user, name='old', duration_weeks=4, plan_data={},
+                                      status='ACTIVE', is_confirmed=True)
+    WorkoutPlan.objects.filter(pk=plan.pk).update(created_at=timezone.now() - plan_age)
+    return user, plan
+
+
+def regenerate(checkpoint, *args):
+    # One worker: the SQLite test database can't take concurrent writers
+    call_command('regenerate_plans', '--backend', 'replay', '--rpm', '6000', '--workers', '1',
+                 '--checkpoint', str(checkpoint), *args, stdout=StringIO())
+    return {int(uid): entry for uid, entry in json.loads(checkpoint.read_text())['users'].items()}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_regenerate_plans(replay_dir, tmp_path):
+    checkpoint = tmp_path / 'regen.checkpoint.json'
+    first, first_plan = make_user('first', timezone.timedelta(days=3))
+    second, second_plan = make_user('second', timezone.timedelta(days=3))
+    recent, recent_plan = make_user('recent', timezone.timedelta(minutes=1))
+
+    # No recordings: AI fails, create_plan falls back to a template plan - old plans must survive
+    results = regenerate(checkpoint)
+    assert {uid: entry['status'] for uid, entry in results.items()} == {
+        first.id: 'failed', second.id: 'failed', recent.id: 'skipped',
+    }
+    assert set(WorkoutPlan.objects.filter(is_active=True)) == {first_plan, second_plan, recent_plan}
+    assert WorkoutPlan.objects.count() == 3
+
+    # Resume with a recording: only the failed users are regenerated
+    ReplayStore(replay_dir).add_content(json.dumps(make_report(), ensure_ascii=False))
+    results = regenerate(checkpoint, '--resume')
+    assert {uid: entry['status'] for uid, entry in results.items()} == {
+        first.id: 'ok', second.id: 'ok', recent.id: 'skipped',
+    }
+    for user, old_plan in ((first, first_plan), (second, second_plan)):
+        new_plan = WorkoutPlan.objects.get(user=user, is_active=True)
+        assert new_plan.id == results[user.id]['plan_id'] != old_plan.id
+        assert new_plan.plan_data['comprehensive']
+        assert (new_plan.status, new_plan.is_confirmed) == ('ACTIVE', True)
+
+    # Nothing left to do on another resume
+    finished = {uid: entry['finished_at'] for uid, entry in results.items()}
+    results = regenerate(checkpoint, '--resume')
+    assert {uid: entry['finished_at'] for uid, entry in results.items()} == finished
+    assert WorkoutPlan.objects.count() == 5
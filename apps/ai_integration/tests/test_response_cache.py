@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+
+from apps.ai_integration.response_cache import AIResponseCache
+
+
+@pytest.fixture
+def response_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                   'LOCATION': 'ai-response-cache-tests'}}
+    settings.AI_RESPONSE_CACHE_ENABLED = True
+    settings.AI_RESPONSE_CACHE_MAX_ENTRIES = 5
+    cache.clear()
+    yield AIResponseCache()
+    cache.clear()
+
+
+def test_evicts_oldest_entries(response_cache):
+    keys = [response_cache.make_key(f'prompt {i}', 'gpt-5') for i in range(8)]
+    for key in keys:
+        assert response_cache.set(key, '{"ok": true}')
+
+    assert response_cache.get_stats()['entries'] == 5
+    assert [response_cache.get(key) for key in keys[:3]] == [None] * 3
+    assert all(response_cache.get(key) for key in keys[3:])
+
+
+def test_concurrent_writers_keep_index_bounded(response_cache):
+    barrier = threading.Barrier(8)
+
+    def writer(worker):
+        barrier.wait()
+        for i in range(10):
+            response_cache.set(response_cache.make_key(f'{worker}:{i}', 'gpt-5'), 'x' * 100)
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    index = cache.get(AIResponseCache.INDEX_KEY)
+    assert len(index) == 5
+    assert all(cache.get(key) is not None for key, _, _ in index)
+    assert cache.get(AIResponseCache.INDEX_LOCK_KEY) is None
+
+
+def test_busy_index_skips_caching(response_cache, monkeypatch):
+    monkeypatch.setattr(AIResponseCache, 'INDEX_LOCK_WAIT', 0.05)
+    cache.add(AIResponseCache.INDEX_LOCK_KEY, 'other-worker', 10)
+    key = response_cache.make_key('prompt', 'gpt-5')
+
+    assert response_cache.set(key, '{"ok": true}') is False
+    assert cache.get(key) is None
+    assert cache.get(AIResponseCache.INDEX_LOCK_KEY) == 'other-worker'
@@ -0,0 +1,211 @@
+import json
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.ai_integration.schemas import validate_comprehensive_ai_report
+from apps.ai_integration.services import WorkoutPlanGenerator
+from apps.ai_integration.stream_parser import StreamingJSONArrayExtractor
+from apps.workouts.models import CSVExercise, WorkoutPlan
+
+LONG_TEXT = 'x' * 60
+
+
+def make_day(day_number, rest=False):
+    return {
+        'day_number': day_number,
+        'workout_name': f'День {day_number} {{сила}} "[push]"',
+        'is_rest_day': rest,
+        'exercises': [] if rest else [{'exercise_slug': 'push-ups', 'sets': 3, 'reps': '10', 'rest_seconds': 60}],
+        'confidence_task': 'Улыбнуться',
+    }
+
+
+def make_report(weeks=4):
+    return {
+        'meta': {'v': 1},
+        'user_analysis': {
+            'fitness_level_assessment': LONG_TEXT, 'psychological_profile': LONG_TEXT,
+            'limitations_analysis': 'none', 'interaction_strategy': LONG_TEXT, 'archetype_adaptation': LONG_TEXT,
+        },
+        'training_program': {
+            'plan_name': 'Персональный план', 'duration_weeks': weeks, 'goal': 'Стать сильнее',
+            'weeks': [
+                {'week_number': week, 'week_focus': 'f', 'days': [make_day(day, day == 7) for day in range(1, 8)]}
+                for week in range(1, weeks + 1)
+            ],
+        },
+        'motivation_system': {
+            'psychological_support': LONG_TEXT * 2, 'reward_system': LONG_TEXT,
+            'confidence_building': LONG_TEXT, 'community_integration': 'x',
+        },
+        'long_term_strategy': {
+            'progression_plan': LONG_TEXT * 2, 'adaptation_triggers': LONG_TEXT,
+            'lifestyle_integration': LONG_TEXT, 'success_metrics': LONG_TEXT,
+        },
+    }
+
+
+def stream(text, chunk_size, extractor=None):
+    extractor = extractor or StreamingJSONArrayExtractor()
+    emitted = []
+    for i in range(0, len(text), chunk_size):
+        emitted.extend(extractor.feed(text[i:i + chunk_size]))
+    return extractor, emitted
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 100_000])
+def test_extractor_emits_every_week(chunk_size):
+    report = make_report()
+    text = json.dumps(report, ensure_ascii=False)
+    extractor, emitted = stream(text, chunk_size)
+
+    assert emitted == [('weeks', week) for week in report['training_program']['weeks']]
+    assert extractor.emitted == 4
+    assert extractor.text == text
+
+
+def test_extractor_emits_before_document_is_complete():
+    text = json.dumps(make_report(), ensure_ascii=False)
+    second_week = text.index('"week_number": 2')
+    extractor, emitted = stream(text[:second_week], 16)
+
+    assert [element['week_number'] for _, element in emitted] == [1]
+
+
+def test_extractor_ignores_brackets_in_strings_and_nested_arrays():
+    text = json.dumps({
+        'note': 'weeks: [{"fake": 1}]',
+        'weeks': [{'week_number': 1, 'cycles': [{'inner': True}], 'title': 'a \\"}] b'}],
+    })
+    extractor, emitted = stream(text, 3, StreamingJSONArrayExtractor(keep_text=False))
+
+    assert emitted == [('weeks', json.loads(text)['weeks'][0])]
+    assert extractor.text == ''
+
+
+def test_extractor_skips_malformed_element():
+    extractor, emitted = stream('{"weeks": [{"week_number": 1,}, {"week_number": 2}]}', 5)
+
+    assert emitted == [('weeks', {'week_number': 2})]
+
+
+class StreamingClient:
+    """Streams a fixed report to on_plan_chunk and records the provisional plan state per chunk"""
+
+    def __init__(self):
+        self.active_while_streaming = []
+
+    def generate_comprehensive_report(self, prompt, user_id=None, archetype=None, max_tokens=0,
+                                      temperature=0, on_plan_chunk=None):
+        content = json.dumps(make_report(), ensure_ascii=False)
+        if on_plan_chunk is not None:
+            for array_key, element in StreamingJSONArrayExtractor().feed(content):
+                on_plan_chunk(array_key, element)
+                self.active_while_streaming.append(WorkoutPlan.objects.filter(is_active=True).exists())
+        return validate_comprehensive_ai_report(content)
+
+    def generate_completion(self, prompt, max_tokens=0, temperature=0):
+        raise RuntimeError('legacy unavailable')
+
+
+@pytest.fixture
+def user(db, settings):
+    settings.AI_STREAMING_ENABLED = True
+    settings.FALLBACK_TO_LEGACY_FLOW = False
+    settings.PLAYLIST_PREFETCH_DAYS = 0  # no Celery broker here
+    CSVExercise.objects.create(id='push-ups', name_ru='Отжимания')
+    return get_user_model().objects.create_user(username='stream', email='stream@example.com', password='x')
+
+
+def test_provisional_plan_is_activated_after_validation(user):
+    client = StreamingClient()
+    plan = WorkoutPlanGenerator(ai_client=client).create_plan(user, {'archetype': 'peer', 'user_id': user.id})
+
+    assert client.active_while_streaming == [False] * 4
+    plan.refresh_from_db()
+    assert plan.is_active
+    assert WorkoutPlan.objects.filter(user=user).count() == 1
+    assert plan.daily_workouts.filter(week_number=4).count() == 7
+
+
+def test_provisional_plan_is_removed_on_failure(user, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError('db down')
+
+    monkeypatch.setattr(WorkoutPlanGenerator, '_create_daily_workouts', broken)
+    with pytest.raises(RuntimeError):
+        WorkoutPlanGenerator(ai_client=StreamingClient()).create_plan(user, {'archetype': 'peer', 'user_id': user.id})
+
+    assert not WorkoutPlan.objects.filter(user=user).exists()
+
+
+class SlowStreamingClient(StreamingClient):
+    def generate_comprehensive_report(self, *args, **kwargs):
+        time.sleep(0.5)
+        return super().generate_comprehensive_report(*args, **kwargs)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_hedged_plan_is_not_streamed(user):
+    served = []
+    client = SlowStreamingClient()
+    plan = WorkoutPlanGenerator(ai_client=client).create_plan_hedged(
+        user, {'archetype': 'peer', 'user_id': user.id}, latency_budget=0.1, on_fallback_plan=served.append
+    )
+
+    assert client.active_while_streaming == []  # no provisional plan next to the fallback
+    assert len(served) == 1 and served[0].generation_source == 'FALLBACK'
+    assert list(WorkoutPlan.objects.filter(user=user, is_active=True)) == [plan]
+    assert plan.generation_source == 'AI'
+    assert WorkoutPlan.objects.filter(user=user).count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_hedged_ai_plan_is_inactive_until_it_supersedes_the_fallback(user, monkeypatch):
+    active_before_swap = []
+    supersede = WorkoutPlanGenerator._supersede_fallback_plan
+
+    def recording_supersede(generator, fallback_plan, ai_plan):
+        active_before_swap.extend(WorkoutPlan.objects.filter(user=user, is_active=True))
+        return supersede(generator, fallback_plan, ai_plan)
+
+    monkeypatch.setattr(WorkoutPlanGenerator, '_supersede_fallback_plan', recording_supersede)
+    served = []
+    plan = WorkoutPlanGenerator(ai_client=SlowStreamingClient()).create_plan_hedged(
+        user, {'archetype': 'peer', 'user_id': user.id}, latency_budget=0.1, on_fallback_plan=served.append
+    )
+
+    assert active_before_swap == served
+    assert list(WorkoutPlan.objects.filter(user=user, is_active=True)) == [plan]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_hedged_fallback_in_use_keeps_ai_plan_inactive(user, monkeypatch):
+    def train_on_fallback(fallback_plan):
+        day = fallback_plan.daily_workouts.first()
+        day.completed_at = timezone.now()
+        day.save(update_fields=['completed_at'])
+
+    plan = WorkoutPlanGenerator(ai_client=SlowStreamingClient()).create_plan_hedged(
+        user, {'archetype': 'peer', 'user_id': user.id}, latency_budget=0.1, on_fallback_plan=train_on_fallback
+    )
+
+    assert plan.generation_source == 'FALLBACK'
+    assert list(WorkoutPlan.objects.filter(user=user, is_active=True)) == [plan]
+    assert WorkoutPlan.objects.get(user=user, generation_source='AI').is_active is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_hedged_ai_plan_in_budget_is_active(user):
+    served = []
+    plan = WorkoutPlanGenerator(ai_client=StreamingClient()).create_plan_hedged(
+        user, {'archetype': 'peer', 'user_id': user.id}, latency_budget=30, on_fallback_plan=served.append
+    )
+
+    assert served == []
+    plan.refresh_from_db()
+    assert plan.is_active and plan.generation_source == 'AI'
+    assert WorkoutPlan.objects.filter(user=user).count() == 1
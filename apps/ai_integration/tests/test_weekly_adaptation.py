@@ -0,0 +1,104 @@
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.ai_integration.ai_client_gpt5 import AIClientError, OpenAIClient
+from apps.ai_integration.schemas_json_simple import PLAN_DELTA_JSON_SCHEMA
+from apps.ai_integration.services import WorkoutPlanGenerator
+from apps.workouts.models import CSVExercise, DailyWorkout, WorkoutPlan
+
+
+def fake_response(payload):
+    text = json.dumps(payload, ensure_ascii=False)
+    item = SimpleNamespace(type='message', content=[SimpleNamespace(type='output_text', text=text)])
+    return SimpleNamespace(output=[item], usage=None)
+
+
+@pytest.fixture
+def client(settings):
+    settings.OPENAI_API_KEY = 'sk-test'
+    settings.OPENAI_MODEL = 'gpt-5'
+    client = OpenAIClient()
+    client.requests = []
+
+    def create(**api_params):
+        client.requests.append(api_params)
+        return fake_response(client.payload)
+
+    client.client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    return client
+
+
+@pytest.fixture
+def plan(db):
+    for slug in ('main_001', 'main_002', 'main_003'):
+        CSVExercise.objects.create(id=slug, name_ru=slug)
+    user = get_user_model().objects.create_user(username='adapt', email='adapt@example.com', password='x')
+    plan = WorkoutPlan.objects.create(
+        user=user, name='План', duration_weeks=4, plan_data={'user_archetype': 'peer'},
+        started_at=timezone.now() - timedelta(days=8),
+    )
+    DailyWorkout.objects.create(plan=plan, week_number=3, day_number=15, name='Сила', exercises=[
+        {'exercise_slug': 'main_001', 'sets': 3, 'reps': '8-12', 'rest_seconds': 60, 'name': 'Отжимания'},
+        {'exercise_slug': 'main_002', 'sets': 3, 'reps': '10', 'rest_seconds': 90, 'name': 'Приседания'},
+    ])
+    DailyWorkout.objects.create(plan=plan, week_number=3, day_number=16, name='Отдых', exercises=[], is_rest_day=True)
+    return plan
+
+
+def test_plan_delta_request_uses_delta_schema(client):
+    client.payload = {'operations': [], 'notes': 'Без изменений'}
+
+    assert client.generate_plan_delta('prompt') == client.payload
+    text_format = client.requests[0]['text']['format']
+    assert text_format['schema'] is PLAN_DELTA_JSON_SCHEMA
+    assert text_format['name'] == 'WorkoutPlanDelta'
+
+
+def test_plan_delta_response_is_validated(client):
+    client.payload = {'operations': [{'op': 'move', 'path': '/days/15', 'value': None}], 'notes': ''}
+
+    with pytest.raises(AIClientError):
+        client.generate_plan_delta('prompt')
+
+
+def test_adapt_weekly_plan_applies_operations(client, plan):
+    client.payload = {
+        'operations': [
+            {'op': 'replace', 'path': '/days/15/exercises/0/sets', 'value': 4},
+            {'op': 'replace', 'path': '/days/15/exercises/1/exercise_slug', 'value': 'main_003'},
+            {'op': 'replace', 'path': '/days/16/confidence_task', 'value': 'Прогулка 20 минут'},
+            {'op': 'replace', 'path': '/days/15/exercises/0/exercise_slug', 'value': 'made_up_exercise'},
+        ],
+        'notes': 'Прибавим нагрузку',
+    }
+    patch = WorkoutPlanGenerator(ai_client=client).adapt_weekly_plan(plan, user_feedback=[])
+
+    assert len(patch.operations) == 3
+    assert len(patch.rejected_operations) == 1
+    assert patch.affected_days == 2
+    assert patch.notes == 'Прибавим нагрузку'
+
+    strength = plan.daily_workouts.get(day_number=15)
+    assert strength.exercises[0] == {
+        'exercise_slug': 'main_001', 'sets': 4, 'reps': '8-12', 'rest_seconds': 60, 'name': 'Отжимания',
+    }
+    assert strength.exercises[1]['exercise_slug'] == 'main_003'
+    assert plan.daily_workouts.get(day_number=16).confidence_task == 'Прогулка 20 минут'
+
+    plan.refresh_from_db()
+    assert plan.adaptation_count == 1
+    assert plan.last_adaptation_date is not None
+
+
+def test_adapt_weekly_plan_without_changes(client, plan):
+    client.payload = {'operations': [], 'notes': 'Всё по плану'}
+    patch = WorkoutPlanGenerator(ai_client=client).adapt_weekly_plan(plan, user_feedback=[])
+
+    assert patch.operations == [] and patch.affected_days == 0
+    plan.refresh_from_db()
+    assert plan.adaptation_count == 0
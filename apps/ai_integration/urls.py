@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import ai_ledger_stats_view
+
+app_name = 'ai_integration'
+
+urlpatterns = [
+    path('api/ai/ledger/stats/', ai_ledger_stats_view, name='ai_ledger_stats'),
+]
@@ -1,15 +1,22 @@
 """
 Post-validation and fixing services for AI-generated workout plans
 """
-import json
 import logging
-from typing import Any, Dict, Optional, Tuple
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
+from apps.core.metrics import MetricNames, timing
 from apps.core.services.exercise_validation import ExerciseValidationService
 from apps.core.utils.slug import normalize_slug_with_aliases
 
+from . import json_codec
+
 logger = logging.getLogger(__name__)
 
+# AI plans repeat the same few dozen slugs hundreds of times
+_normalize_slug = lru_cache(maxsize=4096)(normalize_slug_with_aliases)
 
 
 class WorkoutPlanValidator:
@@ -19,24 +26,32 @@ class WorkoutPlanValidator:
         self.validation_service = ExerciseValidationService()
         self.issues_found = []
         self.fixes_applied = []
+        self.stage_timings = {}
     
-    def validate_and_fix_plan(self, plan_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    def validate_and_fix_plan(
+        self, 
+        plan_data: Dict[str, Any], 
+        allowed_slugs: Optional[set] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
         Validate and fix a workout plan
         
         Args:
             plan_data: AI-generated plan data
+            allowed_slugs: Exercise whitelist (default: ExerciseValidationService)
             
         Returns:
             Tuple of (fixed_plan_data, validation_report)
         """
         self.issues_found = []
         self.fixes_applied = []
+        self.stage_timings = {}
         
         try:
             # Get allowed exercises (with fallback for Redis issues)
             try:
-                allowed_slugs = self.validation_service.get_allowed_exercise_slugs()
+                if allowed_slugs is None:
+                    allowed_slugs = self.validation_service.get_allowed_exercise_slugs()
                 logger.info(f"Validating plan against {len(allowed_slugs)} allowed exercises")
             except Exception as cache_error:
                 logger.warning(f"Failed to get allowed exercises from cache: {cache_error}")
@@ -49,7 +64,8 @@ class WorkoutPlanValidator:
                 logger.info(f"Using fallback exercise set: {len(allowed_slugs)} exercises")
             
             # Validate structure
-            fixed_plan = self._validate_structure(plan_data)
+            with self._stage('structure'):
+                fixed_plan = self._validate_structure(plan_data)
             
             # Validate and fix exercises
             fixed_plan = self._validate_exercises(fixed_plan, allowed_slugs)
@@ -63,9 +79,14 @@ class WorkoutPlanValidator:
                 'fixes': self.fixes_applied,
                 'allowed_exercises_count': len(allowed_slugs),
                 'coverage_ok': len(allowed_slugs) > 10,  # Minimum viable coverage
+                'timings_ms': dict(self.stage_timings),
             }
             
-            logger.info(f"Plan validation complete: {report['issues_found']} issues, {report['fixes_applied']} fixes")
+            for stage, elapsed_ms in self.stage_timings.items():
+                timing(MetricNames.AI_PLAN_VALIDATION_STAGE_TIME, elapsed_ms, stage=stage)
+            
+            stages = ', '.join(f"{stage}={elapsed_ms:.1f}ms" for stage, elapsed_ms in self.stage_timings.items())
+            logger.info(f"Plan validation complete: {report['issues_found']} issues, {report['fixes_applied']} fixes [{stages}]")
             return fixed_plan, report
             
         except Exception as e:
@@ -120,58 +141,103 @@ class WorkoutPlanValidator:
         return plan_data
     
     def _validate_exercises(self, plan_data: Dict[str, Any], allowed_slugs: set) -> Dict[str, Any]:
-        """Validate and fix exercise references in the plan"""
-        if 'weeks' not in plan_data:
-            return plan_data
+        """
+        Validate and fix exercise references in the plan (weeks and 90-day cycles)
+        
+        Single pass over the plan: slugs are normalized once per distinct value,
+        checked against allowed_slugs as a set and substituted once per unknown slug.
+        """
+        with self._stage('collect'):
+            exercise_lists = self._collect_exercise_lists(plan_data)
+            raw_slugs = {
+                exercise.get('slug') or exercise.get('exercise_slug')
+                for _, _, exercises, _, _ in exercise_lists
+                for exercise in exercises
+            }
+            raw_slugs.discard(None)
+            raw_slugs.discard('')
+        
+        with self._stage('normalize'):
+            # Catalog ids (main_001) are already canonical - only unknown slugs go through aliases
+            normalized = {
+                slug: slug if slug in allowed_slugs else _normalize_slug(slug)
+                for slug in raw_slugs
+            }
+        
+        with self._stage('membership'):
+            unresolved = set(normalized.values()) - allowed_slugs
+        
+        with self._stage('alternatives'):
+            substitutes = {}
+            for slug in unresolved:
+                alternatives = self.validation_service.find_exercise_alternatives(slug)
+                substitutes[slug] = alternatives[0] if alternatives else None
+                if alternatives:
+                    logger.info(f"Substituted {slug} → {alternatives[0]}")
+        
+        with self._stage('fix'):
+            for owner, key, exercises, week_num, day_num in exercise_lists:
+                fixed_exercises = []
+                for exercise in exercises:
+                    fixed_exercise = self._validate_single_exercise(
+                        exercise, normalized, substitutes, week_num, day_num
+                    )
+                    if fixed_exercise:
+                        fixed_exercises.append(fixed_exercise)
+                owner[key] = fixed_exercises
         
-        for week_idx, week in enumerate(plan_data['weeks']):
+        return plan_data
+    
+    def _collect_exercise_lists(self, plan_data: Dict[str, Any]) -> List[Tuple[Dict, str, List, int, int]]:
+        """(owner, key, exercises, week_num, day_num) for every exercise list in the plan"""
+        exercise_lists = []
+        
+        for week_idx, week in enumerate(plan_data.get('weeks') or []):
             if 'days' not in week:
                 continue
-                
             for day_idx, day in enumerate(week['days']):
                 # Handle both old (blocks) and new (direct exercises) structure
                 if 'blocks' in day:
-                    # Old structure with blocks
-                    for block_idx, block in enumerate(day['blocks']):
-                        if 'exercises' not in block:
-                            continue
-                        
-                        # Validate each exercise
-                        fixed_exercises = []
-                        for exercise in block['exercises']:
-                            fixed_exercise = self._validate_single_exercise(
-                                exercise, allowed_slugs, week_idx + 1, day_idx + 1
-                            )
-                            if fixed_exercise:
-                                fixed_exercises.append(fixed_exercise)
-                        
-                        # Update block with fixed exercises
-                        block['exercises'] = fixed_exercises
-                
+                    for block in day['blocks']:
+                        if 'exercises' in block:
+                            exercise_lists.append((block, 'exercises', block['exercises'], week_idx + 1, day_idx + 1))
                 elif 'exercises' in day:
-                    # New structure with direct exercises in day
-                    fixed_exercises = []
-                    for exercise in day['exercises']:
-                        fixed_exercise = self._validate_single_exercise(
-                            exercise, allowed_slugs, week_idx + 1, day_idx + 1
-                        )
-                        if fixed_exercise:
-                            fixed_exercises.append(fixed_exercise)
-                    
-                    # Update day with fixed exercises
-                    day['exercises'] = fixed_exercises
+                    exercise_lists.append((day, 'exercises', day['exercises'], week_idx + 1, day_idx + 1))
         
-        return plan_data
+        # 90-day structure: cycles/phases with day_number counted from the plan start
+        for cycle in plan_data.get('cycles') or plan_data.get('phases') or []:
+            if not isinstance(cycle, dict):
+                continue
+            workouts = cycle.get('daily_workouts', cycle.get('daily_operations', cycle.get('training_sessions', [])))
+            for workout in workouts:
+                if not isinstance(workout, dict) or not isinstance(workout.get('day_number'), int):
+                    continue
+                week_num = (workout['day_number'] - 1) // 7 + 1
+                for owner in workout.get('blocks', [workout]):
+                    if isinstance(owner, dict) and isinstance(owner.get('exercises'), list):
+                        exercise_lists.append((owner, 'exercises', owner['exercises'], week_num, workout['day_number']))
+        
+        return exercise_lists
+    
+    @contextmanager
+    def _stage(self, name: str):
+        """Accumulate wall time per validation stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = self.stage_timings.get(name, 0.0) + (time.perf_counter() - started) * 1000
     
     def _validate_single_exercise(
         self, 
         exercise: Dict[str, Any], 
-        allowed_slugs: set, 
+        normalized: Dict[str, str], 
+        substitutes: Dict[str, Optional[str]], 
         week_num: int, 
         day_num: int
     ) -> Optional[Dict[str, Any]]:
         """
-        Validate and fix a single exercise
+        Validate and fix a single exercise using the precomputed slug tables
         
         Returns:
             Fixed exercise dict or None if exercise should be removed
@@ -183,44 +249,36 @@ class WorkoutPlanValidator:
             return None
         
         # Normalize slug with aliases to handle AI variations
-        normalized_slug = normalize_slug_with_aliases(slug)
+        normalized_slug = normalized[slug]
         if normalized_slug != slug:
             self.fixes_applied.append(f"Normalized slug '{slug}' → '{normalized_slug}' (week {week_num}, day {day_num})")
             slug = normalized_slug
         
         # Ensure exercise_slug field is present for new schema
-        if 'exercise_slug' not in exercise:
-            exercise['exercise_slug'] = slug
-        else:
-            exercise['exercise_slug'] = slug
+        exercise['exercise_slug'] = slug
         
         # Check if slug is allowed (has video coverage)
-        if slug not in allowed_slugs:
+        if slug in substitutes:
             self.issues_found.append(f"Exercise '{slug}' has no video coverage")
             
-            # Try to find alternative
-            alternatives = self.validation_service.find_exercise_alternatives(slug)
-            if alternatives:
-                new_slug = alternatives[0]  # Take best alternative
-                exercise['exercise_slug'] = new_slug
-                if 'slug' in exercise:
-                    exercise['slug'] = new_slug
-                self.fixes_applied.append(f"Replaced '{slug}' with '{new_slug}' (week {week_num}, day {day_num})")
-                logger.info(f"Substituted {slug} → {new_slug}")
-                slug = new_slug  # Update slug for further validation
-            else:
+            new_slug = substitutes[slug]
+            if new_slug is None:
                 self.issues_found.append(f"No alternatives found for '{slug}' - removing exercise")
                 return None  # Remove exercise if no alternatives
+            
+            exercise['exercise_slug'] = new_slug
+            if 'slug' in exercise:
+                exercise['slug'] = new_slug
+            self.fixes_applied.append(f"Replaced '{slug}' with '{new_slug}' (week {week_num}, day {day_num})")
+            slug = new_slug  # Update slug for further validation
         
         # Validate exercise structure
-        required_fields = ['sets', 'reps']
-        for field in required_fields:
-            if field not in exercise:
-                if field == 'sets':
-                    exercise['sets'] = 3
-                elif field == 'reps':
-                    exercise['reps'] = '8-12'
-                self.fixes_applied.append(f"Added missing {field} to exercise {slug}")
+        if 'sets' not in exercise:
+            exercise['sets'] = 3
+            self.fixes_applied.append(f"Added missing sets to exercise {slug}")
+        if 'reps' not in exercise:
+            exercise['reps'] = '8-12'
+            self.fixes_applied.append(f"Added missing reps to exercise {slug}")
         
         # Ensure sets is integer
         if not isinstance(exercise.get('sets'), int):
@@ -235,48 +293,34 @@ class WorkoutPlanValidator:
             exercise['reps'] = str(exercise['reps'])
             self.fixes_applied.append(f"Fixed reps format for {slug}")
         
-        # Fix rest_seconds if invalid
-        rest_seconds = exercise.get('rest_seconds')
-        if rest_seconds is not None:
-            # Ensure it's an integer
-            if not isinstance(rest_seconds, int):
-                try:
-                    rest_seconds = int(rest_seconds)
-                except (ValueError, TypeError):
-                    rest_seconds = None
-            
-            # Ensure minimum value
-            if rest_seconds is not None and rest_seconds < 10:
-                exercise['rest_seconds'] = 30  # Default safe value
-                self.fixes_applied.append(f"Fixed rest_seconds for {slug}: {rest_seconds} → 30")
-            elif rest_seconds is not None and rest_seconds > 600:
-                exercise['rest_seconds'] = 90  # Maximum reasonable value
-                self.fixes_applied.append(f"Fixed rest_seconds for {slug}: {rest_seconds} → 90")
-            elif rest_seconds is not None:
-                exercise['rest_seconds'] = rest_seconds
-        
-        # Fix duration_seconds if invalid
-        duration_seconds = exercise.get('duration_seconds')
-        if duration_seconds is not None:
-            # Ensure it's an integer
-            if not isinstance(duration_seconds, int):
-                try:
-                    duration_seconds = int(duration_seconds)
-                except (ValueError, TypeError):
-                    duration_seconds = None
-            
-            # Ensure minimum value
-            if duration_seconds is not None and duration_seconds < 10:
-                exercise['duration_seconds'] = 30  # Default safe value
-                self.fixes_applied.append(f"Fixed duration_seconds for {slug}: {duration_seconds} → 30")
-            elif duration_seconds is not None and duration_seconds > 1800:
-                exercise['duration_seconds'] = 300  # Maximum reasonable value (5 min)
-                self.fixes_applied.append(f"Fixed duration_seconds for {slug}: {duration_seconds} → 300")
-            elif duration_seconds is not None:
-                exercise['duration_seconds'] = duration_seconds
+        # Fix rest_seconds / duration_seconds if invalid
+        self._clamp_seconds(exercise, 'rest_seconds', slug, high=600, high_default=90)
+        self._clamp_seconds(exercise, 'duration_seconds', slug, high=1800, high_default=300)
         
         return exercise
     
+    def _clamp_seconds(self, exercise: Dict[str, Any], field: str, slug: str, high: int, high_default: int):
+        """Coerce to int; below 10 becomes 30, above high becomes high_default"""
+        value = exercise.get(field)
+        if value is None:
+            return
+        
+        # Ensure it's an integer
+        if not isinstance(value, int):
+            try:
+                value = int(value)
+            except (ValueError, TypeError):
+                return
+        
+        if value < 10:
+            exercise[field] = 30  # Default safe value
+            self.fixes_applied.append(f"Fixed {field} for {slug}: {value} → 30")
+        elif value > high:
+            exercise[field] = high_default  # Maximum reasonable value
+            self.fixes_applied.append(f"Fixed {field} for {slug}: {value} → {high_default}")
+        else:
+            exercise[field] = value
+    
     def dry_run_validation(self, plan_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Perform validation without making changes
@@ -284,7 +328,7 @@ class WorkoutPlanValidator:
         Returns:
             Validation report only
         """
-        original_plan = json.loads(json.dumps(plan_data))  # Deep copy
+        original_plan = json_codec.clone(plan_data)
         _, report = self.validate_and_fix_plan(original_plan)
         return report
 
@@ -0,0 +1,28 @@
+"""AI integration API views (staff only)"""
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .ledger import ROLLUP_GROUP_FIELDS, ledger_rollup
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def ai_ledger_stats_view(request):
+    """
+    GET /api/ai/ledger/stats/?hours=24&group_by=operation,model - AI call latency/tokens/cost rollups (staff only)
+    """
+    if not request.user.is_staff:
+        return Response({"error": "Permission denied"}, status=403)
+    
+    try:
+        hours = int(request.query_params.get('hours', 24))
+    except ValueError:
+        return Response({"error": "hours must be an integer"}, status=400)
+    
+    group_by = [field for field in request.query_params.get('group_by', 'operation,model').split(',') if field]
+    unknown = [field for field in group_by if field not in ROLLUP_GROUP_FIELDS]
+    if unknown:
+        return Response({"error": f"Unknown group_by fields: {unknown}", "allowed": ROLLUP_GROUP_FIELDS}, status=400)
+    
+    return Response(ledger_rollup(hours=hours, group_by=group_by))
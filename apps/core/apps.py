@@ -8,3 +8,4 @@ class CoreConfig(AppConfig):
     
     def ready(self):
         """Import signal handlers when Django starts"""
+        from . import signals  # noqa: F401
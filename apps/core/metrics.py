@@ -194,6 +194,28 @@ class MetricNames:
     AI_VALIDATION_FAILED = 'ai.plan.validation_failed'
     AI_REPROMPTED = 'ai.plan.reprompted'
     AI_GENERATION_TIME = 'ai.generation.duration_ms'
+    AI_RESPONSE_CACHE_HIT = 'ai.response_cache.hit'
+    AI_RESPONSE_CACHE_MISS = 'ai.response_cache.miss'
+    AI_RESPONSE_CACHE_HIT_RATE = 'ai.response_cache.hit_rate'
+    AI_RESPONSE_CACHE_BYTES_SAVED = 'ai.response_cache.bytes_saved'
+    AI_RESPONSE_CACHE_BYTES = 'ai.response_cache.bytes'
+    AI_RESPONSE_CACHE_EVICTED = 'ai.response_cache.evicted'
+    AI_STREAM_FIRST_CHUNK_TIME = 'ai.stream.first_chunk_ms'
+    AI_STREAM_CHUNKS = 'ai.stream.chunks_materialized'
+    AI_BULK_REGEN_LATENCY = 'ai.bulk_regen.latency_ms'
+    AI_BULK_REGEN_RESULT = 'ai.bulk_regen.result'
+    AI_CIRCUIT_OPENED = 'ai.circuit.opened'
+    AI_CIRCUIT_REJECTED = 'ai.circuit.rejected'
+    AI_CIRCUIT_STATE = 'ai.circuit.state'
+    AI_CONCURRENCY_LIMIT = 'ai.concurrency.limit'
+    AI_LOAD_SHED = 'ai.concurrency.load_shed'
+    AI_HEDGE_TRIGGERED = 'ai.hedge.triggered'
+    AI_HEDGE_RESULT = 'ai.hedge.result'
+    AI_PLAN_VALIDATION_STAGE_TIME = 'ai.plan_validation.stage_ms'
+    AI_ADAPTATION_TIME = 'ai.adaptation.duration_ms'
+    AI_ADAPTATION_OPERATIONS = 'ai.adaptation.operations'
+    AI_CALL_LATENCY = 'ai.call.latency_ms'
+    AI_CALL_TOKENS = 'ai.call.tokens'
     
     # Video metrics  
     VIDEO_PROVIDER_R2 = 'video.provider.r2_count'
@@ -2,10 +2,12 @@
 
 import logging
 
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from apps.workouts.models import CSVExercise, R2Video
+from apps.users.models import UserProfile
+from apps.workouts.models import CSVExercise, R2Video, WorkoutPlan
 
 from .services.exercise_validation import ExerciseValidationService
 
@@ -19,8 +21,52 @@ def invalidate_exercise_cache_on_video_change(sender, **kwargs):
     logger.info("Invalidated exercise validation cache due to R2Video change")
 
 
+@receiver([post_save, post_delete], sender=R2Video)
+def rebuild_motivation_index_on_video_change(sender, **kwargs):
+    """Rebuild the motivation video index once the R2Video change is committed"""
+    from apps.workouts.services.motivation_index import rebuild_motivation_index_after_commit
+
+    rebuild_motivation_index_after_commit()
+
+
+@receiver([post_save, post_delete], sender=R2Video)
+@receiver([post_save, post_delete], sender=CSVExercise)
+def rebuild_exercise_index_on_change(sender, **kwargs):
+    """Rebuild the exercise metadata index (and with it the video pool) once the change is committed"""
+    from apps.workouts.services.exercise_index import rebuild_exercise_index_after_commit
+
+    rebuild_exercise_index_after_commit()
+
+
+@receiver(post_delete, sender=WorkoutPlan)
+def invalidate_used_exercises_on_plan_delete(sender, instance, **kwargs):
+    """Deleted plan's playlist items no longer count as used"""
+    from apps.workouts.services.used_exercises import invalidate_used_exercises
+
+    invalidate_used_exercises([instance.user_id])
+
+
 @receiver([post_save, post_delete], sender=CSVExercise) 
 def invalidate_exercise_cache_on_exercise_change(sender, **kwargs):
     """Invalidate exercise validation cache when Exercise changes"""
     ExerciseValidationService.invalidate_cache()
-    logger.info("Invalidated exercise validation cache due to Exercise change")
\ No newline at end of file
+    logger.info("Invalidated exercise validation cache due to Exercise change")
+
+
+@receiver([post_save, post_delete], sender=CSVExercise)
+def rebuild_fallback_templates_on_exercise_change(sender, **kwargs):
+    """Recompile precompiled fallback plans once the exercise change is committed"""
+    from apps.ai_integration.fallback_templates import rebuild_fallback_library_after_commit
+
+    rebuild_fallback_library_after_commit()
+
+
+@receiver([post_save, post_delete], sender=WorkoutPlan)
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_today_snapshot_on_change(sender, instance, **kwargs):
+    """Plan activation / confirmation or profile change (archetype, streak, XP) - rebuild the dashboard snapshot"""
+    from apps.users.services import invalidate_today_snapshot
+
+    user_id = instance.user_id
+    # After commit, so a concurrent dashboard load can't cache the old state again
+    transaction.on_commit(lambda: invalidate_today_snapshot([user_id]))
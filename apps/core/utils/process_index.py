@@ -0,0 +1,113 @@
+"""
+Process-wide lazily built indexes (catalog lookups, precompiled templates)
+
+ProcessIndex keeps one instance per process, re-checks it at most every check interval
+and rebuilds it once the database change that made it stale is committed:
+
+    index = ProcessIndex('motivation video index', refresh, rebuild, 'MOTIVATION_INDEX_CHECK_INTERVAL')
+    index.get()                    # cached instance
+    index.rebuild_after_commit()   # from post_save/post_delete receivers
+
+SharedVersionIndex tells other processes about a rebuild through a version counter in the
+shared cache; the built object must carry that number as .version.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessIndex:
+    """
+    One lazily built object per process.
+
+    refresh(current) returns current or a fresh object (current is None on first use),
+    rebuild() always builds a fresh one.
+    """
+
+    def __init__(self, name: str, refresh: Callable[[Any], Any], rebuild: Callable[[], Any],
+                 check_interval_setting: str, default_check_interval: int = 60):
+        self.name = name
+        self._refresh = refresh
+        self._rebuild = rebuild
+        self.check_interval_setting = check_interval_setting
+        self.default_check_interval = default_check_interval
+
+        self._value = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._stale = False
+
+    def get(self):
+        check_interval = getattr(settings, self.check_interval_setting, self.default_check_interval)
+        if self._value is not None and time.monotonic() - self._checked_at < check_interval:
+            return self._value
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._value = self._refresh(self._value)
+            return self._value
+
+    def rebuild(self):
+        """Build a fresh object and swap it in for this process"""
+        with self._lock:
+            self._value = self._rebuild()
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def mark_stale(self):
+        """Source data changed - rebuild on the next rebuild_stale()"""
+        self._stale = True
+
+    def rebuild_stale(self) -> Optional[Any]:
+        """on_commit hook: rebuild if marked stale since the last rebuild"""
+        if not self._stale:
+            return None
+        self._stale = False
+
+        try:
+            return self.rebuild()
+        except Exception as e:
+            logger.error(f"Failed to rebuild {self.name}: {e}")
+            return None
+
+    def rebuild_after_commit(self):
+        """Rebuild once the current transaction commits (immediately outside one)"""
+        self.mark_stale()
+        # Bulk imports/edits queue many callbacks - only the first one rebuilds
+        transaction.on_commit(self.rebuild_stale)
+
+
+class SharedVersionIndex(ProcessIndex):
+    """ProcessIndex built by build(version); rebuilds bump a version counter in the shared cache"""
+
+    def __init__(self, name: str, version_key: str, build: Callable[[int], Any],
+                 check_interval_setting: str, default_check_interval: int = 60):
+        self.version_key = version_key
+        self._build = build
+        super().__init__(name, self._refresh_version, self._bump_and_build,
+                         check_interval_setting, default_check_interval)
+
+    @property
+    def version(self) -> int:
+        return cache.get(self.version_key, 0)
+
+    def _refresh_version(self, current):
+        version = self.version
+        if current is None or current.version != version:
+            return self._build(version)
+        return current
+
+    def _bump_and_build(self):
+        try:
+            version = cache.incr(self.version_key)
+        except ValueError:
+            version = 1
+            cache.set(self.version_key, version, None)
+        return self._build(version)
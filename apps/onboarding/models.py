@@ -1,5 +1,9 @@
+import time
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -209,4 +213,83 @@ class OnboardingSession(models.Model):
     
     class Meta:
         db_table = 'onboarding_sessions'
-        ordering = ['-started_at']
\ No newline at end of file
+        ordering = ['-started_at']
+
+
+class PlanGenerationJob(models.Model):
+    """
+    Фоновая генерация плана (Celery) - id задачи, статус и прогресс по этапам.
+    Этапы совпадают с milestone_times из generate_plan_ajax.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending - queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCESS', 'Success'),
+        ('FAILED', 'Failed'),
+    ]
+
+    # Progress (0-100) reported to the loading page for each milestone
+    STAGE_PROGRESS = {
+        'queued': 5,
+        'prepare_user_data': 10,
+        'call_openai_start': 20,
+        'call_openai_finish': 90,
+        'fallback_served': 100,
+        'build_response': 100,
+    }
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='plan_generation_jobs')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    stage = models.CharField(max_length=32, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    milestone_times = models.JSONField(default=dict)  # {stage: unix timestamp}
+
+    plan = models.ForeignKey(
+        'workouts.WorkoutPlan',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='generation_jobs'
+    )
+    error_code = models.CharField(max_length=50, blank=True)
+    error_message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'plan_generation_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'status']),
+        ]
+
+    def __str__(self):
+        return f"PlanGenerationJob {self.job_id} ({self.status}, {self.stage})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('SUCCESS', 'FAILED')
+
+    def mark_stage(self, stage: str, status: str = None):
+        """Record a milestone and persist stage/progress"""
+        self.stage = stage
+        self.milestone_times[stage] = time.time()
+        self.progress = self.STAGE_PROGRESS.get(stage, self.progress)
+        if status:
+            self.status = status
+        self.save(update_fields=['stage', 'milestone_times', 'progress', 'status', 'updated_at'])
+
+    def mark_finished(self, status: str, plan=None, error_code: str = '', error_message: str = ''):
+        """Finish job with SUCCESS or FAILED"""
+        self.status = status
+        self.plan = plan
+        self.error_code = error_code
+        self.error_message = error_message
+        self.progress = 100
+        self.finished_at = timezone.now()
+        self.milestone_times['total_duration'] = time.time() - self.milestone_times.get('queued', time.time())
+        self.save()
@@ -0,0 +1,64 @@
+"""Celery tasks for onboarding - background plan generation"""
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from .models import PlanGenerationJob
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    soft_time_limit=getattr(settings, 'PLAN_GENERATION_JOB_TIMEOUT', 900),
+)
+def generate_plan_task(self, job_id: str):
+    """
+    Generate workout plan for PlanGenerationJob outside of the request worker.
+    Progress is written to the job at each milestone and polled by the loading page.
+    """
+    try:
+        job = PlanGenerationJob.objects.select_related('user').get(job_id=job_id)
+    except PlanGenerationJob.DoesNotExist:
+        logger.error(f"PlanGenerationJob {job_id} not found")
+        return {'status': 'missing', 'job_id': job_id}
+
+    if job.is_finished:
+        logger.info(f"PlanGenerationJob {job_id} already finished ({job.status}), skipping")
+        return {'status': job.status, 'job_id': job_id}
+
+    user = job.user
+    logger.info(f"📊 Plan generation job {job_id} started for {user.email}")
+
+    try:
+        job.mark_stage('prepare_user_data', status='RUNNING')
+        from apps.ai_integration.services import create_workout_plan_from_onboarding
+
+        def serve_fallback_plan(plan):
+            # AI is over the latency budget: the loading page moves on with the fallback plan,
+            # this task keeps running until the AI plan supersedes it
+            job.mark_stage('fallback_served')
+            job.mark_finished('SUCCESS', plan=plan)
+
+        job.mark_stage('call_openai_start')
+        workout_plan = create_workout_plan_from_onboarding(user, on_fallback_plan=serve_fallback_plan)
+        job.mark_stage('call_openai_finish')
+
+        if not workout_plan:
+            job.mark_finished('FAILED', error_code='PLAN_CREATION_ERROR',
+                              error_message='Не удалось создать план тренировок')
+            return {'status': job.status, 'job_id': job_id}
+
+        job.mark_stage('build_response')
+        job.mark_finished('SUCCESS', plan=workout_plan)
+
+        openai_duration = job.milestone_times['call_openai_finish'] - job.milestone_times['call_openai_start']
+        logger.info(f"✅ Plan generation job {job_id}: plan {workout_plan.id} created in {openai_duration:.1f}s")
+        return {'status': job.status, 'job_id': job_id, 'plan_id': workout_plan.id}
+
+    except Exception as e:
+        logger.error(f"❌ Plan generation job {job_id} failed at stage {job.stage}: {e}", exc_info=True)
+        job.mark_finished('FAILED', error_code='PLAN_CREATION_ERROR', error_message=str(e))
+        return {'status': job.status, 'job_id': job_id, 'error': str(e)}
@@ -12,6 +12,7 @@ urlpatterns = [
     path('archetype/', views.select_archetype, name='select_archetype'),
     path('generate/', views.generate_plan, name='generate_plan'),
     path('generate-ajax/', views.generate_plan_ajax, name='generate_plan_ajax'),
+    path('generate-status/<uuid:job_id>/', views.plan_generation_status, name='plan_generation_status'),
     path('plan-confirmation/', views.plan_confirmation, name='plan_confirmation'),
     path('plan-confirmation/<int:plan_id>/', views.plan_confirmation, name='plan_confirmation'),
     path('preview/', views.plan_preview, name='plan_preview'),
@@ -482,29 +482,104 @@ def generate_plan(request):
     use_comprehensive = request.POST.get('use_comprehensive') == 'true'
     
     try:
-        # Use centralized service for plan creation
-        from apps.ai_integration.services import create_workout_plan_from_onboarding
-
         # Pass comprehensive flag through user_data
         if use_comprehensive:
             user_data['use_comprehensive'] = True
 
-        workout_plan = create_workout_plan_from_onboarding(request.user)
-        
-        # Check if we got comprehensive data
-        if hasattr(workout_plan, 'ai_analysis') and workout_plan.ai_analysis:
-            # We have comprehensive data, show comprehensive preview
-            return redirect('onboarding:ai_analysis_comprehensive')
-        else:
-            # Standard flow
-            messages.success(request, 'Ваш персональный план тренировок готов!')
-            return redirect('onboarding:plan_confirmation', plan_id=workout_plan.id)
+        # Plan is generated by a background job; loading page polls its status
+        job = _enqueue_plan_generation(request.user)
+
+        if job.status == 'SUCCESS' and job.plan_id:
+            return redirect(_plan_redirect_url(job.plan))
+        if job.status == 'FAILED':
+            raise RuntimeError(job.error_message or job.error_code)
+
+        return redirect('onboarding:generate_plan')
         
     except Exception as e:
         messages.error(request, f'Ошибка при генерации плана: {str(e)}')
         return render(request, 'onboarding/error.html', {'error': str(e)})
 
 
+def _plan_redirect_url(workout_plan):
+    """Where to send the user once the plan exists"""
+    if hasattr(workout_plan, 'ai_analysis') and workout_plan.ai_analysis:
+        # Comprehensive AI analysis - show analysis page
+        return reverse('onboarding:ai_analysis_comprehensive')
+    # Standard plan - go to confirmation
+    return reverse('onboarding:plan_confirmation', kwargs={'plan_id': workout_plan.id})
+
+
+def _enqueue_plan_generation(user):
+    """
+    Create PlanGenerationJob and dispatch it to Celery.
+    Reuses the user's in-flight job so page reloads don't start a second generation.
+    """
+    from django.db import transaction
+
+    from .models import PlanGenerationJob
+    from .tasks import generate_plan_task
+
+    stale_before = timezone.now() - timezone.timedelta(seconds=settings.PLAN_GENERATION_JOB_TIMEOUT)
+    in_flight = PlanGenerationJob.objects.filter(
+        user=user,
+        status__in=['PENDING', 'RUNNING'],
+        created_at__gte=stale_before
+    ).first()
+    if in_flight:
+        logger.info(f"Reusing in-flight plan generation job {in_flight.job_id} for {user.email}")
+        return in_flight
+
+    job = PlanGenerationJob.objects.create(user=user)
+    job.mark_stage('queued')
+
+    if settings.PLAN_GENERATION_ASYNC:
+        job_id = str(job.job_id)
+        transaction.on_commit(lambda: generate_plan_task.delay(job_id))
+        logger.info(f"📨 Plan generation job {job_id} queued for {user.email}")
+    else:
+        # Inline mode (no worker) - same code path, executed in this request
+        generate_plan_task.apply(args=[str(job.job_id)])
+        job.refresh_from_db()
+
+    return job
+
+
+def _plan_job_payload(job):
+    """JSON payload for job status (same shape the loading page already understands)"""
+    payload = {
+        'success': job.status != 'FAILED',
+        'job_id': str(job.job_id),
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'status_url': reverse('onboarding:plan_generation_status', kwargs={'job_id': job.job_id}),
+    }
+
+    if job.status == 'SUCCESS' and job.plan_id:
+        payload['redirect_url'] = _plan_redirect_url(job.plan)
+        payload['plan_id'] = job.plan_id
+    elif job.status == 'FAILED':
+        payload.update({
+            'error_code': job.error_code or 'PLAN_CREATION_ERROR',
+            'message': 'Ошибка создания плана тренировок. Попробуйте еще раз.',
+            'progress': 100,  # Always 100 to unblock frontend
+            'retry_allowed': True,
+            'details': job.error_message if settings.DEBUG else None,
+        })
+
+    return payload
+
+
+@login_required
+def plan_generation_status(request, job_id):
+    """Polling endpoint for background plan generation"""
+    from .models import PlanGenerationJob
+
+    job = get_object_or_404(PlanGenerationJob, job_id=job_id, user=request.user)
+    return JsonResponse(_plan_job_payload(job))
+
+
 @login_required
 def generate_plan_ajax(request):
     """AJAX endpoint for plan generation with progress updates"""
@@ -523,8 +598,6 @@ def generate_plan_ajax(request):
     
     from django.conf import settings
 
-    from apps.ai_integration.services import WorkoutPlanGenerator, create_workout_plan_from_onboarding
-    from apps.onboarding.services import OnboardingDataProcessor
     from apps.workouts.models import WorkoutPlan
 
     # Check if plan already exists
@@ -604,39 +677,15 @@ def generate_plan_ajax(request):
             })
         
         else:
-            # AI plan generation
+            # AI plan generation runs as a Celery job - respond right away with job id
             milestone_times['prepare_user_data'] = time.time()
-            logger.info(f"📊 Starting AI plan generation for {request.user}...")
-
-            # Call AI service to generate workout plan
-            milestone_times['call_openai_start'] = time.time()
-            workout_plan = create_workout_plan_from_onboarding(request.user)
-            milestone_times['call_openai_finish'] = time.time()
-
-            if workout_plan:
-                logger.info(f"✅ AI plan created in {milestone_times['call_openai_finish'] - milestone_times['call_openai_start']:.1f}s")
-
-                # Check if comprehensive analysis available
-                if hasattr(workout_plan, 'ai_analysis') and workout_plan.ai_analysis:
-                    # Comprehensive AI analysis - show analysis page
-                    return JsonResponse({
-                        'success': True,
-                        'progress': 100,
-                        'redirect_url': reverse('onboarding:ai_analysis_comprehensive'),
-                    })
-                else:
-                    # Standard plan - go to confirmation
-                    return JsonResponse({
-                        'success': True,
-                        'progress': 100,
-                        'redirect_url': reverse('onboarding:plan_confirmation', kwargs={'plan_id': workout_plan.id}),
-                        'plan_id': workout_plan.id
-                    })
-            else:
-                return JsonResponse({
-                    'status': 'error',
-                    'error': 'Не удалось создать план тренировок'
-                }, status=500)
+            logger.info(f"📊 Queueing AI plan generation for {request.user}...")
+
+            job = _enqueue_plan_generation(request.user)
+            milestone_times['build_response'] = time.time()
+
+            response_sent = True
+            return JsonResponse(_plan_job_payload(job), status=200 if job.is_finished else 202)
         
     except Exception as e:
         milestone_times['total_duration'] = time.time() - request_start
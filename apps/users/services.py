@@ -0,0 +1,109 @@
+"""
+Per-user "today" snapshot for the dashboard
+
+dashboard_view used to run UserProfile.get_or_create, load the active plan with its whole
+plan_data JSON, possibly save it and look up today's workout on every load. The snapshot
+holds what the page shows (plan, current week/day, today's workout summary, streak, XP)
+as plain data under dashboard_today:<user_id>, so a warm dashboard is one cache read.
+
+Invalidated explicitly on workout completion, plan changes (activation, confirmation,
+regeneration) and profile changes such as the archetype (apps.core.signals). An entry
+also expires when the plan's day rolls over (days count from plan.started_at).
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_cache_key(user_id: int) -> str:
+    return f'dashboard_today:{user_id}'
+
+
+def invalidate_today_snapshot(user_ids: Iterable[int]):
+    cache.delete_many([snapshot_cache_key(user_id) for user_id in user_ids])
+
+
+def _workout_summary(workout) -> Optional[Dict]:
+    if workout is None:
+        return None
+    return {
+        'id': workout.id,
+        'name': workout.name,
+        'is_rest_day': workout.is_rest_day,
+        'exercise_count': len(workout.exercises or []),
+        'confidence_task': workout.confidence_task,
+        'completed_at': workout.completed_at,
+        'feedback_rating': workout.feedback_rating,
+    }
+
+
+def build_today_snapshot(user) -> Dict:
+    """Snapshot from the database; 'expires_at' is when today's workout changes"""
+    profile, _ = UserProfile.objects.get_or_create(user=user)
+    snapshot = {
+        'plan': None,
+        'current_week': 1,
+        'current_day': None,
+        'today_workout': None,
+        'streak': profile.current_streak or 0,
+        'xp': profile.experience_points or 0,
+        'level': profile.level or 1,
+        'total_workouts_completed': profile.total_workouts_completed or 0,
+        'plan_error': False,
+        'expires_at': None,
+    }
+
+    # plan_data (полный JSON плана) дашборду не нужен
+    workout_plan = user.workout_plans.filter(is_active=True).defer('plan_data').first()
+    if not workout_plan:
+        return snapshot
+
+    snapshot['plan'] = {'id': workout_plan.id, 'name': workout_plan.name}
+    try:
+        # CRITICAL FIX: Set started_at if it's missing (for old plans)
+        if not workout_plan.started_at:
+            workout_plan.started_at = timezone.now()
+            workout_plan.save(update_fields=['started_at'])
+
+        current_week = workout_plan.get_current_week()
+        days_since_start = (timezone.now() - workout_plan.started_at).days
+        current_day = (days_since_start % 7) + 1
+
+        snapshot['current_week'] = current_week
+        snapshot['current_day'] = current_day
+        snapshot['today_workout'] = _workout_summary(workout_plan.daily_workouts.filter(
+            week_number=current_week,
+            day_number=current_day
+        ).first())
+        snapshot['expires_at'] = workout_plan.started_at + timedelta(days=days_since_start + 1)
+    except Exception as e:
+        # Log error but don't crash
+        logger.error(f"Error processing workout plan {workout_plan.id}: {e}")
+        snapshot['plan_error'] = True
+
+    return snapshot
+
+
+def get_today_snapshot(user) -> Dict:
+    """Cached snapshot of the user's dashboard"""
+    cache_key = snapshot_cache_key(user.id)
+    snapshot = cache.get(cache_key)
+    if snapshot is not None and (snapshot['expires_at'] is None or snapshot['expires_at'] > timezone.now()):
+        return snapshot
+
+    snapshot = build_today_snapshot(user)
+    if not snapshot['plan_error']:
+        timeout = getattr(settings, 'DASHBOARD_SNAPSHOT_TTL', 3600)
+        if snapshot['expires_at'] is not None:
+            timeout = min(timeout, max(1, int((snapshot['expires_at'] - timezone.now()).total_seconds())))
+        cache.set(cache_key, snapshot, timeout)
+    return snapshot
+
@@ -0,0 +1,104 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.users.services import get_today_snapshot, snapshot_cache_key
+from apps.workouts.models import DailyWorkout, WorkoutPlan
+from apps.workouts.services.plan_materializer import bulk_save_daily_workouts
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                   'LOCATION': 'users-tests'}}
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(username='athlete', email='athlete@example.com', password='x')
+
+
+def make_plan(user, days=(1, 2), **fields):
+    fields.setdefault('started_at', timezone.now() - timedelta(hours=1))
+    plan = WorkoutPlan.objects.create(user=user, name='Plan', duration_weeks=4, plan_data={},
+                                      status='ACTIVE', is_confirmed=True, **fields)
+    DailyWorkout.objects.bulk_create([
+        DailyWorkout(plan=plan, week_number=1, day_number=day, name=f'Day {day}', exercises=[])
+        for day in days
+    ])
+    return plan
+
+
+def test_snapshot_is_cached(user, django_assert_num_queries):
+    plan = make_plan(user)
+    snapshot = get_today_snapshot(user)
+
+    assert snapshot['plan'] == {'id': plan.id, 'name': 'Plan'}
+    assert (snapshot['current_day'], snapshot['today_workout']['name']) == (1, 'Day 1')
+    with django_assert_num_queries(0):
+        assert get_today_snapshot(user) == snapshot
+
+
+def test_snapshot_rebuilt_after_workout_completion(user, client):
+    make_plan(user)
+    today_workout = get_today_snapshot(user)['today_workout']
+    assert today_workout['completed_at'] is None
+
+    client.force_login(user)
+    response = client.post(reverse('workouts:complete_workout', args=[today_workout['id']]),
+                           data=json.dumps({'feedback_rating': 'good'}), content_type='application/json', secure=True)
+    assert response.status_code == 200
+
+    snapshot = get_today_snapshot(user)
+    assert snapshot['today_workout']['completed_at'] is not None
+    assert snapshot['today_workout']['feedback_rating'] == 'good'
+    assert snapshot['total_workouts_completed'] == 1
+
+
+def test_snapshot_rebuilt_after_plan_activation(user, django_capture_on_commit_callbacks):
+    plan = make_plan(user, is_active=False)
+    assert get_today_snapshot(user)['plan'] is None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        plan.is_active = True
+        plan.save()
+
+    assert get_today_snapshot(user)['plan'] == {'id': plan.id, 'name': 'Plan'}
+
+
+def test_snapshot_rebuilt_after_bulk_saved_days(user, django_capture_on_commit_callbacks):
+    plan = make_plan(user, days=())
+    assert get_today_snapshot(user)['today_workout'] is None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        bulk_save_daily_workouts(plan, [DailyWorkout(week_number=1, day_number=1, name='Fresh', exercises=[])])
+
+    assert get_today_snapshot(user)['today_workout']['name'] == 'Fresh'
+
+
+def test_snapshot_expires_when_the_day_rolls_over(user, monkeypatch):
+    plan = make_plan(user)
+    snapshot = get_today_snapshot(user)
+    assert snapshot['expires_at'] == plan.started_at + timedelta(days=1)
+
+    tomorrow = timezone.now() + timedelta(days=1)
+    monkeypatch.setattr(timezone, 'now', lambda: tomorrow)
+
+    snapshot = get_today_snapshot(user)
+    assert (snapshot['current_day'], snapshot['today_workout']['name']) == (2, 'Day 2')
+
+
+def test_plan_error_snapshot_is_not_cached(user, monkeypatch):
+    make_plan(user)
+    monkeypatch.setattr(WorkoutPlan, 'get_current_week', lambda plan: 1 / 0)
+
+    assert get_today_snapshot(user)['plan_error']
+    assert cache.get(snapshot_cache_key(user.id)) is None
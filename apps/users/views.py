@@ -3,13 +3,13 @@ from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
-from django.utils import timezone
 from django.views.generic import CreateView
 from rest_framework import generics, permissions
 
 from .forms import UserProfileForm, UserRegistrationForm
 from .models import User, UserProfile
 from .serializers import ArchetypeSerializer, UserSerializer
+from .services import get_today_snapshot
 
 
 class RegisterView(CreateView):
@@ -48,55 +48,21 @@ class RegisterView(CreateView):
 @login_required
 def dashboard_view(request):
     """Main dashboard showing today's workout"""
-    user = request.user
-    
-    # Safe guard: Get or create user profile
-    profile, _ = UserProfile.objects.get_or_create(user=user)
-    
-    # Get active workout plan with safe handling
-    workout_plan = user.workout_plans.filter(is_active=True).first()
-    
-    # Safe variables for template
-    today_workout = None
-    current_week = 1
-    new_achievements = []
-    
-    if workout_plan:
-        try:
-            # CRITICAL FIX: Set started_at if it's missing (for old plans)
-            if not workout_plan.started_at:
-                workout_plan.started_at = timezone.now()
-                workout_plan.save()
-            
-            # Get today's workout with error handling
-            current_week = workout_plan.get_current_week()
-            days_since_start = (timezone.now() - workout_plan.started_at).days if workout_plan.started_at else 0
-            current_day = (days_since_start % 7) + 1
-            
-            today_workout = workout_plan.daily_workouts.filter(
-                week_number=current_week,
-                day_number=current_day
-            ).first()
-        except Exception as e:
-            # Log error but don't crash
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error processing workout plan {workout_plan.id}: {e}")
-            messages.warning(request, 'Есть проблемы с планом тренировок. Попробуйте обновить страницу.')
-    
-    # Achievements removed - no longer needed
-    new_achievements = []
+    # Cached "today" snapshot (see users.services); built from the database on a miss
+    snapshot = get_today_snapshot(request.user)
+    if snapshot['plan_error']:
+        messages.warning(request, 'Есть проблемы с планом тренировок. Попробуйте обновить страницу.')
     
     # Safe context building
     context = {
-        'profile': profile,
-        'workout_plan': workout_plan,
-        'today_workout': today_workout,
-        'current_week': current_week,
-        'new_achievements': new_achievements,
-        'streak': getattr(profile, 'current_streak', 0),
-        'xp': getattr(profile, 'experience_points', 0),
-        'level': getattr(profile, 'level', 1),
+        'workout_plan': snapshot['plan'],
+        'today_workout': snapshot['today_workout'],
+        'current_week': snapshot['current_week'],
+        'new_achievements': [],  # Achievements removed - no longer needed
+        'streak': snapshot['streak'],
+        'xp': snapshot['xp'],
+        'level': snapshot['level'],
+        'total_workouts_completed': snapshot['total_workouts_completed'],
     }
     
     return render(request, 'users/dashboard.html', context)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import CSVExercise, DailyWorkout, R2Video, R2Image, WorkoutPlan
+from .models import CSVExercise, DailyWorkout, PlaylistTemplate, R2Video, R2Image, WorkoutPlan, WorkoutPlanPatch
 
 
 # ExerciseAdmin REMOVED in Phase 5.6 - Exercise model deleted
@@ -93,6 +93,9 @@ class WorkoutPlanAdmin(admin.ModelAdmin):
         }),
         ('Adaptation', {
             'fields': ('last_adaptation_date', 'adaptation_count')
+        }),
+        ('Playlists', {
+            'fields': ('playlist_template', 'playlist_seed')
         })
     )
     
@@ -126,4 +129,19 @@ class DailyWorkoutAdmin(admin.ModelAdmin):
             'fields': ('substitutions',),
             'classes': ('collapse',)
         })
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(WorkoutPlanPatch)
+class WorkoutPlanPatchAdmin(admin.ModelAdmin):
+    list_display = ('plan', 'week_number', 'affected_days', 'response_ms', 'created_at')
+    list_filter = ('week_number', 'created_at')
+    search_fields = ('plan__name', 'plan__user__email')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(PlaylistTemplate)
+class PlaylistTemplateAdmin(admin.ModelAdmin):
+    list_display = ('archetype', 'variant', 'catalog_digest', 'is_active', 'created_at')
+    list_filter = ('archetype', 'is_active')
+    readonly_fields = ('created_at',)
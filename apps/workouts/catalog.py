@@ -10,7 +10,6 @@ from typing import Dict, List, Optional, Set
 from django.core.cache import cache
 
 from .constants import EXERCISE_FALLBACK_PRIORITY
-from .models import CSVExercise
 
 logger = logging.getLogger(__name__)
 
@@ -79,10 +78,12 @@ class ExerciseCatalog:
         
         # Build catalog from database
         catalog = {}
-        # Use actual CSVExercise fields that exist in the model and CSV
-        exercises = CSVExercise.objects.all().values(
-            'id', 'name_ru', 'description'
-        )
+        # CSVExercise rows are already loaded by the process-wide exercise index
+        from apps.workouts.services.exercise_index import get_exercise_index
+        exercises = [
+            {'id': exercise.id, 'name_ru': exercise.name_ru, 'description': exercise.description}
+            for exercise in get_exercise_index().exercises
+        ]
         
         for ex in exercises:
             # Simplified processing - use defaults for missing fields
@@ -96,4 +96,12 @@ CONTEXTUAL_INTRO_SELECTION_FACTORS = [
 ]
 
 MID_WORKOUT_INSERTION_FREQUENCY = 3  # Every 3rd exercise gets mid-workout motivation
-WEEKLY_THEME_VIDEO_PRIORITY = 1      # High priority for theme-based videos
\ No newline at end of file
+WEEKLY_THEME_VIDEO_PRIORITY = 1      # High priority for theme-based videos
+
+def exercise_type_from_code(code: str) -> str:
+    """Тип упражнения по коду видео: main_01_technique_m01 -> main (по умолчанию main)"""
+    if code.startswith('warmup_'):
+        return 'warmup'
+    if code.startswith(('main_', 'endurance_', 'relaxation_')):
+        return code.split('_')[0]
+    return 'main'
@@ -0,0 +1,115 @@
+"""
+Benchmark PlaylistGeneratorV2.generate_full_program: per-selection queries vs in-memory pool
+
+Each run builds a fresh 21-day plan for a synthetic user and generates its playlists
+once with the query path (PLAYLIST_IN_MEMORY_POOL=False) and once with the pool,
+reporting wall time and SQL query counts per path.
+
+    python manage.py benchmark_playlists --runs 10
+    python manage.py benchmark_playlists --runs 10 --synthetic-catalog  # empty R2 catalog (dev DB)
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.workouts.models import DailyWorkout, R2Video, WorkoutPlan
+from apps.workouts.services.exercise_index import rebuild_exercise_index
+from apps.workouts.services.motivation_index import R2_ARCHETYPES, rebuild_motivation_index
+from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
+
+User = get_user_model()
+
+PATHS = (('queries', False), ('in-memory', True))
+EXERCISE_TYPES = ('warmup', 'main', 'endurance', 'relaxation')
+MOTIVATION_TYPES = ('intro', 'warmup_motivation', 'main_motivation', 'closing')
+
+
+class Command(BaseCommand):
+    help = 'Compare query-based and in-memory playlist generation for a 21-day program'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Plans generated per path')
+        parser.add_argument('--archetype', default='mentor', help='Trainer archetype')
+        parser.add_argument('--synthetic-catalog', action='store_true',
+                            help='Add a synthetic R2 catalog for the run (removed afterwards)')
+
+    def handle(self, *args, **options):
+        created_codes = self._create_synthetic_catalog() if options['synthetic_catalog'] else []
+        if not R2Video.objects.filter(category='exercises').exists():
+            raise CommandError('No exercise videos in R2Video - run with --synthetic-catalog')
+
+        user = User.objects.create_user(
+            username=f'bench_playlists_{int(time.time())}',
+            email=f'bench_playlists_{int(time.time())}@example.com',
+            password=None,
+        )
+        results = {name: {'ms': [], 'queries': [], 'items': []} for name, _ in PATHS}
+
+        try:
+            for run in range(options['runs']):
+                for name, in_memory in PATHS:
+                    plan = self._create_plan(user, run, name)
+                    generator = PlaylistGeneratorV2(user, options['archetype'], in_memory=in_memory)
+
+                    started = time.perf_counter()
+                    with CaptureQueriesContext(connection) as queries:
+                        stats = generator.generate_full_program(plan)
+                    results[name]['ms'].append((time.perf_counter() - started) * 1000)
+                    results[name]['queries'].append(len(queries))
+                    results[name]['items'].append(stats['videos_total'])
+                    if stats['errors']:
+                        self.stdout.write(self.style.WARNING(f"[{name}] {len(stats['errors'])} day errors: {stats['errors'][0]}"))
+        finally:
+            user.delete()
+            if created_codes:
+                R2Video.objects.filter(code__in=created_codes).delete()
+
+        self._print_summary(results, options['runs'])
+
+    def _create_plan(self, user, run, path):
+        plan = WorkoutPlan.objects.create(user=user, name=f'Benchmark {path} #{run + 1}', duration_weeks=3, plan_data={})
+        DailyWorkout.objects.bulk_create([
+            DailyWorkout(plan=plan, week_number=(day - 1) // 7 + 1, day_number=day, name=f'День {day}', exercises=[])
+            for day in range(1, 22)
+        ])
+        return plan
+
+    def _create_synthetic_catalog(self):
+        """R2-like codes: <type>_NN exercises and <type>_<archetype>_dayNN motivation"""
+        videos = [
+            R2Video(code=f'{exercise_type}_{number:03d}', name=f'{exercise_type} {number}', category='exercises')
+            for exercise_type in EXERCISE_TYPES
+            for number in range(1, 61)
+        ] + [
+            R2Video(code=f'{video_type}_{archetype}_day{day:02d}', name=f'{video_type} {archetype} {day}', category='motivation')
+            for video_type in MOTIVATION_TYPES
+            for archetype in R2_ARCHETYPES
+            for day in range(1, 22)
+        ]
+        existing = set(R2Video.objects.filter(code__in=[video.code for video in videos]).values_list('code', flat=True))
+        videos = [video for video in videos if video.code not in existing]
+        R2Video.objects.bulk_create(videos)
+        rebuild_motivation_index()  # bulk_create sends no post_save
+        rebuild_exercise_index()
+        self.stdout.write(f"Added {len(videos)} synthetic R2 videos")
+        return [video.code for video in videos]
+
+    def _print_summary(self, results, runs):
+        self.stdout.write(f"\n📊 {runs} plans per path, 21 days each")
+        self.stdout.write(f"   {'path':<12}{'p50 ms':>10}{'max ms':>10}{'queries':>10}{'items':>8}")
+        for name, _ in PATHS:
+            row = results[name]
+            if not row['ms']:
+                continue
+            self.stdout.write(
+                f"   {name:<12}{statistics.median(row['ms']):>10.1f}{max(row['ms']):>10.1f}"
+                f"{statistics.median(row['queries']):>10.0f}{statistics.median(row['items']):>8.0f}"
+            )
+
+        if results['queries']['ms'] and results['in-memory']['ms']:
+            speedup = statistics.median(results['queries']['ms']) / max(statistics.median(results['in-memory']['ms']), 0.001)
+            self.stdout.write(self.style.SUCCESS(f"   in-memory pool: {speedup:.1f}x faster"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.workouts.models import PlaylistTemplate
+from apps.workouts.services.motivation_index import R2_ARCHETYPES
+from apps.workouts.services.playlist_templates import build_playlist_templates, catalog_digest
+
+
+class Command(BaseCommand):
+    help = 'Build shared 21-day playlist templates for the current R2 catalog (PLAYLIST_SHARED_TEMPLATES)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archetype', choices=R2_ARCHETYPES, help='Build only for this R2 archetype')
+        parser.add_argument('--variants', type=int, help='Templates per archetype (default: PLAYLIST_TEMPLATE_VARIANTS)')
+
+    def handle(self, *args, **options):
+        archetypes = [options['archetype']] if options['archetype'] else R2_ARCHETYPES
+        built = build_playlist_templates(archetypes, variants=options['variants'])
+
+        self.stdout.write(f"Catalog {catalog_digest()}: built {len(built)} templates")
+        for archetype in archetypes:
+            active = PlaylistTemplate.objects.filter(archetype=archetype, is_active=True)
+            self.stdout.write(f"  {archetype}: {active.count()} active templates, {active.filter(plans__isnull=False).distinct().count()} in use")
+        self.stdout.write(self.style.SUCCESS('✅ Playlist templates ready'))
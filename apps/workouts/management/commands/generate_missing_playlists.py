@@ -1,9 +1,66 @@
+"""
+Generate playlists for workout days that have none
+
+Days without playlist items are found with one annotated query (no per-workout count()),
+grouped by user and split into chunks. Each chunk is generated in one transaction by a
+worker process, so an interrupted run loses at most the chunks in flight: rerunning picks
+up exactly the days still missing. Plans on shared playlist templates are skipped.
+
+    python manage.py generate_missing_playlists --workers 4 --chunk-size 50
+    python manage.py generate_missing_playlists --plan-id 123 --workers 1
+    python manage.py generate_missing_playlists --dry-run
+"""
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 from django.core.management.base import BaseCommand
-from django.contrib.auth import get_user_model
-from apps.workouts.models import WorkoutPlan, DailyWorkout, DailyPlaylistItem
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Count
+
+from apps.workouts.models import DailyWorkout, WorkoutPlan
+from apps.workouts.services.day_playlists import user_archetype
 from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
 
-User = get_user_model()
+
+def _init_worker():
+    """Worker process: Django set up (spawn start method), no connections shared with the parent"""
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def _generate_chunk(workout_ids):
+    """Worker: generate playlists for a chunk of days in one transaction; never raises"""
+    started = time.monotonic()
+    try:
+        workouts = list(
+            DailyWorkout.objects.filter(id__in=workout_ids)
+            .select_related('plan__user__profile')
+            .order_by('plan__user_id', 'week_number', 'day_number')
+        )
+        by_user = defaultdict(list)
+        for workout in workouts:
+            by_user[workout.plan.user].append(workout)
+
+        days = items = 0
+        with transaction.atomic():
+            for user, user_workouts in by_user.items():
+                # One generator per user: exercises don't repeat across the user's days
+                generator = PlaylistGeneratorV2(user, user_archetype(user))
+                for workout in user_workouts:
+                    try:
+                        with transaction.atomic():
+                            items += len(generator.generate_playlist_for_day(workout.day_number, workout))
+                    except IntegrityError:
+                        pass  # generated meanwhile by a request or prefetch
+                    days += 1
+
+        return {'status': 'ok', 'days': days, 'items': items, 'seconds': time.monotonic() - started}
+    except Exception as e:
+        return {'status': 'failed', 'days': 0, 'items': 0, 'error': str(e)[:500],
+                'seconds': time.monotonic() - started}
 
 
 class Command(BaseCommand):
@@ -11,6 +68,9 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--plan-id', type=int, help='Generate only for specific plan ID')
+        parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                            help='Worker processes (1 = generate in this process)')
+        parser.add_argument('--chunk-size', type=int, default=50, help='Workout days per transaction')
         parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
 
     def handle(self, *args, **options):
@@ -26,56 +86,110 @@ class Command(BaseCommand):
             # Все планы со статусом CONFIRMED/ACTIVE
             plans = WorkoutPlan.objects.filter(status__in=['CONFIRMED', 'ACTIVE'])
 
-        self.stdout.write(f'Found {plans.count()} plans to process')
+        missing = self._find_missing(plans)
+        plan_count = len({plan for plan, _, _ in missing})
+        self.stdout.write(f'Found {len(missing)} workouts without playlists in {plan_count} plans')
+
+        if dry_run:
+            by_plan = defaultdict(list)
+            for plan, _, workout_id in missing:
+                by_plan[plan].append(workout_id)
+            for plan, workout_ids in by_plan.items():
+                self.stdout.write(f'  Plan {plan}: would generate {len(workout_ids)} playlists')
+            self.stdout.write('\n📋 Dry run completed - no changes made')
+            return
+
+        if not missing:
+            self.stdout.write(self.style.SUCCESS('✅ All workouts already have playlists'))
+            return
 
-        total_generated = 0
-        
-        for plan in plans:
-            user = plan.user
-            
-            # Получаем архетип пользователя
-            if hasattr(user, 'profile') and user.profile.archetype:
-                archetype = user.profile.archetype
+        chunks = self._chunk(missing, max(1, options['chunk_size']))
+        workers = max(1, min(options['workers'], len(chunks)))
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite allows one writer at a time - using 1 worker'))
+            workers = 1
+        self.stdout.write(f'{len(chunks)} chunks, {workers} workers')
+
+        self.totals = {'days': 0, 'items': 0, 'failed_chunks': 0}
+        self.total_days = len(missing)
+        self.started = time.monotonic()
+
+        try:
+            if workers == 1:
+                for chunk in chunks:
+                    self._record(_generate_chunk(chunk))
             else:
-                archetype = 'mentor'
-                
-            self.stdout.write(f'\nPlan {plan.id} ({plan.name}) - User: {user.email} - Archetype: {archetype}')
-            
-            # Найдем тренировки без плейлистов
-            workouts_without_playlists = []
-            for workout in plan.daily_workouts.all():
-                if workout.playlist_items.count() == 0:
-                    workouts_without_playlists.append(workout)
-            
-            if not workouts_without_playlists:
-                self.stdout.write('  ✅ All workouts already have playlists')
-                continue
-                
-            self.stdout.write(f'  Found {len(workouts_without_playlists)} workouts without playlists')
-            
-            if dry_run:
-                for workout in workouts_without_playlists:
-                    self.stdout.write(f'    Would generate playlist for Day {workout.day_number}')
-                continue
-                
-            # Генерируем плейлисты
-            generator = PlaylistGeneratorV2(user, archetype)
-            
-            for workout in workouts_without_playlists:
-                try:
-                    items = generator.generate_playlist_for_day(workout.day_number, workout)
-                    self.stdout.write(
-                        self.style.SUCCESS(f'    ✅ Day {workout.day_number}: {len(items)} items generated')
-                    )
-                    total_generated += len(items)
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'    ❌ Day {workout.day_number}: Error - {e}')
-                    )
-
-        if not dry_run:
-            self.stdout.write(
-                self.style.SUCCESS(f'\n🎉 Total playlist items generated: {total_generated}')
-            )
-        else:
-            self.stdout.write('\n📋 Dry run completed - no changes made')
\ No newline at end of file
+                self._run_pool(chunks, workers)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nInterrupted - committed chunks are kept, rerun to continue'))
+
+        self._print_summary(time.monotonic() - self.started)
+
+    def _find_missing(self, plans):
+        """(plan_id, user_id, workout_id) of days without playlist items, in one query"""
+        return list(
+            DailyWorkout.objects.filter(plan__in=plans, plan__playlist_template__isnull=True)
+            .annotate(item_count=Count('playlist_items'))
+            .filter(item_count=0)
+            .order_by('plan__user_id', 'plan_id', 'week_number', 'day_number')
+            .values_list('plan_id', 'plan__user_id', 'id')
+        )
+
+    def _chunk(self, missing, chunk_size):
+        """Chunks of about chunk_size days; a user's days never span chunks (parallel workers would repeat exercises)"""
+        by_user = defaultdict(list)
+        for _, user_id, workout_id in missing:
+            by_user[user_id].append(workout_id)
+
+        chunks, current = [], []
+        for workout_ids in by_user.values():
+            if current and len(current) + len(workout_ids) > chunk_size:
+                chunks.append(current)
+                current = []
+            current.extend(workout_ids)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _run_pool(self, chunks, workers):
+        # Forked workers must not inherit the parent's open connections
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        try:
+            futures = [executor.submit(_generate_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                self._record(future.result())
+        except KeyboardInterrupt:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+    def _record(self, result):
+        self.totals['days'] += result['days']
+        self.totals['items'] += result['items']
+        if result['status'] != 'ok':
+            self.totals['failed_chunks'] += 1
+            self.stdout.write(self.style.ERROR(f"  ❌ Chunk failed: {result['error']}"))
+
+        elapsed = time.monotonic() - self.started
+        rate = self.totals['days'] / elapsed if elapsed else 0
+        remaining = self.total_days - self.totals['days']
+        eta = f'{remaining / rate:.0f}s' if rate else '?'
+        self.stdout.write(
+            f"  [{self.totals['days']}/{self.total_days}] "
+            f"{self.totals['days'] * 100 / self.total_days:.0f}% {rate:.1f} days/s, ETA {eta}"
+        )
+
+    def _print_summary(self, elapsed):
+        days, items = self.totals['days'], self.totals['items']
+        self.stdout.write(self.style.SUCCESS(
+            f'\n🎉 Total playlist items generated: {items} for {days} workouts in {elapsed:.1f}s'
+        ))
+        if elapsed:
+            self.stdout.write(f'   Throughput: {days / elapsed:.1f} days/s, {items / elapsed:.0f} items/s')
+        if self.totals['failed_chunks'] or days < self.total_days:
+            self.stdout.write(self.style.WARNING(
+                f"   {self.total_days - days} workouts still missing playlists "
+                f"({self.totals['failed_chunks']} failed chunks) - rerun to retry"
+            ))
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.8 on 2026-10-17 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0003_fix_daily_workout_unique_constraint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workoutplan",
+            name="generation_source",
+            field=models.CharField(
+                choices=[("AI", "AI generated"), ("FALLBACK", "Fallback template")],
+                default="AI",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="workoutplan",
+            name="superseded_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="workoutplan",
+            name="superseded_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="superseded_plans",
+                to="workouts.workoutplan",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.8 on 2026-10-17 04:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0004_workoutplan_hedged_generation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkoutPlanPatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week_number", models.PositiveIntegerField()),
+                ("operations", models.JSONField(default=list)),
+                ("rejected_operations", models.JSONField(blank=True, default=list)),
+                ("feedback_summary", models.JSONField(blank=True, default=dict)),
+                ("notes", models.TextField(blank=True)),
+                ("affected_days", models.PositiveIntegerField(default=0)),
+                ("prompt_chars", models.PositiveIntegerField(default=0)),
+                ("response_ms", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "plan",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="patches",
+                        to="workouts.workoutplan",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "workout_plan_patches",
+                "ordering": ["plan", "week_number", "created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.0.8 on 2026-10-17 04:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0005_workoutplanpatch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workoutplan",
+            name="playlist_seed",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="PlaylistTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("archetype", models.CharField(max_length=20)),
+                ("variant", models.PositiveSmallIntegerField()),
+                ("catalog_digest", models.CharField(max_length=16)),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "playlist_templates",
+                "ordering": ["archetype", "variant"],
+                "indexes": [
+                    models.Index(
+                        fields=["archetype", "is_active"],
+                        name="playlist_te_archety_3ddce2_idx",
+                    )
+                ],
+                "unique_together": {("archetype", "variant", "catalog_digest")},
+            },
+        ),
+        migrations.AddField(
+            model_name="workoutplan",
+            name="playlist_template",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="plans",
+                to="workouts.playlisttemplate",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PlaylistTemplateItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day_number", models.PositiveSmallIntegerField()),
+                ("order", models.PositiveIntegerField()),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[
+                            ("intro", "Intro"),
+                            ("warmup", "Warm-up"),
+                            ("main", "Main Exercise Clip"),
+                            ("transition", "Transition"),
+                            ("cooldown", "Cooldown / Stretch"),
+                            ("timer", "Timer"),
+                            ("motivation", "Motivation"),
+                            ("breathing", "Breathing"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "duration_seconds",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("overlay", models.JSONField(blank=True, default=dict)),
+                (
+                    "template",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="workouts.playlisttemplate",
+                    ),
+                ),
+                (
+                    "video",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="used_in_templates",
+                        to="workouts.r2video",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "playlist_template_items",
+                "ordering": ["template_id", "day_number", "order"],
+                "unique_together": {("template", "day_number", "order")},
+            },
+        ),
+    ]
@@ -5,7 +5,7 @@ from django.db import models
 from django.utils import timezone
 import re
 
-from .constants import Archetype, VideoKind
+from .constants import Archetype, VideoKind, exercise_type_from_code
 
 User = get_user_model()
 
@@ -111,14 +111,8 @@ class R2Video(models.Model):
     def exercise_type(self):
         """Определяет тип упражнения для категории exercises"""
         if self.category == 'exercises':
-            if self.code.startswith('warmup_'):
-                return 'warmup'
-            elif self.code.startswith('main_') or self.code.startswith('endurance_') or self.code.startswith('relaxation_'):
-                # Разбираем из названия файла: main_01_technique_m01.mp4
-                parts = self.code.split('_')
-                if len(parts) >= 2:
-                    return parts[0]  # main, endurance, relaxation  
-            return 'main'  # По умолчанию основное упражнение
+            # Разбираем из названия файла: main_01_technique_m01.mp4
+            return exercise_type_from_code(self.code)
         return self.category
     
     def save(self, *args, **kwargs):
@@ -259,6 +253,33 @@ class WorkoutPlan(models.Model):
     is_active = models.BooleanField(default=True)
     is_confirmed = models.BooleanField(default=False)  # Legacy, use status instead
     
+    # Hedged generation: a template plan is served when AI exceeds the latency budget
+    # and is superseded by the AI plan once it arrives
+    SOURCE_CHOICES = [
+        ('AI', 'AI generated'),
+        ('FALLBACK', 'Fallback template'),
+    ]
+    generation_source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default='AI')
+    superseded_by = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='superseded_plans'
+    )
+    superseded_at = models.DateTimeField(null=True, blank=True)
+    
+    # Shared playlists (PLAYLIST_SHARED_TEMPLATES): the plan reads a canonical program
+    # instead of owning DailyPlaylistItem rows; the seed personalizes clip order
+    playlist_template = models.ForeignKey(
+        'PlaylistTemplate',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='plans'
+    )
+    playlist_seed = models.PositiveIntegerField(null=True, blank=True)
+    
     class Meta:
         db_table = 'workout_plans'
         ordering = ['-created_at']
@@ -312,6 +333,30 @@ class DailyWorkout(models.Model):
         ordering = ['week_number', 'day_number']
 
 
+class WorkoutPlanPatch(models.Model):
+    """Weekly adaptation applied to a plan's DailyWorkouts (JSON-patch operations over the week)"""
+    plan = models.ForeignKey(WorkoutPlan, on_delete=models.CASCADE, related_name='patches')
+    week_number = models.PositiveIntegerField()
+
+    # [{"op": "replace", "path": "/days/8/exercises/0/sets", "value": 4}, ...]
+    operations = models.JSONField(default=list)
+    rejected_operations = models.JSONField(default=list, blank=True)  # ops that failed validation, with reason
+    feedback_summary = models.JSONField(default=dict, blank=True)
+    notes = models.TextField(blank=True)
+
+    affected_days = models.PositiveIntegerField(default=0)
+    prompt_chars = models.PositiveIntegerField(default=0)
+    response_ms = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'workout_plan_patches'
+        ordering = ['plan', 'week_number', 'created_at']
+
+    def __str__(self):
+        return f"{self.plan} - week {self.week_number}: {len(self.operations)} ops"
+
+
 class WorkoutExecution(models.Model):
     workout = models.ForeignKey(DailyWorkout, on_delete=models.CASCADE, related_name='executions')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='workout_executions')
@@ -446,4 +491,41 @@ class DailyPlaylistItem(models.Model):
         unique_together = [("day", "order")]
 
     def __str__(self):
-        return f"Day {self.day.day_number} - #{self.order} {self.role}"
\ No newline at end of file
+        return f"Day {self.day.day_number} - #{self.order} {self.role}"
+
+
+class PlaylistTemplate(models.Model):
+    """Canonical 21-day playlist program shared by all plans of an R2 archetype"""
+    archetype = models.CharField(max_length=20)  # R2 names: bro, sergeant, intellectual
+    variant = models.PositiveSmallIntegerField()
+    catalog_digest = models.CharField(max_length=16)  # R2 catalog the template was built from
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'playlist_templates'
+        unique_together = [('archetype', 'variant', 'catalog_digest')]
+        indexes = [models.Index(fields=['archetype', 'is_active'])]
+        ordering = ['archetype', 'variant']
+
+    def __str__(self):
+        return f"{self.archetype} #{self.variant} ({self.catalog_digest})"
+
+
+class PlaylistTemplateItem(models.Model):
+    """Video slot of a PlaylistTemplate day (same layout as DailyPlaylistItem)"""
+    template = models.ForeignKey(PlaylistTemplate, on_delete=models.CASCADE, related_name='items')
+    day_number = models.PositiveSmallIntegerField()  # 1-21
+    order = models.PositiveIntegerField()
+    role = models.CharField(max_length=20, choices=DailyPlaylistItem.ROLE_CHOICES)
+    video = models.ForeignKey('R2Video', on_delete=models.PROTECT, related_name='used_in_templates')
+    duration_seconds = models.PositiveIntegerField(null=True, blank=True)
+    overlay = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        db_table = 'playlist_template_items'
+        ordering = ['template_id', 'day_number', 'order']
+        unique_together = [('template', 'day_number', 'order')]
+
+    def __str__(self):
+        return f"{self.template} day {self.day_number} - #{self.order} {self.role}"
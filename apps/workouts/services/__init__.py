@@ -1,6 +1,6 @@
 from .playlist_generator_v2 import PlaylistGeneratorV2
-from .plan_materializer import materialize_daily_workouts, get_plan_report
+from .plan_materializer import materialize_daily_workouts, bulk_save_daily_workouts, get_plan_report
 
-__all__ = ['PlaylistGeneratorV2', 'materialize_daily_workouts', 'get_plan_report']
+__all__ = ['PlaylistGeneratorV2', 'materialize_daily_workouts', 'bulk_save_daily_workouts', 'get_plan_report']
 
 # Legacy playlist functions removed - use PlaylistGeneratorV2 instead
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+On-demand per-day playlists with look-ahead prefetch
+
+With PLAYLIST_LAZY_GENERATION plan creation no longer builds all 21 playlists. A day's
+playlist is generated the first time it is opened (get_day_playlist) or ahead of time by
+prefetch_day_playlists_task, which covers the next PLAYLIST_PREFETCH_DAYS days. Playlists
+of plans abandoned early are never written.
+
+The ready-to-render playlist of a day (video code, URL, role, order, duration, overlay)
+is cached under day_playlist:<workout_id>; generators drop it when they rewrite the items.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from apps.workouts.models import DailyPlaylistItem, DailyWorkout
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_LOCK_TTL = 300
+
+
+def payload_cache_key(workout_id: int) -> str:
+    return f'day_playlist:{workout_id}'
+
+
+def invalidate_day_playlists(workout_ids: Iterable[int]):
+    cache.delete_many([payload_cache_key(workout_id) for workout_id in workout_ids])
+
+
+def user_archetype(user) -> str:
+    profile = getattr(user, 'profile', None)
+    return getattr(profile, 'archetype', None) or 'mentor'
+
+
+def playlist_payload(items: Iterable[DailyPlaylistItem]) -> List[Dict]:
+    """Plain, cacheable form of a day's playlist items (video must be loaded)"""
+    return [
+        {
+            'id': item.id,
+            'order': item.order,
+            'role': item.role,
+            'duration_seconds': item.duration_seconds,
+            'overlay': item.overlay,
+            'video_code': item.video.code,
+            'video_category': item.video.category,
+            'url': item.video.r2_url,
+        }
+        for item in items
+        if item.video_id
+    ]
+
+
+def _load_items(workout: DailyWorkout) -> List[DailyPlaylistItem]:
+    return list(DailyPlaylistItem.objects.filter(day=workout).select_related('video').order_by('order'))
+
+
+def _generate_items(generator, workout: DailyWorkout) -> List[DailyPlaylistItem]:
+    """Generate a day's playlist; a concurrent request or prefetch may have written it first"""
+    try:
+        with transaction.atomic():
+            generator.generate_playlist_for_day(workout.day_number, workout)
+    except IntegrityError:
+        logger.info(f"Playlist for workout {workout.id} was generated concurrently - using it")
+    return _load_items(workout)
+
+
+def get_day_playlist(workout: DailyWorkout, archetype: Optional[str] = None, prefetch: bool = True) -> List[Dict]:
+    """Cached playlist payload of a day, generating the playlist on first use"""
+    if workout.plan.playlist_template_id:
+        from apps.workouts.services.playlist_templates import template_playlist
+        return template_playlist(workout)
+
+    cache_key = payload_cache_key(workout.id)
+    payload = cache.get(cache_key)
+    if payload is not None:
+        return payload
+
+    items = _load_items(workout)
+    if not items:
+        from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
+
+        user = workout.plan.user
+        generator = PlaylistGeneratorV2(user, archetype or user_archetype(user))
+        items = _generate_items(generator, workout)
+        logger.info(f"🎞️ Playlist for workout {workout.id} generated on demand ({len(items)} items)")
+
+    payload = playlist_payload(items)
+    if payload:
+        cache.set(cache_key, payload, getattr(settings, 'PLAYLIST_PAYLOAD_CACHE_TTL', 6 * 3600))
+    if prefetch:
+        schedule_playlist_prefetch(workout.plan, after=workout, archetype=archetype)
+    return payload
+
+
+def schedule_playlist_prefetch(plan, after: Optional[DailyWorkout] = None, archetype: Optional[str] = None) -> bool:
+    """Queue generation of the next PLAYLIST_PREFETCH_DAYS days (at most once per plan and day per lock TTL)"""
+    if getattr(settings, 'PLAYLIST_PREFETCH_DAYS', 2) <= 0:
+        return False
+
+    lock_key = f'day_playlist_prefetch:{plan.id}:{after.id if after else 0}'
+    if not cache.add(lock_key, True, PREFETCH_LOCK_TTL):
+        return False
+
+    from apps.workouts.tasks import prefetch_day_playlists_task
+
+    # robust: a broker outage is only logged - days are still generated when opened
+    transaction.on_commit(
+        lambda: prefetch_day_playlists_task.delay(plan.id, after.id if after else None, archetype),
+        robust=True,
+    )
+    return True
+
+
+def prefetch_day_playlists(plan, after: Optional[DailyWorkout] = None, days: Optional[int] = None,
+                           archetype: Optional[str] = None) -> int:
+    """Generate missing playlists for the `days` workout days following `after` (from the start if None)"""
+    from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
+
+    if plan.playlist_template_id:
+        return 0  # shared template - nothing to write
+
+    days = getattr(settings, 'PLAYLIST_PREFETCH_DAYS', 2) if days is None else days
+    upcoming = plan.daily_workouts.order_by('week_number', 'day_number')
+    if after is not None:
+        upcoming = upcoming.filter(
+            Q(week_number__gt=after.week_number) | Q(week_number=after.week_number, day_number__gt=after.day_number)
+        )
+
+    # Rest days get a playlist only when the user actually opens them
+    window = list(upcoming.filter(is_rest_day=False)[:days])
+    ready = set(DailyPlaylistItem.objects.filter(day__in=window).values_list('day_id', flat=True).distinct())
+    missing = [workout for workout in window if workout.id not in ready]
+    if not missing:
+        return 0
+
+    # One generator: the video pool is loaded once and exercises don't repeat across the prefetched days
+    generator = PlaylistGeneratorV2(plan.user, archetype or user_archetype(plan.user))
+    generated = 0
+    for workout in missing:
+        items = _generate_items(generator, workout)
+        if items:
+            cache.set(payload_cache_key(workout.id), playlist_payload(items),
+                      getattr(settings, 'PLAYLIST_PAYLOAD_CACHE_TTL', 6 * 3600))
+            generated += 1
+
+    logger.info(f"🎞️ Prefetched {generated} playlists for plan {plan.id}")
+    return generated
@@ -0,0 +1,153 @@
+"""
+Process-wide video code -> exercise metadata index
+
+Built once from R2Video(category='exercises') and CSVExercise. For every exercise video
+it holds the exercise type, the matching CSVExercise (id == code), the display name and
+the muscle group. Before the index these were guessed per video: name_ru/id icontains
+queries and substring scans of the code on every access.
+
+The display name keeps the former rule: the first CSVExercise by id whose name_ru or
+id contains the code's exercise number ('main_042_technique_m01' -> '042').
+
+Shared by the workout day payload, the playlist generator's video pool (built from
+index.videos) and ExerciseCatalog. The index is rebuilt after R2Video / CSVExercise
+changes are committed (apps.core.signals); other processes notice through a version
+counter in the shared cache.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from apps.core.utils.process_index import SharedVersionIndex
+from apps.workouts.constants import exercise_type_from_code
+from apps.workouts.models import CSVExercise, R2Video
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'exercise_metadata_index:version'
+EXERCISE_PREFIXES = ('warmup', 'main', 'endurance', 'relaxation')
+
+
+def exercise_number(code: str) -> Optional[str]:
+    """'main_042_technique_m01' -> '042'; None for non-exercise codes"""
+    parts = code.split('_')
+    if len(parts) >= 2 and parts[0] in EXERCISE_PREFIXES:
+        return parts[1]
+    return None
+
+
+def clean_video_name(code: str) -> str:
+    return code.replace('_technique_m01', '').replace('_', ' ').title()
+
+
+def muscle_group_from_code(code: str) -> str:
+    """Extract muscle group from video code"""
+    code_lower = code.lower()
+
+    if any(term in code_lower for term in ['push', 'chest', 'bench']):
+        return 'Грудь'
+    elif any(term in code_lower for term in ['pull', 'back', 'row']):
+        return 'Спина'
+    elif any(term in code_lower for term in ['squat', 'leg', 'quad']):
+        return 'Ноги'
+    elif any(term in code_lower for term in ['shoulder', 'press']):
+        return 'Плечи'
+    elif any(term in code_lower for term in ['arm', 'bicep', 'tricep']):
+        return 'Руки'
+    elif any(term in code_lower for term in ['core', 'abs', 'plank']):
+        return 'Корпус'
+    else:
+        return 'Общие'
+
+
+@dataclass(frozen=True)
+class ExerciseVideoMeta:
+    """Exercise metadata of a video code"""
+    code: str
+    exercise_type: str
+    name: str  # display name
+    muscle_group: str
+    exercise_id: Optional[str] = None  # CSVExercise with id == code
+    exercise_name: str = ''
+    description: str = ''
+
+
+class ExerciseMetadataIndex:
+    """Exercise videos and CSVExercise rows keyed by video code"""
+
+    def __init__(self, videos: List[R2Video], exercises: List[CSVExercise], version: int = 0):
+        self.version = version
+        self.videos = sorted(videos, key=lambda video: video.code)
+        self.exercises = sorted(exercises, key=lambda exercise: exercise.id)
+        self._exercises_by_id = {exercise.id: exercise for exercise in self.exercises}
+        self._name_by_number: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.by_code: Dict[str, ExerciseVideoMeta] = {
+            video.code: self._describe(video.code, exercise_type_from_code(video.code))
+            for video in self.videos
+        }
+
+    @classmethod
+    def build(cls, version: int = 0) -> 'ExerciseMetadataIndex':
+        index = cls(
+            list(R2Video.objects.filter(category='exercises').only('code', 'category', 'archetype')),
+            list(CSVExercise.objects.only('id', 'name_ru', 'description')),
+            version,
+        )
+        logger.info(f"🏋️ Exercise index built: {len(index.videos)} videos, {len(index.exercises)} exercises (v{version})")
+        return index
+
+    def __len__(self):
+        return len(self.by_code)
+
+    def get(self, code: str) -> Optional[ExerciseVideoMeta]:
+        return self.by_code.get(code)
+
+    def describe(self, code: str) -> ExerciseVideoMeta:
+        """Metadata of any video code (motivation and unknown codes are derived from the code)"""
+        return self.by_code.get(code) or self._describe(code, exercise_type_from_code(code))
+
+    def _name_for_number(self, number: str) -> Optional[str]:
+        with self._lock:
+            if number not in self._name_by_number:
+                needle = number.lower()
+                self._name_by_number[number] = next(
+                    (exercise.name_ru for exercise in self.exercises
+                     if needle in exercise.name_ru.lower() or needle in exercise.id.lower()),
+                    None,
+                )
+            return self._name_by_number[number]
+
+    def _describe(self, code: str, exercise_type: str) -> ExerciseVideoMeta:
+        number = exercise_number(code)
+        name = (self._name_for_number(number) if number else None) or clean_video_name(code)
+        exercise = self._exercises_by_id.get(code)
+        return ExerciseVideoMeta(
+            code=code,
+            exercise_type=exercise_type,
+            name=name,
+            muscle_group=muscle_group_from_code(code),
+            exercise_id=exercise.id if exercise else None,
+            exercise_name=exercise.name_ru if exercise else '',
+            description=exercise.description if exercise else '',
+        )
+
+
+_index = SharedVersionIndex('exercise index', VERSION_CACHE_KEY, ExerciseMetadataIndex.build,
+                            'EXERCISE_INDEX_CHECK_INTERVAL')
+
+
+def get_exercise_index() -> ExerciseMetadataIndex:
+    """Index built once per process; rebuilt when another process reports a catalog change"""
+    return _index.get()
+
+
+def rebuild_exercise_index() -> ExerciseMetadataIndex:
+    """Bump the shared version and swap a fresh index in for this process"""
+    return _index.rebuild()
+
+
+def rebuild_exercise_index_after_commit():
+    """R2 exercise videos or CSVExercise changed - rebuild once the change is committed"""
+    _index.rebuild_after_commit()
@@ -0,0 +1,104 @@
+"""
+Process-wide index of R2 motivation videos keyed by (role, archetype, day)
+
+Codes follow '<role>_<archetype>_dayNN' (intro_bro_day01, warmup_motivation_sergeant_day12).
+lookup() mirrors the former query chain without ORDER BY RANDOM() scans:
+
+1. exact (role, archetype, day)
+2. any video of (role, archetype) - code starts with '<role>_<archetype>_'
+3. any motivation video whose code mentions the archetype
+
+Fallback choices use the caller's random.Random, so a seeded generator picks reproducibly.
+The index is rebuilt after R2Video changes are committed (apps.core.signals); other processes
+notice through a version counter in the shared cache.
+"""
+import logging
+import random
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from apps.core.utils.process_index import SharedVersionIndex
+from apps.workouts.models import R2Video
+
+logger = logging.getLogger(__name__)
+
+R2_ARCHETYPES = ('bro', 'sergeant', 'intellectual')
+VERSION_CACHE_KEY = 'motivation_video_index:version'
+
+_DAY_RE = re.compile(r'day(\d+)')
+
+
+def parse_motivation_code(code: str) -> Optional[Tuple[str, str, Optional[int]]]:
+    """'warmup_motivation_bro_day01' -> ('warmup_motivation', 'bro', 1); None if no known archetype"""
+    for archetype in R2_ARCHETYPES:
+        role, separator, rest = code.partition(f'_{archetype}_')
+        if separator and role:
+            match = _DAY_RE.match(rest)
+            return role, archetype, int(match.group(1)) if match else None
+    return None
+
+
+class MotivationVideoIndex:
+    """Motivation videos by (role, archetype, day) with role and archetype fallbacks"""
+
+    def __init__(self, videos: List[R2Video], version: int = 0):
+        self.version = version
+        self.videos = sorted(videos, key=lambda video: video.code)
+        self.exact: Dict[Tuple[str, str, int], R2Video] = {}
+        self.by_role: Dict[Tuple[str, str], List[R2Video]] = defaultdict(list)
+        self._by_archetype: Dict[str, List[R2Video]] = {}
+
+        for video in self.videos:
+            parsed = parse_motivation_code(video.code)
+            if parsed is None:
+                continue
+            role, archetype, day = parsed
+            if day is not None:
+                self.exact.setdefault((role, archetype, day), video)
+            self.by_role[(role, archetype)].append(video)
+
+    @classmethod
+    def build(cls, version: int = 0) -> 'MotivationVideoIndex':
+        videos = list(R2Video.objects.filter(category='motivation').only('code', 'category', 'archetype'))
+        index = cls(videos, version)
+        logger.info(f"🎬 Motivation index built: {len(index.videos)} videos, {len(index.exact)} day slots (v{version})")
+        return index
+
+    def __len__(self):
+        return len(self.videos)
+
+    def for_archetype(self, archetype: str) -> List[R2Video]:
+        if archetype not in self._by_archetype:
+            needle = archetype.lower()
+            self._by_archetype[archetype] = [video for video in self.videos if needle in video.code.lower()]
+        return self._by_archetype[archetype]
+
+    def lookup(self, role: str, archetype: str, day_number: int, rng: Optional[random.Random] = None) -> Optional[R2Video]:
+        video = self.exact.get((role, archetype, day_number))
+        if video:
+            return video
+
+        candidates = self.by_role.get((role, archetype)) or self.for_archetype(archetype)
+        if not candidates:
+            return None
+        return (rng or random).choice(candidates)
+
+
+_index = SharedVersionIndex('motivation video index', VERSION_CACHE_KEY, MotivationVideoIndex.build,
+                            'MOTIVATION_INDEX_CHECK_INTERVAL')
+
+
+def get_motivation_index() -> MotivationVideoIndex:
+    """Index built once per process; rebuilt when another process reports a catalog change"""
+    return _index.get()
+
+
+def rebuild_motivation_index() -> MotivationVideoIndex:
+    """Bump the shared version and swap a fresh index in for this process"""
+    return _index.rebuild()
+
+
+def rebuild_motivation_index_after_commit():
+    """R2 catalog changed - rebuild once the change is committed"""
+    _index.rebuild_after_commit()
@@ -2,15 +2,63 @@
 Service for materializing confirmed workout plans into daily workouts
 """
 import logging
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any
 
 from django.db import transaction
 from django.utils import timezone
 
 from apps.workouts.models import DailyWorkout, WorkoutPlan
+from apps.users.services import invalidate_today_snapshot
+from apps.workouts.services.used_exercises import invalidate_used_exercises
 
 logger = logging.getLogger(__name__)
 
+# Fields an upsert overwrites; completion and feedback of an existing day are kept
+MATERIALIZED_FIELDS = ['name', 'exercises', 'is_rest_day', 'confidence_task']
+
+
+def bulk_save_daily_workouts(plan: WorkoutPlan, workouts: Iterable[DailyWorkout], upsert: bool = False) -> List[int]:
+    """
+    Write in-memory DailyWorkouts of a plan with a single bulk INSERT
+
+    Args:
+        plan: WorkoutPlan the days belong to
+        workouts: unsaved DailyWorkout instances (primary keys are set on them in place)
+        upsert: overwrite days that already exist for (plan, week_number, day_number),
+            e.g. days materialized from a streamed response
+
+    Returns:
+        Primary keys of the saved days, in (week_number, day_number) order
+    """
+    # A repeated (week, day) would violate unique_together - the last one wins, as with update_or_create
+    by_day = {}
+    for workout in workouts:
+        workout.plan = plan
+        key = (workout.week_number, workout.day_number)
+        if key in by_day:
+            logger.warning(f"Duplicate DailyWorkout week {key[0]} day {key[1]} for plan {plan.id} - keeping the last one")
+        by_day[key] = workout
+    unique_workouts = [by_day[key] for key in sorted(by_day)]
+    if not unique_workouts:
+        return []
+
+    with transaction.atomic():
+        if upsert:
+            DailyWorkout.objects.bulk_create(
+                unique_workouts,
+                update_conflicts=True,
+                unique_fields=['plan', 'week_number', 'day_number'],
+                update_fields=MATERIALIZED_FIELDS,
+            )
+        else:
+            DailyWorkout.objects.bulk_create(unique_workouts)
+        # Today's workout may have changed (bulk_create sends no post_save)
+        user_id = plan.user_id
+        transaction.on_commit(lambda: invalidate_today_snapshot([user_id]))
+
+    logger.info(f"💾 Saved {len(unique_workouts)} daily workouts for plan {plan.id} in one batch")
+    return [workout.pk for workout in unique_workouts]
+
 
 def materialize_daily_workouts(plan: WorkoutPlan) -> List[DailyWorkout]:
     """
@@ -39,59 +87,56 @@ def materialize_daily_workouts(plan: WorkoutPlan) -> List[DailyWorkout]:
             logger.error(f"No weeks data found in plan {plan.id}")
             return []
         
-        created_workouts = []
+        workouts = []
+        
+        # Track overall day number
+        overall_day = 0
+        
+        for week_idx, week in enumerate(weeks_data, start=1):
+            days_data = week.get('days', [])
+            
+            for day_idx, day in enumerate(days_data, start=1):
+                overall_day += 1
+                
+                # Extract exercise data
+                exercise_slugs = day.get('exercise_slugs', [])
+                is_rest_day = day.get('is_rest_day', False)
+                confidence_task = day.get('confidence_task', '')
+                
+                # Build exercises list with structure expected by frontend
+                exercises_list = []
+                if not is_rest_day and exercise_slugs:
+                    for slug in exercise_slugs:
+                        exercises_list.append({
+                            'exercise_id': slug,
+                            'sets': 3,  # Default sets
+                            'reps': '8-12',  # Default reps
+                            'rest': 60,  # Default rest in seconds
+                        })
+                
+                # Determine workout name
+                if is_rest_day:
+                    workout_name = 'Rest Day'
+                else:
+                    workout_name = f'Week {week_idx} Day {day_idx}'
+                
+                workouts.append(DailyWorkout(
+                    plan=plan,
+                    day_number=overall_day,
+                    week_number=week_idx,
+                    name=workout_name,
+                    exercises=exercises_list,
+                    is_rest_day=is_rest_day,
+                    confidence_task=confidence_task
+                ))
         
         with transaction.atomic():
             # Clear any existing daily workouts for this plan
-            DailyWorkout.objects.filter(plan=plan).delete()
+            deleted, _ = DailyWorkout.objects.filter(plan=plan).delete()
+            if deleted:
+                invalidate_used_exercises([plan.user_id])
             
-            # Track overall day number
-            overall_day = 0
-            
-            for week_idx, week in enumerate(weeks_data, start=1):
-                days_data = week.get('days', [])
-                
-                for day_idx, day in enumerate(days_data, start=1):
-                    overall_day += 1
-                    
-                    # Extract exercise data
-                    exercise_slugs = day.get('exercise_slugs', [])
-                    is_rest_day = day.get('is_rest_day', False)
-                    confidence_task = day.get('confidence_task', '')
-                    
-                    # Build exercises list with structure expected by frontend
-                    exercises_list = []
-                    if not is_rest_day and exercise_slugs:
-                        for slug in exercise_slugs:
-                            exercises_list.append({
-                                'exercise_id': slug,
-                                'sets': 3,  # Default sets
-                                'reps': '8-12',  # Default reps
-                                'rest': 60,  # Default rest in seconds
-                            })
-                    
-                    # Determine workout name
-                    if is_rest_day:
-                        workout_name = 'Rest Day'
-                    else:
-                        workout_name = f'Week {week_idx} Day {day_idx}'
-                    
-                    # Create the daily workout
-                    daily_workout = DailyWorkout.objects.create(
-                        plan=plan,
-                        day_number=overall_day,
-                        week_number=week_idx,
-                        name=workout_name,
-                        exercises=exercises_list,
-                        is_rest_day=is_rest_day,
-                        confidence_task=confidence_task
-                    )
-                    
-                    created_workouts.append(daily_workout)
-                    logger.info(
-                        f"Created DailyWorkout day {overall_day} "
-                        f"(Week {week_idx} Day {day_idx}) for plan {plan.id}"
-                    )
+            bulk_save_daily_workouts(plan, workouts)
             
             # Update plan status to ACTIVE and set started_at
             plan.status = 'ACTIVE'
@@ -99,11 +144,11 @@ def materialize_daily_workouts(plan: WorkoutPlan) -> List[DailyWorkout]:
             plan.save(update_fields=['status', 'started_at'])
             
             logger.info(
-                f"Successfully materialized {len(created_workouts)} daily workouts "
+                f"Successfully materialized {len(workouts)} daily workouts "
                 f"for plan {plan.id}"
             )
             
-        return created_workouts
+        return workouts
         
     except Exception as e:
         logger.error(f"Error materializing daily workouts for plan {plan.id}: {e}")
@@ -1,11 +1,23 @@
 """
 Playlist Generator V2 - R2-driven video playlist generation
 Generates 16-video playlists for 21-day workout program
+
+Exercise videos are picked from the process-wide PlaylistVideoPool, excluding the user's
+used videos with a cached bitset (used_exercises), motivation videos from the process-wide
+MotivationVideoIndex, and items are bulk-inserted
+(PLAYLIST_IN_MEMORY_POOL=False restores per-selection queries and per-item INSERTs).
 """
 import random
 from typing import List, Dict, Optional
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from apps.workouts.models import R2Video, DailyWorkout, DailyPlaylistItem
+from apps.workouts.services.day_playlists import invalidate_day_playlists
+from apps.workouts.services.motivation_index import get_motivation_index
+from apps.workouts.services.used_exercises import (
+    get_used_exercise_bits, invalidate_used_exercises, mark_exercises_used
+)
+from apps.workouts.services.video_pool import PlaylistVideoPool, get_video_pool
 
 
 class PlaylistGeneratorV2:
@@ -27,19 +39,28 @@ class PlaylistGeneratorV2:
         (16, 'closing', 'motivation', 1),          # Напутствие
     ]
     
-    def __init__(self, user, archetype: str):
+    def __init__(self, user, archetype: str, in_memory: Optional[bool] = None, seed=None):
         """
         Initialize generator for specific user and archetype
         
         Args:
-            user: User object
+            user: User object (None when building shared playlist templates)
             archetype: 'mentor', 'professional', or 'peer'
+            in_memory: Select videos from a PlaylistVideoPool loaded once and bulk-insert items
+                (default: settings.PLAYLIST_IN_MEMORY_POOL); False = query per selection
+            seed: Seed for random video choices (default: user id, reproducible per user)
         """
         self.user = user
         self.archetype = self._normalize_archetype(archetype)
-        self.used_exercises = self._get_used_exercises()
+        self.in_memory = getattr(settings, 'PLAYLIST_IN_MEMORY_POOL', True) if in_memory is None else in_memory
+        # In-memory mode tracks used videos as bits over pool ordinals (see used_bits)
+        self.used_exercises = set() if self.in_memory else self._get_used_exercises()
+        self._pool = None
+        self._used_bits = None
+        self.rng = random.Random(f"{getattr(user, 'pk', None)}:{self.archetype}" if seed is None else seed)
         
-    def _normalize_archetype(self, archetype: str) -> str:
+    @staticmethod
+    def _normalize_archetype(archetype: str) -> str:
         """Convert NEW archetype names to OLD R2 file names"""
         # R2 files use OLD names: bro, sergeant, intellectual
         # Convert NEW names to match R2 files
@@ -57,6 +78,9 @@ class PlaylistGeneratorV2:
     
     def _get_used_exercises(self) -> set:
         """Get list of exercises already used by this user"""
+        if self.user is None:
+            return set()
+        
         # Получаем все использованные упражнения из предыдущих плейлистов
         used = DailyPlaylistItem.objects.filter(
             day__plan__user=self.user,
@@ -64,6 +88,33 @@ class PlaylistGeneratorV2:
         ).values_list('video__code', flat=True)
         return set(used)
     
+    @property
+    def pool(self) -> PlaylistVideoPool:
+        if self._pool is None:
+            self._pool = get_video_pool()
+        return self._pool
+    
+    @property
+    def used_bits(self) -> int:
+        """Exercise videos used by this user, as bits over pool ordinals (cached per user)"""
+        if self._used_bits is None:
+            self._used_bits = get_used_exercise_bits(self.user, self.pool)
+        return self._used_bits
+    
+    def _unique_exercises(self) -> int:
+        return self.used_bits.bit_count() if self.in_memory else len(self.used_exercises)
+    
+    def _record_used(self, items: List[DailyPlaylistItem], replaced: bool = False):
+        """Keep the user's cached used set in step with written items"""
+        if self.user is None:
+            return
+        if replaced or not self.in_memory:
+            invalidate_used_exercises([self.user.pk])
+            return
+        mark_exercises_used(self.user, self.pool, self.pool.bits_for(
+            item.video.code for item in items if item.role != 'motivation'
+        ))
+    
     def generate_playlist_for_day(self, day_number: int, workout: DailyWorkout) -> List[DailyPlaylistItem]:
         """
         Generate 16-video playlist for specific day
@@ -75,6 +126,18 @@ class PlaylistGeneratorV2:
         Returns:
             List of created DailyPlaylistItem objects
         """
+        playlist_items = self._build_playlist_items(day_number, workout)
+        if self.in_memory:
+            DailyPlaylistItem.objects.bulk_create(playlist_items)
+        else:
+            for item in playlist_items:
+                item.save()
+        invalidate_day_playlists([workout.id])
+        self._record_used(playlist_items)
+        return playlist_items
+    
+    def _build_playlist_items(self, day_number: int, workout: DailyWorkout) -> List[DailyPlaylistItem]:
+        """Unsaved 16-video playlist items for a day"""
         playlist_items = []
         position = 0
         
@@ -163,6 +226,10 @@ class PlaylistGeneratorV2:
         Returns:
             List of R2Video objects
         """
+        if self.in_memory:
+            videos, self._used_bits = self.pool.sample_exercises(exercise_type, count, self.used_bits, self.rng)
+            return videos
+        
         # Получаем все доступные видео этого типа
         available = R2Video.objects.filter(
             category='exercises',
@@ -198,6 +265,9 @@ class PlaylistGeneratorV2:
         Returns:
             R2Video object or None
         """
+        if self.in_memory:
+            return get_motivation_index().lookup(video_type, self.archetype, day_number, self.rng)
+        
         # R2 motivation videos have patterns like: intro_bro_day01, warmup_motivation_bro_day01
         if video_type == 'warmup_motivation' or video_type == 'main_motivation':
             pattern = f"{video_type}_{self.archetype}_day{day_number:02d}"
@@ -234,7 +304,7 @@ class PlaylistGeneratorV2:
     def _create_playlist_item(self, workout: DailyWorkout, order: int, 
                              video: R2Video, role: str) -> DailyPlaylistItem:
         """
-        Create and save playlist item
+        Build playlist item (saved by the caller)
         
         Args:
             workout: DailyWorkout to attach to
@@ -243,9 +313,9 @@ class PlaylistGeneratorV2:
             role: Type of video for role field
             
         Returns:
-            Created DailyPlaylistItem
+            Unsaved DailyPlaylistItem
         """
-        return DailyPlaylistItem.objects.create(
+        return DailyPlaylistItem(
             day=workout,
             order=order,
             video=video,  # ForeignKey to R2Video
@@ -258,12 +328,14 @@ class PlaylistGeneratorV2:
             }
         )
     
-    def generate_full_program(self, plan) -> Dict:
+    def generate_full_program(self, plan, workouts: Optional[List[DailyWorkout]] = None) -> Dict:
         """
         Generate complete 21-day program with playlists
         
         Args:
             plan: WorkoutPlan object
+            workouts: Already saved DailyWorkouts of the plan (e.g. from bulk materialization);
+                days found here are not looked up again
             
         Returns:
             Dictionary with statistics
@@ -271,30 +343,50 @@ class PlaylistGeneratorV2:
         stats = {
             'days_created': 0,
             'videos_total': 0,
-            'unique_exercises': len(self.used_exercises),
+            'unique_exercises': self._unique_exercises(),
             'errors': []
         }
         
+        known_workouts = {
+            (workout.week_number, workout.day_number): workout
+            for workout in workouts or [] if workout.pk is not None
+        }
+        if self.in_memory and len(known_workouts) < 21:
+            # Остальные дни плана одним запросом
+            for workout in DailyWorkout.objects.filter(plan=plan, day_number__lte=21):
+                known_workouts.setdefault((workout.week_number, workout.day_number), workout)
+        
+        pending_days, pending_items = [], []
+        
         # Создаем плейлисты для каждого дня
         for day in range(1, 22):
             try:
-                # Получаем или создаем DailyWorkout
-                workout, created = DailyWorkout.objects.get_or_create(
-                    plan=plan,
-                    day_number=day,
-                    week_number=(day - 1) // 7 + 1,
-                    defaults={
-                        'name': f'День {day}',
-                        'exercises': [],
-                        'is_rest_day': False
-                    }
-                )
+                week_number = (day - 1) // 7 + 1
+                workout = known_workouts.get((week_number, day))
+                if workout is None:
+                    # Получаем или создаем DailyWorkout
+                    workout, created = DailyWorkout.objects.get_or_create(
+                        plan=plan,
+                        day_number=day,
+                        week_number=week_number,
+                        defaults={
+                            'name': f'День {day}',
+                            'exercises': [],
+                            'is_rest_day': False
+                        }
+                    )
                 
-                # Удаляем старые плейлисты если есть
-                DailyPlaylistItem.objects.filter(day=workout).delete()
-                
-                # Генерируем новый плейлист
-                playlist = self.generate_playlist_for_day(day, workout)
+                if self.in_memory:
+                    # Пишем все дни одним bulk_create ниже
+                    playlist = self._build_playlist_items(day, workout)
+                    pending_days.append(workout)
+                    pending_items.extend(playlist)
+                else:
+                    # Удаляем старые плейлисты если есть
+                    DailyPlaylistItem.objects.filter(day=workout).delete()
+                    
+                    # Генерируем новый плейлист
+                    playlist = self.generate_playlist_for_day(day, workout)
                 
                 stats['days_created'] += 1
                 stats['videos_total'] += len(playlist)
@@ -302,5 +394,12 @@ class PlaylistGeneratorV2:
             except Exception as e:
                 stats['errors'].append(f"Day {day}: {str(e)}")
         
-        stats['unique_exercises'] = len(self.used_exercises)
+        if pending_days:
+            with transaction.atomic():
+                replaced, _ = DailyPlaylistItem.objects.filter(day__in=pending_days).delete()
+                DailyPlaylistItem.objects.bulk_create(pending_items)
+            invalidate_day_playlists([workout.id for workout in pending_days])
+            self._record_used(pending_items, replaced=bool(replaced))
+        
+        stats['unique_exercises'] = self._unique_exercises()
         return stats
\ No newline at end of file
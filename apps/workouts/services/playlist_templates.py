@@ -0,0 +1,164 @@
+"""
+Shared canonical playlist programs (PLAYLIST_SHARED_TEMPLATES)
+
+Playlists depend only on archetype, day number and random choice, so instead of ~336
+DailyPlaylistItem rows per plan a pool of PLAYLIST_TEMPLATE_VARIANTS 21-day programs per
+R2 archetype is built once (PlaylistTemplate / PlaylistTemplateItem). A plan stores a
+template id plus a seed:
+
+- the template is picked by seed, so plans spread evenly over the pool
+- the seed shuffles exercise clips within each block of a day (motivation slots stay put),
+  so users on the same template still see different orders
+
+Template days are cached as shared payloads (playlist_template:<id>:<day>), one entry per
+template day for all users. Templates are rebuilt for a changed R2 catalog with
+build_playlist_templates (management command of the same name); plans keep the template
+they were assigned.
+"""
+import hashlib
+import logging
+import random
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from apps.workouts.models import DailyWorkout, PlaylistTemplate, PlaylistTemplateItem, R2Video
+from apps.workouts.services.motivation_index import R2_ARCHETYPES
+from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DAYS = 21
+TEMPLATE_PAYLOAD_CACHE_TTL = 24 * 3600  # template items never change once built
+
+
+def catalog_digest() -> str:
+    """Digest of the exercise and motivation videos templates are built from"""
+    codes = R2Video.objects.filter(category__in=['exercises', 'motivation']).order_by('code').values_list('code', flat=True)
+    return hashlib.sha256('\n'.join(codes).encode('utf-8')).hexdigest()[:16]
+
+
+def _build_template(archetype: str, variant: int, digest: str) -> PlaylistTemplate:
+    generator = PlaylistGeneratorV2(None, archetype, in_memory=True, seed=f"template:{archetype}:{variant}")
+
+    with transaction.atomic():
+        template = PlaylistTemplate.objects.create(archetype=archetype, variant=variant, catalog_digest=digest)
+        PlaylistTemplateItem.objects.bulk_create([
+            PlaylistTemplateItem(
+                template=template,
+                day_number=day_number,
+                order=item.order,
+                role=item.role,
+                video=item.video,
+                duration_seconds=item.duration_seconds,
+                overlay=item.overlay,
+            )
+            for day_number in range(1, TEMPLATE_DAYS + 1)
+            for item in generator._build_playlist_items(day_number, None)
+        ])
+    return template
+
+
+def build_playlist_templates(archetypes: Iterable[str] = R2_ARCHETYPES, variants: Optional[int] = None) -> List[PlaylistTemplate]:
+    """Build missing template variants for the current catalog; templates of older catalogs are deactivated"""
+    variants = variants or getattr(settings, 'PLAYLIST_TEMPLATE_VARIANTS', 8)
+    digest = catalog_digest()
+    built = []
+
+    for archetype in archetypes:
+        existing = set(PlaylistTemplate.objects.filter(archetype=archetype, catalog_digest=digest)
+                       .values_list('variant', flat=True))
+        new = [_build_template(archetype, variant, digest) for variant in range(variants) if variant not in existing]
+
+        PlaylistTemplate.objects.filter(archetype=archetype, is_active=True).exclude(catalog_digest=digest).update(is_active=False)
+        if new:
+            logger.info(f"🧩 Built {len(new)} playlist templates for {archetype} (catalog {digest})")
+        built.extend(new)
+
+    return built
+
+
+def assign_playlist_template(plan, archetype: str) -> Optional[PlaylistTemplate]:
+    """Point the plan at a shared template of its archetype (building the pool on first use)"""
+    r2_archetype = PlaylistGeneratorV2._normalize_archetype(archetype)
+    templates = list(PlaylistTemplate.objects.filter(archetype=r2_archetype, is_active=True).order_by('variant'))
+    if not templates:
+        try:
+            build_playlist_templates([r2_archetype])
+        except IntegrityError:
+            logger.info(f"Playlist templates for {r2_archetype} were built concurrently - using them")
+        templates = list(PlaylistTemplate.objects.filter(archetype=r2_archetype, is_active=True).order_by('variant'))
+    if not templates:
+        return None
+
+    seed = zlib.crc32(f"{plan.user_id}:{plan.id}".encode('utf-8'))
+    plan.playlist_template = templates[seed % len(templates)]
+    plan.playlist_seed = seed
+    plan.save(update_fields=['playlist_template', 'playlist_seed'])
+    logger.info(f"Plan {plan.id} uses shared playlist template {plan.playlist_template_id}")
+    return plan.playlist_template
+
+
+def program_day(workout: DailyWorkout) -> int:
+    """Template day (1-21) of a workout; weeks-structure plans number days 1-7 within each week"""
+    day = workout.day_number
+    if day <= 7 and workout.week_number > 1:
+        day = (workout.week_number - 1) * 7 + day
+    return (day - 1) % TEMPLATE_DAYS + 1
+
+
+def personalize(entries: List, seed: int, day_number: int, role: Callable = lambda entry: entry['role']) -> List:
+    """Seeded shuffle of exercise clips within each block of consecutive same-role entries"""
+    rng = random.Random(f"{seed}:{day_number}")
+    result = list(entries)
+    start = 0
+    while start < len(result):
+        end = start
+        while end < len(result) and role(result[end]) == role(result[start]):
+            end += 1
+        if role(result[start]) != 'motivation' and end - start > 1:
+            block = result[start:end]
+            rng.shuffle(block)
+            result[start:end] = block
+        start = end
+    return result
+
+
+def _template_items(template_id: int, day_number: int) -> List[PlaylistTemplateItem]:
+    return list(
+        PlaylistTemplateItem.objects.filter(template_id=template_id, day_number=day_number)
+        .select_related('video').order_by('order')
+    )
+
+
+def template_day_payload(template_id: int, day_number: int) -> List[Dict]:
+    """Shared playlist payload of a template day (same form as day_playlists.playlist_payload)"""
+    from apps.workouts.services.day_playlists import playlist_payload
+
+    cache_key = f'playlist_template:{template_id}:{day_number}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = playlist_payload(_template_items(template_id, day_number))
+        cache.set(cache_key, payload, TEMPLATE_PAYLOAD_CACHE_TTL)
+    return payload
+
+
+def template_playlist(workout: DailyWorkout) -> List[Dict]:
+    """Personalized playlist payload of a workout on a template plan"""
+    plan = workout.plan
+    day_number = program_day(workout)
+    payload = template_day_payload(plan.playlist_template_id, day_number)
+    shuffled = personalize(payload, plan.playlist_seed or 0, day_number)
+    # Slots keep their positions; only the clips in them move
+    return [{**entry, 'order': slot['order']} for entry, slot in zip(shuffled, payload)]
+
+
+def template_playlist_items(workout: DailyWorkout) -> List[PlaylistTemplateItem]:
+    """Template items of a workout in personalized order (for templates iterating model objects)"""
+    plan = workout.plan
+    day_number = program_day(workout)
+    return personalize(_template_items(plan.playlist_template_id, day_number), plan.playlist_seed or 0,
+                       day_number, role=lambda item: item.role)
@@ -0,0 +1,63 @@
+"""
+Per-user used exercise videos as a cached bitset
+
+PlaylistGeneratorV2 avoids repeating exercise videos a user has already had. Instead of
+joining daily_playlist_items -> daily_workouts -> workout_plans on every instantiation,
+the used set is kept in the cache as an int bitset over PlaylistVideoPool ordinals
+(a few dozen bytes per user), tagged with the pool digest it was built against.
+
+Writers OR newly used videos in (mark_exercises_used); a missing or outdated entry is
+rebuilt from the database on the next read. Concurrent writers may drop each other's
+bits - that only weakens deduplication until the entry is rebuilt.
+"""
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.workouts.models import DailyPlaylistItem
+from apps.workouts.services.video_pool import PlaylistVideoPool
+
+EXERCISE_ROLES = ['warmup', 'main', 'endurance', 'cooldown']
+
+
+def _cache_key(user_id) -> str:
+    return f'used_exercises:{user_id}'
+
+
+def _ttl() -> int:
+    return getattr(settings, 'PLAYLIST_USED_EXERCISES_CACHE_TTL', 7 * 24 * 3600)
+
+
+def get_used_exercise_bits(user, pool: PlaylistVideoPool) -> int:
+    """Exercise videos already in the user's playlists, as bits over pool ordinals"""
+    if user is None:
+        return 0
+
+    entry = cache.get(_cache_key(user.pk))
+    if entry is not None and entry[0] == pool.digest:
+        return entry[1]
+
+    codes = DailyPlaylistItem.objects.filter(
+        day__plan__user=user,
+        role__in=EXERCISE_ROLES
+    ).values_list('video__code', flat=True).distinct()
+    bits = pool.bits_for(codes)
+    cache.set(_cache_key(user.pk), (pool.digest, bits), _ttl())
+    return bits
+
+
+def mark_exercises_used(user, pool: PlaylistVideoPool, bits: int):
+    """Add newly written exercise videos to the cached set (no-op if the entry must be rebuilt anyway)"""
+    if user is None or not bits:
+        return
+
+    entry = cache.get(_cache_key(user.pk))
+    if entry is None or entry[0] != pool.digest:
+        return
+    cache.set(_cache_key(user.pk), (pool.digest, entry[1] | bits), _ttl())
+
+
+def invalidate_used_exercises(user_ids: Iterable[int]):
+    """Playlist items were removed - rebuild from the database on next read"""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
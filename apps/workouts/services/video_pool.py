@@ -0,0 +1,85 @@
+"""
+In-memory R2 exercise video pool for PlaylistGeneratorV2
+
+Exercise videos are loaded once per process, sorted by code and indexed by type, so a
+21-day program is assembled without per-selection R2Video queries (order_by('?') scans,
+count(), code__icontains). A type matches codes containing it (case-insensitive).
+
+A video's position in the sorted catalog is its ordinal: "used" sets are int bitsets over
+ordinals (see used_exercises), so excluding used videos is a mask operation. The pool is
+built from the videos of the process-wide ExerciseMetadataIndex and follows its version.
+Motivation videos come from the process-wide MotivationVideoIndex.
+"""
+import hashlib
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from apps.workouts.models import R2Video
+from apps.workouts.services.exercise_index import get_exercise_index
+
+
+class PlaylistVideoPool:
+    """Exercise videos by ordinal, with per-type bit masks"""
+
+    def __init__(self, videos: List[R2Video], version: int = 0):
+        self.version = version
+        self.exercises = sorted(videos, key=lambda video: video.code)
+        self.ordinals: Dict[str, int] = {video.code: ordinal for ordinal, video in enumerate(self.exercises)}
+        # Bitsets are only meaningful for the catalog they were built against
+        self.digest = hashlib.sha256('\n'.join(self.ordinals).encode('utf-8')).hexdigest()[:12]
+        self._types: Dict[str, Tuple[int, List[Tuple[int, R2Video]]]] = {}
+
+    def __len__(self):
+        return len(self.exercises)
+
+    def bits_for(self, codes: Iterable[str]) -> int:
+        bits = 0
+        for code in codes:
+            ordinal = self.ordinals.get(code)
+            if ordinal is not None:
+                bits |= 1 << ordinal
+        return bits
+
+    def type_entries(self, exercise_type: str) -> Tuple[int, List[Tuple[int, R2Video]]]:
+        """(mask, [(ordinal, video)]) of exercise videos whose code contains the type"""
+        if exercise_type not in self._types:
+            needle = exercise_type.lower()
+            entries = [(ordinal, video) for ordinal, video in enumerate(self.exercises) if needle in video.code.lower()]
+            mask = 0
+            for ordinal, _ in entries:
+                mask |= 1 << ordinal
+            self._types[exercise_type] = (mask, entries)
+        return self._types[exercise_type]
+
+    def sample_exercises(self, exercise_type: str, count: int, used_bits: int,
+                         rng: Optional[random.Random] = None) -> Tuple[List[R2Video], int]:
+        """Random videos without replacement, preferring unused ones; returns (videos, updated used bits)"""
+        mask, entries = self.type_entries(exercise_type)
+        free = mask & ~used_bits
+        # Если недостаточно неиспользованных, берем любые
+        if free.bit_count() >= count:
+            entries = [(ordinal, video) for ordinal, video in entries if free >> ordinal & 1]
+
+        picked = (rng or random).sample(entries, min(count, len(entries)))
+        for ordinal, _ in picked:
+            used_bits |= 1 << ordinal
+        return [video for _, video in picked], used_bits
+
+
+_pool: Optional[PlaylistVideoPool] = None
+_pool_index = None  # ExerciseMetadataIndex the pool was built from
+_pool_lock = threading.Lock()
+
+
+def get_video_pool() -> PlaylistVideoPool:
+    """Pool of the current exercise index; rebuilt whenever the index is"""
+    global _pool, _pool_index
+
+    index = get_exercise_index()
+    if _pool is None or _pool_index is not index:
+        with _pool_lock:
+            if _pool is None or _pool_index is not index:
+                _pool = PlaylistVideoPool(index.videos, index.version)
+                _pool_index = index
+    return _pool
@@ -0,0 +1,138 @@
+"""
+Render-ready payload of the daily workout page
+
+daily_workout_view used to look up a CSVExercise per playlist item plus up to two
+name_ru/id icontains queries for its display name (50+ queries for a 16-video day).
+WorkoutDayPayloadBuilder resolves the whole day from the exercise metadata index without
+queries and caches the video_playlist / exercise_details structures together with their JSON.
+
+The cache key carries a playlist version - a digest of the day's playlist payload - and
+the exercise index version, so regenerated or reordered items (the day playlist cache is
+dropped on every write) and exercise catalog changes lead to a new entry without explicit
+invalidation.
+"""
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.workouts.models import DailyWorkout
+from apps.workouts.services.day_playlists import get_day_playlist
+from apps.workouts.services.exercise_index import ExerciseMetadataIndex, get_exercise_index
+
+EXERCISE_ROLES = ['warmup', 'main', 'cooldown']
+
+
+def playlist_version(playlist: List[Dict]) -> str:
+    """Digest of the playlist entries the page is built from"""
+    raw = '|'.join(
+        f"{entry['id']}:{entry['order']}:{entry['role']}:{entry['video_code']}:{entry['duration_seconds']}"
+        for entry in playlist
+    )
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def payload_cache_key(workout_id: int, version: str, index_version: int) -> str:
+    return f'workout_day_payload:{workout_id}:{version}:{index_version}'
+
+
+def video_title(role: str, video_code: str, exercise_name: str) -> str:
+    """Generate human-readable title for video"""
+    if role == 'motivation':
+        if 'opening' in video_code or 'intro' in video_code:
+            return "Вступление"
+        elif 'closing' in video_code:
+            return "Заключение"
+        elif 'main' in video_code:
+            return "Мотивация"
+        else:
+            return "Мотивационное видео"
+    elif role == 'warmup':
+        return f"Разминка: {exercise_name}"
+    elif role == 'main':
+        return f"Упражнение: {exercise_name}"
+    elif role == 'cooldown':
+        return f"Заминка: {exercise_name}"
+    else:
+        return video_code.replace('_', ' ').title()
+
+
+# Typical sets / reps / rest per exercise role (None / 0 for motivation videos)
+ROLE_SETS = {'warmup': 1, 'main': 3, 'cooldown': 1}
+ROLE_REPS = {'warmup': 10, 'main': 12, 'cooldown': 8}
+ROLE_REST = {'warmup': 30, 'main': 90, 'cooldown': 30}
+
+
+class WorkoutDayPayloadBuilder:
+    """video_playlist / exercise_details of a workout day (no queries beyond the playlist itself)"""
+
+    EMPTY = {'video_playlist': [], 'video_playlist_json': '[]', 'exercise_details': {}, 'exercise_details_json': '{}'}
+
+    def __init__(self, workout: DailyWorkout, archetype: Optional[str] = None):
+        self.workout = workout
+        self.archetype = archetype
+
+    def build(self) -> Dict:
+        """Cached payload: video_playlist, exercise_details and their JSON"""
+        playlist = get_day_playlist(self.workout, self.archetype)
+        index = get_exercise_index()
+        cache_key = payload_cache_key(self.workout.id, playlist_version(playlist), index.version)
+
+        payload = cache.get(cache_key)
+        if payload is None:
+            payload = self.serialize(playlist, index)
+            if playlist:
+                cache.set(cache_key, payload, getattr(settings, 'PLAYLIST_PAYLOAD_CACHE_TTL', 6 * 3600))
+        return payload
+
+    def serialize(self, playlist: List[Dict], index: Optional[ExerciseMetadataIndex] = None) -> Dict:
+        index = index or get_exercise_index()
+        video_playlist = []
+        exercise_details = {}
+        for entry in playlist:
+            video_code = entry['video_code']
+            role = entry['role']
+            meta = index.describe(video_code)
+            name = meta.name
+            title = video_title(role, video_code, name)
+            duration = entry['duration_seconds'] or 30
+
+            video_playlist.append({
+                'url': entry['url'],
+                'title': title,
+                'exercise_name': name if role in EXERCISE_ROLES else title,
+                'exercise_slug': video_code,  # for linking to exercise_details
+                'type': role,  # for exercise_info_panel
+                'role': role,
+                'duration': duration,
+                'video_code': video_code,
+                'order': entry['order'],
+                # Exercise-specific data for exercises
+                'sets': ROLE_SETS.get(role),
+                'reps': ROLE_REPS.get(role),
+                'rest': ROLE_REST.get(role, 0),
+            })
+
+            # Exercise details for ALL videos (not just exercises), real data when available
+            exercise_details[video_code] = {
+                'id': video_code,
+                'name_ru': meta.exercise_name if meta.exercise_id else name,
+                'name_en': '',
+                'description': meta.description if meta.exercise_id else f'Видео {role}',
+                'muscle_group': meta.muscle_group,
+                'level': 'intermediate',
+                'exercise_type': 'strength' if role == 'main' else role,
+                'sets': ROLE_SETS.get(role),
+                'reps': ROLE_REPS.get(role),
+                'rest_seconds': ROLE_REST.get(role, 0),
+                'duration_seconds': duration,
+            }
+
+        return {
+            'video_playlist': video_playlist,
+            'video_playlist_json': json.dumps(video_playlist),
+            'exercise_details': exercise_details,
+            'exercise_details_json': json.dumps(exercise_details),
+        }
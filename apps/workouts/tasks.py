@@ -138,4 +138,18 @@ def enqueue_weekly_lesson():
             skipped_count += 1
             continue
     
-    return f"Weekly notifications: Created {created_count}, Skipped {skipped_count} (week {week_number})"
\ No newline at end of file
+    return f"Weekly notifications: Created {created_count}, Skipped {skipped_count} (week {week_number})"
+
+@shared_task
+def prefetch_day_playlists_task(plan_id, after_workout_id=None, archetype=None):
+    """Генерирует плейлисты следующих PLAYLIST_PREFETCH_DAYS дней плана (ленивый режим)"""
+    from .models import DailyWorkout, WorkoutPlan
+    from .services.day_playlists import prefetch_day_playlists
+
+    plan = WorkoutPlan.objects.select_related('user__profile').filter(id=plan_id).first()
+    if plan is None:
+        return {"generated": 0}
+
+    after = DailyWorkout.objects.filter(id=after_workout_id, plan=plan).first() if after_workout_id else None
+    generated = prefetch_day_playlists(plan, after=after, archetype=archetype)
+    return {"generated": generated}
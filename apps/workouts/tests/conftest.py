@@ -0,0 +1,61 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.workouts.models import DailyWorkout, R2Video, WorkoutPlan
+from apps.workouts.services.exercise_index import rebuild_exercise_index
+from apps.workouts.services.motivation_index import R2_ARCHETYPES, rebuild_motivation_index
+
+EXERCISE_TYPES = ('warmup', 'main', 'endurance', 'relaxation')
+MOTIVATION_TYPES = ('intro', 'warmup_motivation', 'main_motivation', 'closing')
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                   'LOCATION': 'workouts-tests'}}
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def catalog(db, locmem_cache):
+    """R2-like catalog: <type>_NNN exercises and <type>_<archetype>_dayNN motivation videos"""
+    R2Video.objects.bulk_create([
+        R2Video(code=f'{exercise_type}_{number:03d}', name=f'{exercise_type} {number}', category='exercises')
+        for exercise_type in EXERCISE_TYPES
+        for number in range(1, 31)
+    ] + [
+        R2Video(code=f'{video_type}_{archetype}_day{day:02d}', name=f'{video_type} {day}', category='motivation')
+        for video_type in MOTIVATION_TYPES
+        for archetype in R2_ARCHETYPES
+        for day in range(1, 22)
+    ])
+    # bulk_create sends no post_save
+    rebuild_motivation_index()
+    rebuild_exercise_index()
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(username='athlete', email='athlete@example.com', password='x')
+
+
+@pytest.fixture
+def make_plan(user):
+    def make(days=21, rest_days=(), **fields):
+        plan = WorkoutPlan.objects.create(user=user, name='План', duration_weeks=3, plan_data={}, **fields)
+        DailyWorkout.objects.bulk_create([
+            DailyWorkout(plan=plan, week_number=(day - 1) // 7 + 1, day_number=day, name=f'День {day}',
+                         exercises=[], is_rest_day=day in rest_days)
+            for day in range(1, days + 1)
+        ])
+        return plan
+
+    return make
+
+
+@pytest.fixture
+def plan(make_plan):
+    return make_plan()
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+
+from apps.workouts.models import DailyPlaylistItem
+from apps.workouts.services import day_playlists
+from apps.workouts.services.day_playlists import (
+    get_day_playlist,
+    payload_cache_key,
+    prefetch_day_playlists,
+    schedule_playlist_prefetch,
+)
+from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
+
+
+def test_first_open_generates_the_playlist(catalog, plan, settings):
+    settings.PLAYLIST_PREFETCH_DAYS = 0
+    workout = plan.daily_workouts.get(day_number=1)
+
+    payload = get_day_playlist(workout, 'peer')
+
+    assert len(payload) == 16
+    assert [entry['order'] for entry in payload] == list(range(16))
+    assert DailyPlaylistItem.objects.filter(day=workout).count() == 16
+    assert cache.get(payload_cache_key(workout.id)) == payload
+
+
+def test_cached_playlist_needs_no_queries(catalog, plan, settings, django_assert_num_queries):
+    settings.PLAYLIST_PREFETCH_DAYS = 0
+    workout = plan.daily_workouts.get(day_number=1)
+    payload = get_day_playlist(workout, 'peer')
+
+    with django_assert_num_queries(0):
+        assert get_day_playlist(workout, 'peer') == payload
+
+
+def test_prefetch_skips_rest_days(catalog, make_plan):
+    plan = make_plan(days=7, rest_days=(2, 3))
+    after = plan.daily_workouts.get(day_number=1)
+
+    assert prefetch_day_playlists(plan, after=after, days=2, archetype='peer') == 2
+
+    with_items = set(DailyPlaylistItem.objects.filter(day__plan=plan).values_list('day__day_number', flat=True))
+    assert with_items == {4, 5}
+    assert prefetch_day_playlists(plan, after=after, days=2, archetype='peer') == 0
+
+
+def test_prefetch_is_scheduled_once_per_day(catalog, plan, settings):
+    settings.PLAYLIST_PREFETCH_DAYS = 2
+    workout = plan.daily_workouts.get(day_number=1)
+
+    assert schedule_playlist_prefetch(plan, after=workout)
+    assert not schedule_playlist_prefetch(plan, after=workout)
+
+
+def test_concurrently_generated_playlist_is_used(catalog, plan, settings, monkeypatch):
+    settings.PLAYLIST_PREFETCH_DAYS = 0
+    workout = plan.daily_workouts.get(day_number=1)
+    load_items = day_playlists._load_items
+    raced = []
+
+    def load_then_lose_race(day):
+        items = load_items(day)
+        if not raced:
+            # Another request writes the playlist after this one found none
+            raced.extend(PlaylistGeneratorV2(plan.user, 'peer', seed='other').generate_playlist_for_day(1, day))
+        return items
+
+    monkeypatch.setattr(day_playlists, '_load_items', load_then_lose_race)
+    payload = get_day_playlist(workout, 'peer')
+
+    assert [entry['video_code'] for entry in payload] == [item.video.code for item in raced]
+    assert DailyPlaylistItem.objects.filter(day=workout).count() == 16
@@ -0,0 +1,96 @@
+import zlib
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from apps.workouts.models import DailyPlaylistItem, DailyWorkout, PlaylistTemplate
+from apps.workouts.services.day_playlists import get_day_playlist
+from apps.workouts.services.playlist_templates import (
+    assign_playlist_template,
+    personalize,
+    program_day,
+    template_day_payload,
+    template_playlist,
+)
+
+
+@pytest.mark.parametrize('week_number, day_number, expected', [
+    (1, 1, 1),
+    (1, 7, 7),
+    (2, 1, 8),   # weeks structure: days 1-7 within each week
+    (3, 7, 21),
+    (2, 9, 9),   # days structure: day numbers run on across weeks
+    (3, 21, 21),
+    (4, 1, 1),   # past the 21-day template: wraps around
+    (4, 22, 1),
+])
+def test_program_day(week_number, day_number, expected):
+    assert program_day(DailyWorkout(week_number=week_number, day_number=day_number)) == expected
+
+
+ENTRIES = [{'role': role, 'code': f'{role}{i}'} for i, role in enumerate(
+    ['motivation', 'warmup', 'warmup', 'motivation', 'main', 'main', 'main', 'main', 'main', 'motivation'])]
+
+
+def test_personalize_shuffles_within_blocks_only():
+    shuffled = personalize(ENTRIES, seed=42, day_number=3)
+
+    assert [entry['role'] for entry in shuffled] == [entry['role'] for entry in ENTRIES]
+    for position in (0, 3, 9):
+        assert shuffled[position] is ENTRIES[position]  # motivation slots stay put
+    assert sorted(e['code'] for e in shuffled[4:9]) == sorted(e['code'] for e in ENTRIES[4:9])
+    assert shuffled == personalize(ENTRIES, seed=42, day_number=3)
+    assert any(personalize(ENTRIES, seed=seed, day_number=3) != ENTRIES for seed in range(5))
+
+
+@pytest.fixture
+def templates(catalog, settings):
+    settings.PLAYLIST_TEMPLATE_VARIANTS = 3
+
+
+def test_template_variant_is_picked_by_plan_seed(templates, make_plan):
+    plans = [make_plan(days=7) for _ in range(4)]
+    for plan in plans:
+        template = assign_playlist_template(plan, 'peer')
+
+        seed = zlib.crc32(f'{plan.user_id}:{plan.id}'.encode('utf-8'))
+        variants = list(PlaylistTemplate.objects.filter(archetype='bro').order_by('variant'))
+        assert plan.playlist_seed == seed
+        assert template == variants[seed % len(variants)]
+        assert assign_playlist_template(plan, 'peer') == template  # stable on reassignment
+
+    assert PlaylistTemplate.objects.count() == 3  # pool built once
+
+
+def test_template_playlist_keeps_slots_in_place(templates, make_plan):
+    plan = make_plan(days=7)
+    assign_playlist_template(plan, 'peer')
+    workout = plan.daily_workouts.get(day_number=2)
+
+    playlist = template_playlist(workout)
+    payload = template_day_payload(plan.playlist_template_id, 2)
+
+    assert [entry['order'] for entry in playlist] == [slot['order'] for slot in payload]
+    assert [entry['role'] for entry in playlist] == [slot['role'] for slot in payload]
+    for entry, slot in zip(playlist, payload):
+        if slot['role'] == 'motivation':
+            assert entry == slot
+    assert sorted(e['video_code'] for e in playlist) == sorted(e['video_code'] for e in payload)
+    assert playlist == template_playlist(workout)
+
+
+def test_template_plans_write_no_playlist_items(templates, make_plan, settings):
+    settings.PLAYLIST_PREFETCH_DAYS = 0
+    plan = make_plan(days=7, status='ACTIVE')
+    assign_playlist_template(plan, 'peer')
+    regular = make_plan(days=2, status='ACTIVE')
+
+    assert get_day_playlist(plan.daily_workouts.get(day_number=1))
+    assert not DailyPlaylistItem.objects.filter(day__plan=plan).exists()
+
+    out = StringIO()
+    call_command('generate_missing_playlists', '--workers', '1', stdout=out)
+    assert 'Found 2 workouts without playlists in 1 plans' in out.getvalue()
+    assert not DailyPlaylistItem.objects.filter(day__plan=plan).exists()
+    assert DailyPlaylistItem.objects.filter(day__plan=regular).count() > 0
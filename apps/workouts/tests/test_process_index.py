@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from apps.core.utils.process_index import SharedVersionIndex
+from apps.workouts.models import R2Video
+
+
+@pytest.fixture
+def builds(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                   'LOCATION': 'process-index-tests'}}
+    settings.TEST_INDEX_CHECK_INTERVAL = 0
+    cache.clear()
+    yield []
+    cache.clear()
+
+
+def make_index(builds):
+    def build(version):
+        builds.append(version)
+        return SimpleNamespace(version=version)
+
+    return SharedVersionIndex('test index', 'test_index:version', build, 'TEST_INDEX_CHECK_INTERVAL')
+
+
+def test_built_once_per_version(builds):
+    index = make_index(builds)
+
+    assert index.get() is index.get()
+    assert builds == [0]
+
+
+def test_rebuild_reaches_other_processes(builds):
+    index, other_process = make_index(builds), make_index(builds)
+    other_process.get()
+
+    assert index.rebuild().version == 1
+    assert other_process.get().version == 1
+    assert builds == [0, 1, 1]
+
+
+def test_many_changes_in_one_transaction_rebuild_once(db, builds, django_capture_on_commit_callbacks):
+    index = make_index(builds)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for _ in range(3):
+            index.rebuild_after_commit()
+
+    assert builds == [1]
+
+
+def test_exercise_type_needs_no_index():
+    assert R2Video(code='endurance_012_technique_m01', category='exercises').exercise_type == 'endurance'
+    assert R2Video(code='intro_bro_day01', category='motivation').exercise_type == 'motivation'
@@ -0,0 +1,78 @@
+import random
+
+from django.core.cache import cache
+
+from apps.workouts.models import DailyPlaylistItem, R2Video
+from apps.workouts.services.playlist_generator_v2 import PlaylistGeneratorV2
+from apps.workouts.services.used_exercises import EXERCISE_ROLES, _cache_key, get_used_exercise_bits
+from apps.workouts.services.video_pool import PlaylistVideoPool, get_video_pool
+
+
+def used_codes(user):
+    return set(DailyPlaylistItem.objects.filter(day__plan__user=user, role__in=EXERCISE_ROLES)
+               .values_list('video__code', flat=True))
+
+
+def test_entry_from_another_catalog_is_rebuilt(catalog, plan):
+    pool = get_video_pool()
+    PlaylistGeneratorV2(plan.user, 'peer').generate_playlist_for_day(1, plan.daily_workouts.get(day_number=1))
+    cache.set(_cache_key(plan.user.pk), ('old-digest', 0b1111))
+
+    bits = get_used_exercise_bits(plan.user, pool)
+
+    assert bits == pool.bits_for(used_codes(plan.user))
+    assert cache.get(_cache_key(plan.user.pk)) == (pool.digest, bits)
+
+
+def test_new_playlist_is_or_ed_into_the_cached_set(catalog, plan):
+    pool = get_video_pool()
+    assert get_used_exercise_bits(plan.user, pool) == 0
+
+    for day in (1, 2):
+        PlaylistGeneratorV2(plan.user, 'peer').generate_playlist_for_day(day, plan.daily_workouts.get(day_number=day))
+
+    cached = cache.get(_cache_key(plan.user.pk))[1]
+    assert cached == pool.bits_for(used_codes(plan.user))
+    assert cached.bit_count() == 22  # 11 exercise videos per day, none repeated
+
+
+def test_replacing_playlists_invalidates_the_cached_set(catalog, plan):
+    generator = PlaylistGeneratorV2(plan.user, 'peer')
+    generator.generate_playlist_for_day(1, plan.daily_workouts.get(day_number=1))
+    assert cache.get(_cache_key(plan.user.pk)) is not None
+
+    PlaylistGeneratorV2(plan.user, 'peer').generate_full_program(plan)
+
+    assert cache.get(_cache_key(plan.user.pk)) is None
+
+
+def test_deleting_a_plan_invalidates_the_cached_set(catalog, plan):
+    get_used_exercise_bits(plan.user, get_video_pool())
+    plan.delete()
+
+    assert cache.get(_cache_key(plan.user.pk)) is None
+
+
+def make_pool(count):
+    return PlaylistVideoPool([R2Video(code=f'main_{number:03d}', name='x', category='exercises')
+                              for number in range(count)])
+
+
+def test_sampling_prefers_unused_videos():
+    pool = make_pool(3)
+    used = pool.bits_for(['main_000', 'main_001'])
+
+    videos, bits = pool.sample_exercises('main', 1, used, random.Random(1))
+
+    assert [video.code for video in videos] == ['main_002']
+    assert bits == 0b111
+
+
+def test_sampling_falls_back_to_used_videos_when_too_few_are_free():
+    pool = make_pool(3)
+    used = pool.bits_for(['main_000', 'main_001'])
+
+    videos, bits = pool.sample_exercises('main', 2, used, random.Random(1))
+
+    assert len({video.code for video in videos}) == 2
+    assert bits == 0b111
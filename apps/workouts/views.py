@@ -14,9 +14,9 @@ from rest_framework import generics, permissions
 from rest_framework.response import Response
 
 
-from django.db import models
 from .models import CSVExercise, DailyWorkout, WeeklyNotification
 from .serializers import WeeklyNotificationSerializer
+from apps.users.services import invalidate_today_snapshot
 # OLD SYSTEM REMOVED: VideoPlaylistBuilder replaced with PlaylistGeneratorV2
 # from .video_services import VideoPlaylistBuilder
 
@@ -24,7 +24,7 @@ from .serializers import WeeklyNotificationSerializer
 @login_required
 def daily_workout_view(request, workout_id):
     """Display today's workout with video playlist (NEW SYSTEM)"""
-    workout = get_object_or_404(DailyWorkout, id=workout_id, plan__user=request.user)
+    workout = get_object_or_404(DailyWorkout.objects.select_related('plan'), id=workout_id, plan__user=request.user)
     
     # Get user's archetype
     archetype = getattr(request.user.profile, 'archetype', 'mentor')
@@ -32,86 +32,17 @@ def daily_workout_view(request, workout_id):
         messages.error(request, 'Пожалуйста, выберите архетип тренера в настройках')
         return redirect('users:profile_settings')
     
-    # NEW SYSTEM: Use pre-generated playlist items from PlaylistGeneratorV2
-    playlist_items = workout.playlist_items.all().order_by('order')
-
-    logger.info(f"DEBUG: Workout {workout_id} has {playlist_items.count()} playlist items")
-
-    # Convert playlist items to format expected by template
-    video_playlist = []
-    exercise_details = {}
-
-    if not playlist_items:
-        # Fallback: Generate playlist if it doesn't exist
-        try:
-            from apps.workouts.services import PlaylistGeneratorV2
-            generator = PlaylistGeneratorV2(request.user, archetype)
-            playlist_items = generator.generate_playlist_for_day(workout.day_number, workout)
-        except Exception as e:
-            logger.error(f"Failed to generate playlist for workout {workout_id}: {e}")
-            playlist_items = []
-
-    # Convert DailyPlaylistItem objects to template format
-    for item in playlist_items:
-        try:
-            # Get R2Video object via ForeignKey
-            video = item.video
-            if not video:
-                continue  # Skip if video not found
-                
-            # Get R2 URL for video 
-            signed_url = video.r2_url
-            
-            # Create video entry in expected format
-            video_entry = {
-                'url': signed_url,
-                'title': _get_video_title(item),
-                'exercise_name': _get_exercise_name(video.code) if item.role in ['warmup', 'main', 'cooldown'] else _get_video_title(item),
-                'exercise_slug': video.code,  # Add exercise_slug for linking to exercise_details
-                'type': item.role,  # Add type for exercise_info_panel
-                'role': item.role,
-                'duration': item.duration_seconds or 30,
-                'video_code': video.code,  # Get code from video object
-                'order': item.order,
-                # Exercise-specific data for exercises
-                'sets': _get_sets_from_role(item.role),
-                'reps': _get_reps_from_role(item.role),
-                'rest': _get_rest_from_role(item.role),
-            }
-            
-            video_playlist.append(video_entry)
-            
-            # Add exercise details for ALL videos (not just exercises)
-            exercise_key = video.code
-
-            # Try to get real exercise data from CSVExercise
-            exercise_obj = None
-            try:
-                from apps.workouts.models import CSVExercise
-                exercise_obj = CSVExercise.objects.filter(id=video.code).first()
-            except Exception as e:
-                logger.debug(f"No CSVExercise found for {video.code}: {e}")
-
-            # Build exercise details with real data when available
-            exercise_details[exercise_key] = {
-                'id': exercise_key,
-                'name_ru': exercise_obj.name_ru if exercise_obj else _get_exercise_name(video.code),
-                'name_en': '',
-                'description': exercise_obj.description if exercise_obj else f'Видео {item.role}',
-                'muscle_group': _get_muscle_group_from_code(video.code),
-                'level': 'intermediate',
-                'exercise_type': 'strength' if item.role == 'main' else item.role,
-                'sets': _get_sets_from_role(item.role),
-                'reps': _get_reps_from_role(item.role),
-                'rest_seconds': _get_rest_from_role(item.role),
-                'duration_seconds': item.duration_seconds or 30,
-            }
-                
-        except Exception as e:
-            logger.error(f"Error processing playlist item {item.id}: {e}")
-            continue
+    # NEW SYSTEM: cached page payload, playlist generated on first open if the day has none yet
+    try:
+        from apps.workouts.services.workout_day_payload import WorkoutDayPayloadBuilder
+        payload = WorkoutDayPayloadBuilder(workout, archetype).build()
+    except Exception as e:
+        logger.error(f"Failed to build playlist for workout {workout_id}: {e}")
+        payload = WorkoutDayPayloadBuilder.EMPTY
 
-    logger.info(f"DEBUG: Workout {workout_id} generated {len(video_playlist)} videos in playlist")
+    video_playlist = payload['video_playlist']
+    exercise_details = payload['exercise_details']
+    logger.debug(f"Workout {workout_id} has {len(video_playlist)} videos in playlist")
 
     # Determine if this is really a rest day: only if marked as rest AND no playlist
     is_actual_rest_day = workout.is_rest_day and len(video_playlist) == 0
@@ -124,10 +55,10 @@ def daily_workout_view(request, workout_id):
     context = {
         'workout': workout,
         'video_playlist': video_playlist,
-        'video_playlist_json': json.dumps(video_playlist),
+        'video_playlist_json': payload['video_playlist_json'],
         'substitutions': {},  # TODO: Implement substitutions for new system
         'exercise_details': exercise_details,
-        'exercise_details_json': json.dumps(exercise_details),
+        'exercise_details_json': payload['exercise_details_json'],
         'is_completed': workout.completed_at is not None,
         'can_substitute': False,  # TODO: Implement substitutions for new system
         # Override is_rest_day flag if workout has playlist
@@ -162,6 +93,7 @@ def complete_workout_view(request, workout_id):
         profile = request.user.profile
         profile.total_workouts_completed = (profile.total_workouts_completed or 0) + 1
         profile.save()
+        invalidate_today_snapshot([request.user.id])
 
         return JsonResponse({
             'success': True,
@@ -481,7 +413,14 @@ def workout_day(request, day_id):
     day = get_object_or_404(DailyWorkout, pk=day_id, plan__user=request.user)
 
     # ВАЖНО: берём позиции плейлиста, вместе с R2Video
-    playlist = day.playlist_items.select_related("video").order_by("order")
+    if day.plan.playlist_template_id:
+        from apps.workouts.services.playlist_templates import template_playlist_items
+        playlist = template_playlist_items(day)
+    else:
+        # Lazy mode: days outside the prefetch window get their playlist generated here
+        from apps.workouts.services.day_playlists import get_day_playlist
+        get_day_playlist(day)
+        playlist = day.playlist_items.select_related("video").order_by("order")
     
     # Для совместимости с шаблоном добавляем переменную exercises
     exercises = day.exercises if day.exercises else []
@@ -491,108 +430,3 @@ def workout_day(request, day_id):
         "playlist": playlist,
         "exercises": exercises,  # Добавлено для совместимости с шаблоном
     })
-
-
-# Helper functions for new playlist system
-def _get_video_title(playlist_item):
-    """Generate human-readable title for video"""
-    role = playlist_item.role
-    video_code = playlist_item.video.code
-    
-    if role == 'motivation':
-        if 'opening' in video_code or 'intro' in video_code:
-            return "Вступление"
-        elif 'closing' in video_code:
-            return "Заключение"
-        elif 'main' in video_code:
-            return "Мотивация"
-        else:
-            return "Мотивационное видео"
-    elif role == 'warmup':
-        return f"Разминка: {_get_exercise_name(video_code)}"
-    elif role == 'main':
-        return f"Упражнение: {_get_exercise_name(video_code)}"
-    elif role == 'cooldown':
-        return f"Заминка: {_get_exercise_name(video_code)}"
-    else:
-        return video_code.replace('_', ' ').title()
-
-
-def _get_exercise_name(video_code):
-    """Extract exercise name from video code"""
-    # Try to get from CSVExercise database first
-    try:
-        from apps.workouts.models import CSVExercise
-        # Extract exercise slug from video code (e.g., 'main_042_technique_m01' -> find exercise with similar name)
-        parts = video_code.split('_')
-        if len(parts) >= 2 and parts[0] in ['warmup', 'main', 'endurance', 'relaxation']:
-            exercise_num = parts[1]
-            # Try to find exercise by partial match
-            exercise = CSVExercise.objects.filter(
-                models.Q(name_ru__icontains=exercise_num) |
-                models.Q(id__icontains=exercise_num)
-            ).first()
-            if exercise:
-                return exercise.name_ru
-    except:
-        pass
-    
-    # Fallback: clean up video code
-    clean_name = video_code.replace('_technique_m01', '').replace('_', ' ')
-    return clean_name.title()
-
-
-def _get_muscle_group_from_code(video_code):
-    """Extract muscle group from video code"""
-    code_lower = video_code.lower()
-    
-    if any(term in code_lower for term in ['push', 'chest', 'bench']):
-        return 'Грудь'
-    elif any(term in code_lower for term in ['pull', 'back', 'row']):
-        return 'Спина' 
-    elif any(term in code_lower for term in ['squat', 'leg', 'quad']):
-        return 'Ноги'
-    elif any(term in code_lower for term in ['shoulder', 'press']):
-        return 'Плечи'
-    elif any(term in code_lower for term in ['arm', 'bicep', 'tricep']):
-        return 'Руки'
-    elif any(term in code_lower for term in ['core', 'abs', 'plank']):
-        return 'Корпус'
-    else:
-        return 'Общие'
-
-
-def _get_sets_from_role(role):
-    """Get typical sets count for exercise role"""
-    if role == 'warmup':
-        return 1
-    elif role == 'main':
-        return 3
-    elif role == 'cooldown':
-        return 1
-    else:
-        return None
-
-
-def _get_reps_from_role(role):
-    """Get typical reps count for exercise role"""
-    if role == 'warmup':
-        return 10
-    elif role == 'main':
-        return 12
-    elif role == 'cooldown':
-        return 8
-    else:
-        return None
-
-
-def _get_rest_from_role(role):
-    """Get typical rest time for exercise role"""
-    if role == 'warmup':
-        return 30
-    elif role == 'main':
-        return 90
-    elif role == 'cooldown':
-        return 30
-    else:
-        return 0
\ No newline at end of file
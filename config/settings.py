@@ -272,6 +272,7 @@ AI_PROVIDER = os.getenv('AI_PROVIDER', 'openai')  # 'openai' or 'anthropic'
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-5')  # Full GPT-5 for best quality
 OPENAI_MODEL_MINI = os.getenv('OPENAI_MODEL_MINI', 'gpt-5-mini')  # Fast GPT-5 for quick tasks
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None  # OpenAI-compatible endpoint override (local stub server)
 
 # GPT-5 specific settings for 1M+ token context
 OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_OUTPUT_TOKENS', '32768'))  # Increased for comprehensive reports
@@ -290,6 +291,60 @@ OPENAI_TEXT_VERBOSITY = os.getenv('OPENAI_TEXT_VERBOSITY', 'medium')  # low | me
 OPENAI_MAX_TOKENS = OPENAI_MAX_OUTPUT_TOKENS
 USE_JSON_MODE = os.getenv('USE_JSON_MODE', 'False') == 'True'
 
+# Content-addressed cache for comprehensive AI reports (shared via CACHES['default'])
+AI_RESPONSE_CACHE_ENABLED = os.getenv('AI_RESPONSE_CACHE_ENABLED', 'True') == 'True'
+AI_RESPONSE_CACHE_TTL = int(os.getenv('AI_RESPONSE_CACHE_TTL', '86400'))  # 24 hours
+AI_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('AI_RESPONSE_CACHE_MAX_ENTRIES', '500'))
+AI_RESPONSE_CACHE_MAX_BYTES = int(os.getenv('AI_RESPONSE_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+# AI resilience: shared circuit breaker (state in CACHES['default']) and adaptive in-flight limit per process
+AI_CIRCUIT_BREAKER_ENABLED = os.getenv('AI_CIRCUIT_BREAKER_ENABLED', 'True') == 'True'
+AI_CIRCUIT_FAILURE_THRESHOLD = float(os.getenv('AI_CIRCUIT_FAILURE_THRESHOLD', '0.5'))  # error rate that opens the circuit
+AI_CIRCUIT_MIN_CALLS = int(os.getenv('AI_CIRCUIT_MIN_CALLS', '5'))  # per window before the rate is trusted
+AI_CIRCUIT_WINDOW_SECONDS = int(os.getenv('AI_CIRCUIT_WINDOW_SECONDS', '60'))
+AI_CIRCUIT_RESET_TIMEOUT = int(os.getenv('AI_CIRCUIT_RESET_TIMEOUT', '30'))  # open -> half-open probe
+AI_CONCURRENCY_INITIAL = int(os.getenv('AI_CONCURRENCY_INITIAL', '8'))
+AI_CONCURRENCY_MIN = int(os.getenv('AI_CONCURRENCY_MIN', '1'))
+AI_CONCURRENCY_MAX = int(os.getenv('AI_CONCURRENCY_MAX', '32'))
+AI_CONCURRENCY_QUEUE_TIMEOUT = float(os.getenv('AI_CONCURRENCY_QUEUE_TIMEOUT', '5'))  # wait for a slot before shedding
+
+# Bulk plan regeneration (manage.py regenerate_plans): API quota shared by all workers
+AI_BULK_REQUESTS_PER_MINUTE = int(os.getenv('AI_BULK_REQUESTS_PER_MINUTE', '30'))
+AI_BULK_MAX_WORKERS = int(os.getenv('AI_BULK_MAX_WORKERS', '4'))
+
+# Prompt token budget: trimmable sections (user data) are cut to fit; whitelist is range-encoded
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv('AI_PROMPT_TOKEN_BUDGET', '16000'))
+
+# Stream comprehensive reports and persist each week as soon as it is received
+AI_STREAMING_ENABLED = os.getenv('AI_STREAMING_ENABLED', 'True') == 'True'
+
+# Hedged generation: serve a fallback template plan if AI exceeds the latency budget, swap in the AI plan later
+# (opt-in: the hedged AI plan is not streamed, the fallback covers the wait instead)
+AI_HEDGE_ENABLED = os.getenv('AI_HEDGE_ENABLED', 'False') == 'True'
+AI_HEDGE_LATENCY_BUDGET = float(os.getenv('AI_HEDGE_LATENCY_BUDGET', '25'))  # seconds; users abandon the loading page at ~30s
+
+# Precompiled fallback plans (rebuilt on CSVExercise changes, reloaded by other processes on mtime change)
+AI_FALLBACK_TEMPLATES_PATH = os.getenv('AI_FALLBACK_TEMPLATES_PATH', str(BASE_DIR / 'fallback_templates.json'))
+AI_FALLBACK_TEMPLATES_CHECK_INTERVAL = int(os.getenv('AI_FALLBACK_TEMPLATES_CHECK_INTERVAL', '60'))  # seconds
+
+# Record/replay AI client (AI_PROVIDER=replay; used by benchmark_plan_creation)
+AI_REPLAY_DIR = os.getenv('AI_REPLAY_DIR', str(BASE_DIR / 'ai_replays'))
+AI_REPLAY_MODE = os.getenv('AI_REPLAY_MODE', 'replay')  # 'replay' or 'record' (calls the real API and saves responses)
+AI_REPLAY_LATENCY = float(os.getenv('AI_REPLAY_LATENCY', '0'))  # seconds added to every replayed response
+AI_REPLAY_LATENCY_JITTER = float(os.getenv('AI_REPLAY_LATENCY_JITTER', '0'))  # ± seconds
+AI_REPLAY_STRICT = os.getenv('AI_REPLAY_STRICT', 'False') == 'True'  # fail on unrecorded requests instead of round-robin
+
+# AI call ledger (per-attempt usage/cost/latency, GET /api/ai/ledger/stats/)
+AI_LEDGER_ENABLED = os.getenv('AI_LEDGER_ENABLED', 'True') == 'True'
+AI_LEDGER_RETENTION_DAYS = int(os.getenv('AI_LEDGER_RETENTION_DAYS', '90'))
+AI_LEDGER_ROLLUP_MAX_HOURS = int(os.getenv('AI_LEDGER_ROLLUP_MAX_HOURS', str(24 * 30)))
+# USD per 1M tokens; dated snapshots match by prefix. Keep in sync with OpenAI pricing
+AI_TOKEN_PRICES = {
+    'gpt-5': {'input': 1.25, 'cached_input': 0.125, 'output': 10.0},
+    'gpt-5-mini': {'input': 0.25, 'cached_input': 0.025, 'output': 2.0},
+    'gpt-5-nano': {'input': 0.05, 'cached_input': 0.005, 'output': 0.4},
+}
+
 # Performance mode toggle
 AI_FAST_MODE = os.getenv('AI_FAST_MODE', 'False') == 'True'  # Enable for quick testing with reduced tokens
 
@@ -307,6 +362,10 @@ SHOW_AI_ANALYSIS = False  # DISABLED AI: Force AI analysis to be disabled
 AI_REPROMPT_MAX_ATTEMPTS = int(os.getenv('AI_REPROMPT_MAX_ATTEMPTS', '2'))
 FALLBACK_TO_LEGACY_FLOW = os.getenv('FALLBACK_TO_LEGACY_FLOW', 'False') == 'True'
 
+# Plan generation runs as a Celery job (PlanGenerationJob); False = run inline (dev without worker)
+PLAN_GENERATION_ASYNC = os.getenv('PLAN_GENERATION_ASYNC', 'True') == 'True'
+PLAN_GENERATION_JOB_TIMEOUT = int(os.getenv('PLAN_GENERATION_JOB_TIMEOUT', '900'))  # > OPENAI_TOTAL_TIMEOUT
+
 # Video storage configuration
 # R2 settings moved to main R2 configuration block above
 
@@ -314,9 +373,20 @@ FALLBACK_TO_LEGACY_FLOW = os.getenv('FALLBACK_TO_LEGACY_FLOW', 'False') == 'True
 PLAYLIST_MISTAKE_PROB = float(os.getenv('PLAYLIST_MISTAKE_PROB', '0.30'))
 PLAYLIST_FALLBACK_MAX_CANDIDATES = int(os.getenv('PLAYLIST_FALLBACK_MAX_CANDIDATES', '20'))
 PLAYLIST_STORAGE_RETRY = int(os.getenv('PLAYLIST_STORAGE_RETRY', '2'))
+PLAYLIST_IN_MEMORY_POOL = os.getenv('PLAYLIST_IN_MEMORY_POOL', 'True') == 'True'  # False = per-selection R2Video queries and per-item INSERTs
+MOTIVATION_INDEX_CHECK_INTERVAL = float(os.getenv('MOTIVATION_INDEX_CHECK_INTERVAL', '60'))  # seconds between checks for catalog changes made by other processes
+EXERCISE_INDEX_CHECK_INTERVAL = float(os.getenv('EXERCISE_INDEX_CHECK_INTERVAL', '60'))  # same for the exercise metadata index (and video pool)
+PLAYLIST_LAZY_GENERATION = os.getenv('PLAYLIST_LAZY_GENERATION', 'True') == 'True'  # playlists generated per day on first use / prefetch instead of at plan creation
+PLAYLIST_PREFETCH_DAYS = int(os.getenv('PLAYLIST_PREFETCH_DAYS', '2'))  # workout days pre-generated ahead by prefetch_day_playlists_task
+PLAYLIST_PAYLOAD_CACHE_TTL = int(os.getenv('PLAYLIST_PAYLOAD_CACHE_TTL', str(6 * 3600)))
+DASHBOARD_SNAPSHOT_TTL = int(os.getenv('DASHBOARD_SNAPSHOT_TTL', '3600'))  # per-user dashboard "today" snapshot (also expires when the plan day rolls over)
+PLAYLIST_USED_EXERCISES_CACHE_TTL = int(os.getenv('PLAYLIST_USED_EXERCISES_CACHE_TTL', str(7 * 24 * 3600)))  # per-user used exercise bitsets, updated on every playlist write
+PLAYLIST_SHARED_TEMPLATES = os.getenv('PLAYLIST_SHARED_TEMPLATES', 'False') == 'True'  # new plans read shared PlaylistTemplates instead of owning playlist rows
+PLAYLIST_TEMPLATE_VARIANTS = int(os.getenv('PLAYLIST_TEMPLATE_VARIANTS', '8'))  # canonical 21-day programs per archetype
 
 # Prompts configuration - fixed to v2 only
 PROMPTS_PROFILE = 'v2'  # Clean v2 implementation without legacy support
+PROMPTS_CACHE_CHECK_INTERVAL = float(os.getenv('PROMPTS_CACHE_CHECK_INTERVAL', '2.0'))  # seconds between mtime checks of cached prompts
 
 # Archetype mapping for backward compatibility (old -> new only)
 # Import archetype configuration from core constants
@@ -442,4 +512,8 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.core.tasks.system_health_monitor_task',
         'schedule': crontab(minute='*/10'),  # Every 10 minutes (production)
     },
+    'cleanup-ai-call-ledger': {
+        'task': 'apps.ai_integration.tasks.cleanup_ai_call_ledger_task',
+        'schedule': crontab(hour=3, minute=0, day_of_week=0),  # Weekly on Sunday at 3:00 AM
+    },
 }
\ No newline at end of file
@@ -23,6 +23,7 @@ urlpatterns = [
     path('content/', include('apps.content.urls')),
     path('', include('apps.notifications.urls')),
     path('', include('apps.analytics.urls')),
+    path('', include('apps.ai_integration.urls')),
     
     # API endpoints
     path('api/profile/', UserProfileView.as_view(), name='api_profile'),
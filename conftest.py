@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fallback_templates_path(settings, tmp_path):
+    """Keep fallback template rebuilds (CSVExercise signals) out of the repository"""
+    settings.AI_FALLBACK_TEMPLATES_PATH = str(tmp_path / 'fallback_templates.json')